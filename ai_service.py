@@ -2,44 +2,12 @@ import sys
 import json
 import os
 
-# ────────────────────────────────────────────────
-#   KNOWLEDGE BASE – defined at the top
-# ────────────────────────────────────────────────
-
-knowledge_base = {
-    "negombo": [
-        "Negombo is a lively city by the sea with nice beaches and many fish markets.",
-        "It has old buildings from colonial times and new hotels and eateries.",
-        "It is close to the airport, so it is easy for travelers to reach."
-    ],
-    "colombo": [
-        "Colombo is the busy main city of Sri Lanka with lots of business and shops.",
-        "It has old and new buildings, malls, and many places to eat different foods.",
-        "It is good for work and fun, with many people living a city life."
-    ],
-    "kandy": [
-        "Kandy is a city with lots of culture, hills, and tea farms around it.",
-        "It has the important Temple of the Tooth and a calm feel.",
-        "The weather is cool, and it is nice for people who want peace."
-    ],
-    "galle": [
-        "Galle is an old city with a big Dutch fort that is protected by UNESCO.",
-        "It has nice buildings, art shops, and small cafes.",
-        "The beaches are pretty, and it has a relaxed vibe for living."
-    ],
-    "gampaha": [
-        "Gampaha is a growing city with green areas and gardens.",
-        "It has good schools and hospitals for families.",
-        "It is connected to Colombo, so commuting is easy."
-    ],
-    # ... (you can keep ALL the other entries you had – I shortened it here for clarity)
-    "boralesgamuwa": [
-        "Boralesgamuwa has lakes and parks.",
-        "It offers homes and schools.",
-        "It is near Colombo."
-    ],
-    # Add the rest back as needed
-}
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Town vibe sentences: knowledge_base.json, read on the first lookup
+from knowledge_base import load_knowledge_base
 
 def generate_town_vibe(town):
     """
@@ -49,6 +17,7 @@ def generate_town_vibe(town):
         return "A pleasant location in Sri Lanka with access to basic amenities and community facilities."
 
     town = town.lower().strip()
+    knowledge_base = load_knowledge_base()
 
     matched_town = None
     for key in knowledge_base:
@@ -145,28 +114,18 @@ def generate_description(data):
     return description.strip()
 
 
+def describe_listing(data):
+    """
+    Generates the listing description together with the town vibe.
+    """
+    town = data.get('location', {}).get('town', '')
+    return {
+        "description": generate_description(data),
+        "townVibe": generate_town_vibe(town)
+    }
+
+
 if __name__ == "__main__":
-    try:
-        # Read input from stdin
-        input_data = sys.stdin.read().strip()
-        if not input_data:
-            print(json.dumps({"error": "No input provided"}))
-            sys.exit(1)
-
-        data = json.loads(input_data)
-
-        town = data.get('location', {}).get('town', '')
-
-        result = {
-            "description": generate_description(data),
-            "townVibe": generate_town_vibe(town)
-        }
-
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-
-    except json.JSONDecodeError as e:
-        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
-        sys.exit(1)
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
\ No newline at end of file
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils', 'ai'))
+    from dispatcher import run_cli
+    run_cli("generate_description", sys.modules[__name__])
@@ -239,11 +239,18 @@ const analyzeImageQuality = asyncHandler(async (req, res) => {
     res.status(200).json(result);
 });
 
-// @desc    Detect duplicate listings by same owner
+// @desc    Detect duplicate listings by same owner (scope: 'catalogue' checks every indexed listing)
 // @route   POST /api/ai/duplicate-check
 // @access  Private
 const checkDuplicates = asyncHandler(async (req, res) => {
-    const { title, description, town, price, beds, baths, type } = req.body;
+    const { title, description, town, price, beds, baths, type, scope } = req.body;
+
+    if (scope === 'catalogue' && process.env.AI_DUPLICATE_INDEX) {
+        const result = await aiService.executeScript('duplicate_detector.py', {
+            newListing: { title, description, town, price, beds, baths, type }
+        });
+        return res.status(200).json(result);
+    }
 
     // Find existing listings by same owner
     const existing = await Listing.find({
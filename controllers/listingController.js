@@ -118,6 +118,24 @@ const generateAIContent = async (listingData) => {
     }
 };
 
+// Helper to keep the catalogue duplicate index (AI_DUPLICATE_INDEX) in sync.
+// Fire-and-forget: indexing must never block or fail a listing write.
+const syncDuplicateIndex = ({ upsert = [], remove = [] }) => {
+    if (!process.env.AI_DUPLICATE_INDEX) return;
+    const records = upsert.map(l => ({
+        _id: l._id.toString(),
+        title: l.title || '',
+        description: l.description || '',
+        town: l.location?.town || '',
+        price: l.price || 0,
+        beds: l.beds || 0,
+        baths: l.baths || 0,
+        type: l.type || ''
+    }));
+    aiService.executeScript('duplicate_detector.py', { upsert: records, remove })
+        .catch(error => console.error("Duplicate index update failed:", error.message));
+};
+
 // @desc    Create new listing
 // @route   POST /api/listings
 // @access  Private (Owner/Broker)
@@ -161,6 +179,7 @@ const createListing = asyncHandler(async (req, res) => {
     }
 
     const listing = await Listing.create(listingData);
+    syncDuplicateIndex({ upsert: [listing] });
     res.status(201).json(listing);
 });
 
@@ -201,6 +220,7 @@ const updateListing = asyncHandler(async (req, res) => {
     }
 
     const updatedListing = await Listing.findByIdAndUpdate(req.params.id, updateData, { new: true });
+    syncDuplicateIndex({ upsert: [updatedListing] });
     res.status(200).json(updatedListing);
 });
 
@@ -230,6 +250,7 @@ const deleteListing = asyncHandler(async (req, res) => {
     ]);
 
     await listing.deleteOne();
+    syncDuplicateIndex({ remove: [req.params.id] });
     res.status(200).json({ id: req.params.id });
 });
 
@@ -439,6 +460,7 @@ const duplicateListing = asyncHandler(async (req, res) => {
     listingObj.title = `${listingObj.title} (Copy)`;
 
     const duplicated = await Listing.create(listingObj);
+    syncDuplicateIndex({ upsert: [duplicated] });
     res.status(201).json(duplicated);
 });
 
@@ -509,6 +531,7 @@ const bulkUploadListings = asyncHandler(async (req, res) => {
                 if (listings.length > 0) {
                     const created = await Listing.insertMany(listings);
                     results.success = created.length;
+                    syncDuplicateIndex({ upsert: created });
                 }
                 res.status(201).json(results);
             } catch (err) {
@@ -19,6 +19,12 @@ const runScraperScript = async (scriptName, inputData) => {
     return await aiService.executeScript(scriptName, inputData, scrapersPath);
 };
 
+// Streams NDJSON records (scraper_runner.py "output": "ndjson") to onRecord
+const streamScraperScript = async (scriptName, inputData, onRecord) => {
+    const scrapersPath = path.join(__dirname, '../utils/scrapers');
+    return await aiService.streamScript(scriptName, inputData, scrapersPath, onRecord);
+};
+
 // ═══════════════════════════════════════════
 //   HELPER: SSRF Vulnerability Preventer
 // ═══════════════════════════════════════════
@@ -218,15 +224,19 @@ const triggerScrape = asyncHandler(async (req, res) => {
                     },
                 })),
                 type: type || 'incremental',
+                // Lets the runner's enrich stage analyse listings in-process
+                localStats: await getTownStats(),
+                // A crawl cut short (e.g. by the AI service timeout) continues where it stopped;
+                // its listings were already streamed in and stored
+                resume: true,
             };
 
-            const result = await runScraperScript('scraper_runner.py', scraperInput);
-            const listings = result?.combined?.listings || [];
-
-            let newCount = 0, updatedCount = 0, dupCount = 0, piiCount = 0;
+            let totalScraped = 0, newCount = 0, updatedCount = 0, dupCount = 0, piiCount = 0;
+            const runnerErrors = [];
+            let runnerStats = {};
 
             // Process each listing
-            for (const listing of listings) {
+            const processListing = async (listing) => {
                 try {
                     const sourceSlug = listing._sourceSlug || '';
                     const sourceObj = sources.find(s => s.slug === sourceSlug) || sources[0];
@@ -237,28 +247,32 @@ const triggerScrape = asyncHandler(async (req, res) => {
                         // Update if recheck
                         if (type === 'recheck') {
                             existing.lastChecked = new Date();
-                            existing.isActive = true;
+                            // Recheck records report listings gone from the source as inactive
+                            existing.isActive = listing.isActive !== false;
                             await existing.save();
                             updatedCount++;
                         } else {
                             dupCount++;
                         }
-                        continue;
+                        return;
                     }
 
-                    // Get local stats for AI analysis
-                    const localStats = await getLocalStats(listing.location?.town);
-
-                    // Run AI analysis
-                    let aiAnalysis = {};
-                    try {
-                        aiAnalysis = await aiService.executeScript('scraped_analyzer.py', {
-                            listing,
-                            localStats,
-                        });
-                    } catch (aiErr) {
-                        // AI failure shouldn't block listing storage
-                        console.error('AI analysis failed:', aiErr.message);
+                    // Recheck records only carry liveness, never create listings
+                    if (listing.recheck) return;
+
+                    // Run AI analysis, unless the scraper pipeline already did
+                    let aiAnalysis = listing.aiAnalysis || {};
+                    if (!listing.aiAnalysis) {
+                        try {
+                            const localStats = await getLocalStats(listing.location?.town);
+                            aiAnalysis = await aiService.executeScript('scraped_analyzer.py', {
+                                listing,
+                                localStats,
+                            });
+                        } catch (aiErr) {
+                            // AI failure shouldn't block listing storage
+                            console.error('AI analysis failed:', aiErr.message);
+                        }
                     }
 
                     // PII detection
@@ -282,6 +296,7 @@ const triggerScrape = asyncHandler(async (req, res) => {
                         images: listing.images,
                         piiDetected: listing.piiDetected,
                         piiDetails: listing.piiDetails,
+                        descriptionSimhash: listing.descriptionSimhash || '',
                         adminStatus: listing.piiDetected ? 'flagged' : 'pending',
                         aiAnalysis: {
                             estimatedFairPrice: aiAnalysis.estimatedFairPrice || 0,
@@ -300,19 +315,33 @@ const triggerScrape = asyncHandler(async (req, res) => {
                 } catch (listingErr) {
                     console.error('Failed to process listing:', listingErr.message);
                 }
-            }
+            };
+
+            // Listings are stored while the crawl is still running
+            await streamScraperScript('scraper_runner.py', { ...scraperInput, output: 'ndjson' }, async (record) => {
+                if (record.type === 'listing') {
+                    totalScraped++;
+                    await processListing(record.listing);
+                } else if (record.type === 'error') {
+                    runnerErrors.push(record.error);
+                } else if (record.type === 'stats') {
+                    runnerStats = record;
+                }
+            });
 
             // Update job
             job.status = 'completed';
             job.completedAt = new Date();
             job.stats = {
-                totalScraped: listings.length,
+                totalScraped,
                 newListings: newCount,
                 updated: updatedCount,
                 duplicatesSkipped: dupCount,
                 piiAutoFlagged: piiCount,
+                // Unchanged listings keep the analysis stored from an earlier crawl
+                analysesSkipped: runnerStats.analysis?.reused || 0,
             };
-            job.errorDetails = result?.errors || [];
+            job.errorDetails = runnerErrors;
             await job.save();
 
             // Update source health
@@ -371,6 +400,33 @@ async function getLocalStats(town) {
     return { avgPrice: 0, totalListings: 0, avgBeds: 2, avgBaths: 1 };
 }
 
+// Local stats of every town at once, keyed by lowercased town
+async function getTownStats() {
+    const rows = await Listing.aggregate([
+        { $match: { status: 'approved', 'location.town': { $nin: [null, ''] } } },
+        {
+            $group: {
+                _id: { $toLower: '$location.town' },
+                avgPrice: { $avg: '$price' },
+                totalListings: { $sum: 1 },
+                avgBeds: { $avg: '$beds' },
+                avgBaths: { $avg: '$baths' },
+            },
+        },
+    ]);
+
+    const byTown = {};
+    for (const row of rows) {
+        byTown[row._id] = {
+            avgPrice: Math.round(row.avgPrice || 0),
+            totalListings: row.totalListings || 0,
+            avgBeds: Math.round(row.avgBeds || 2),
+            avgBaths: Math.round(row.avgBaths || 1),
+        };
+    }
+    return byTown;
+}
+
 // @desc    Get scrape job history
 // @route   GET /api/admin/scraping/jobs
 const getJobs = asyncHandler(async (req, res) => {
@@ -567,23 +623,25 @@ const reAnalyzeListing = asyncHandler(async (req, res) => {
         localStats,
     });
 
-    listing.aiAnalysis = {
-        estimatedFairPrice: aiResult.estimatedFairPrice || 0,
-        priceRating: aiResult.priceRating || 'Unknown',
-        qualityScore: aiResult.qualityScore || 0,
-        scamRiskScore: aiResult.scamRiskScore || 0,
-        locationInsights: aiResult.locationInsights || '',
-        comparisonToLocal: aiResult.comparisonToLocal || '',
-        tags: aiResult.tags || [],
-        marketTrend: aiResult.marketTrend || 'Unknown',
-        dataCompleteness: aiResult.dataCompleteness || 0,
-        analyzedAt: new Date(),
-    };
+    listing.aiAnalysis = toAiAnalysis(aiResult);
     await listing.save();
 
     res.status(200).json({ message: 'Analysis updated', listing });
 });
 
+const toAiAnalysis = (aiResult) => ({
+    estimatedFairPrice: aiResult.estimatedFairPrice || 0,
+    priceRating: aiResult.priceRating || 'Unknown',
+    qualityScore: aiResult.qualityScore || 0,
+    scamRiskScore: aiResult.scamRiskScore || 0,
+    locationInsights: aiResult.locationInsights || '',
+    comparisonToLocal: aiResult.comparisonToLocal || '',
+    tags: aiResult.tags || [],
+    marketTrend: aiResult.marketTrend || 'Unknown',
+    dataCompleteness: aiResult.dataCompleteness || 0,
+    analyzedAt: new Date(),
+});
+
 // @desc    Bulk actions on scraped listings
 // @route   POST /api/admin/scraping/listings/bulk
 const bulkAction = asyncHandler(async (req, res) => {
@@ -613,9 +671,29 @@ const bulkAction = asyncHandler(async (req, res) => {
         case 'delete':
             const delResult = await ScrapedListing.deleteMany(filter);
             return res.status(200).json({ message: `${delResult.deletedCount} listings deleted` });
+        case 'reanalyze': {
+            // Re-score every matching listing in one batch request instead of one script run each
+            const listings = await ScrapedListing.find(filter);
+            const statsByTown = new Map();
+            for (const listing of listings) {
+                const town = listing.location?.town;
+                if (!statsByTown.has(town)) statsByTown.set(town, await getLocalStats(town));
+            }
+            const results = await aiService.executeBatch('scraped_analyzer.py', listings.map(listing => ({
+                listing: listing.toObject(),
+                localStats: statsByTown.get(listing.location?.town),
+            })));
+            const ops = listings
+                .map((listing, i) => results[i] && {
+                    updateOne: { filter: { _id: listing._id }, update: { $set: { aiAnalysis: toAiAnalysis(results[i]) } } },
+                })
+                .filter(Boolean);
+            if (ops.length > 0) await ScrapedListing.bulkWrite(ops);
+            return res.status(200).json({ message: `${ops.length} listings reanalyzed` });
+        }
         default:
             res.status(400);
-            throw new Error('Invalid action. Use: approve, hide, flag, delete');
+            throw new Error('Invalid action. Use: approve, hide, flag, delete, reanalyze');
     }
 
     const result = await ScrapedListing.updateMany(filter, { $set: update });
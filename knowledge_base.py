@@ -1,730 +1,26 @@
-knowledge_base = {
-    "negombo": [
-        "Negombo is a lively city by the sea with nice beaches and many fish markets.",
-        "It has old buildings from colonial times and new hotels and eateries.",
-        "It is close to the airport, so it is easy for travelers to reach."
-    ],
-    "colombo": [
-        "Colombo is the busy main city of Sri Lanka with lots of business and shops.",
-        "It has old and new buildings, malls, and many places to eat different foods.",
-        "It is good for work and fun, with many people living a city life."
-    ],
-    "kandy": [
-        "Kandy is a city with lots of culture, hills, and tea farms around it.",
-        "It has the important Temple of the Tooth and a calm feel.",
-        "The weather is cool, and it is nice for people who want peace."
-    ],
-    "galle": [
-        "Galle is an old city with a big Dutch fort that is protected by UNESCO.",
-        "It has nice buildings, art shops, and small cafes.",
-        "The beaches are pretty, and it has a relaxed vibe for living."
-    ],
-    "gampaha": [
-        "Gampaha is a growing city with green areas and gardens.",
-        "It has good schools and hospitals for families.",
-        "It is connected to Colombo, so commuting is easy."
-    ],
-    "dehiwala": [
-        "Dehiwala is a busy area near the sea with different people living there.",
-        "It has a big zoo and good street food.",
-        "It is close to Colombo and Mount Lavinia for easy travel."
-    ],
-    "mount lavinia": [
-        "Mount Lavinia has a famous beach called Golden Mile and an old hotel.",
-        "It has restaurants by the sea and fun nightlife.",
-        "It is good for people who like beach life and relaxing."
-    ],
-    "nugegoda": [
-        "Nugegoda is a lively place with schools and shops for clothes.",
-        "It is a main spot for buses and trains.",
-        "Young people and students like its energy."
-    ],
-    # Additional for Colombo district (total 30 including above)
-    "kotte": [
-        "Kotte is the capital city with government buildings and parks.",
-        "It has modern homes and shopping areas.",
-        "It is quiet and good for families."
-    ],
-    "battaramulla": [
-        "Battaramulla has many offices and embassies.",
-        "It offers good food places and markets.",
-        "It is well linked by roads to other parts."
-    ],
-    "maharagama": [
-        "Maharagama is a busy suburb with hospitals and colleges.",
-        "It has markets for clothes and electronics.",
-        "People like it for daily needs and living."
-    ],
-    "moratuwa": [
-        "Moratuwa is known for wood work and universities.",
-        "It has beaches and fishing spots.",
-        "It is a mix of old and new life."
-    ],
-    "ratmalana": [
-        "Ratmalana has an airport and factories.",
-        "It offers homes near the sea.",
-        "It is good for work in industry."
-    ],
-    "kolonnawa": [
-        "Kolonnawa has oil refineries and markets.",
-        "It is close to Colombo city.",
-        "It has parks for relaxing."
-    ],
-    "kotahena": [
-        "Kotahena is an old part with churches and temples.",
-        "It has busy streets and shops.",
-        "It shows diverse cultures."
-    ],
-    "borella": [
-        "Borella has big hospitals and cemeteries.",
-        "It is a main junction for traffic.",
-        "It offers many services."
-    ],
-    "bambalapitiya": [
-        "Bambalapitiya has beaches and hotels.",
-        "It is good for shopping and eating out.",
-        "Young people enjoy the vibe."
-    ],
-    "wellawatte": [
-        "Wellawatte has many Tamil shops and food.",
-        "It is near the sea with train stations.",
-        "It is lively with markets."
-    ],
-    "havelock town": [
-        "Havelock Town has sports grounds and homes.",
-        "It offers quiet streets and parks.",
-        "It is nice for families."
-    ],
-    "kirulapone": [
-        "Kirulapone has canals and markets.",
-        "It is close to city center.",
-        "It has good bus links."
-    ],
-    "cinnamon gardens": [
-        "Cinnamon Gardens has big houses and museums.",
-        "It is green with trees and parks.",
-        "Rich people live here."
-    ],
-    "pettah": [
-        "Pettah is a big market area with shops.",
-        "It sells everything from food to clothes.",
-        "It is always busy."
-    ],
-    "slave island": [
-        "Slave Island has lakes and hotels.",
-        "It is in the city center.",
-        "It has new buildings."
-    ],
-    "maradana": [
-        "Maradana has train stations and schools.",
-        "It is a hub for transport.",
-        "It has old history."
-    ],
-    "dematagoda": [
-        "Dematagoda has workshops and homes.",
-        "It is near main roads.",
-        "It offers daily markets."
-    ],
-    "grandpass": [
-        "Grandpass has ports and factories.",
-        "It is diverse with people.",
-        "It has good food stalls."
-    ],
-    "mutwal": [
-        "Mutwal is near the harbor with fishing.",
-        "It has old churches.",
-        "It is calm by the sea."
-    ],
-    "mattakkuliya": [
-        "Mattakkuliya has communities and schools.",
-        "It is near rivers.",
-        "It offers local life."
-    ],
-    "modera": [
-        "Modera has beaches and homes.",
-        "It is quiet and simple.",
-        "It has train access."
-    ],
-    "kesbewa": [
-        "Kesbewa has shops and farms.",
-        "It is growing fast.",
-        "It is good for living."
-    ],
-    "boralesgamuwa": [
-        "Boralesgamuwa has lakes and parks.",
-        "It offers homes and schools.",
-        "It is near Colombo."
-    ],
-    "homagama": [
-        "Homagama has universities and tech parks.",
-        "It is green with fields.",
-        "It is for education."
-    ],
-    "hanwella": [
-        "Hanwella has rivers and bridges.",
-        "It offers markets and transport.",
-        "It is historical."
-    ],
-    "padukka": [
-        "Padukka has tea estates and hills.",
-        "It is calm and rural.",
-        "It has good air."
-    ],
-    # Gampaha district (25 including gampaha and negombo)
-    "katunayake": [
-        "Katunayake is near the airport with hotels.",
-        "It has free trade zones.",
-        "It is busy with travelers."
-    ],
-    "ja-ela": [
-        "Ja-Ela has industries and homes.",
-        "It is close to sea and roads.",
-        "It offers jobs."
-    ],
-    "kandana": [
-        "Kandana has churches and schools.",
-        "It is a residential area.",
-        "It has markets."
-    ],
-    "ragama": [
-        "Ragama has hospitals and colleges.",
-        "It is a transport hub.",
-        "It is growing."
-    ],
-    "kelaniya": [
-        "Kelaniya has temples and rivers.",
-        "It is historical.",
-        "It offers culture."
-    ],
-    "wattala": [
-        "Wattala has shops and factories.",
-        "It is near Colombo.",
-        "It has busy roads."
-    ],
-    "peliyagoda": [
-        "Peliyagoda has fish markets and ports.",
-        "It is commercial.",
-        "It offers trade."
-    ],
-    "minuwangoda": [
-        "Minuwangoda has farms and industries.",
-        "It is rural but growing.",
-        "It has good links."
-    ],
-    "veyangoda": [
-        "Veyangoda has train stations and shops.",
-        "It is a town for commuting.",
-        "It offers services."
-    ],
-    "divulapitiya": [
-        "Divulapitiya has coconut farms and markets.",
-        "It is peaceful.",
-        "It has local life."
-    ],
-    "mirigama": [
-        "Mirigama has highways and rest areas.",
-        "It is for travel.",
-        "It offers food stops."
-    ],
-    "attanagalla": [
-        "Attanagalla has temples and history.",
-        "It is green.",
-        "It has calm vibe."
-    ],
-    "kiribathgoda": [
-        "Kiribathgoda has big markets and buses.",
-        "It is busy suburb.",
-        "It offers shopping."
-    ],
-    "kadawatha": [
-        "Kadawatha has highways and homes.",
-        "It is gateway to Colombo.",
-        "It grows fast."
-    ],
-    "ganemulla": [
-        "Ganemulla has trains and schools.",
-        "It is residential.",
-        "It has parks."
-    ],
-    "dompe": [
-        "Dompe has hills and farms.",
-        "It is rural.",
-        "It offers nature."
-    ],
-    "biyagama": [
-        "Biyagama has export zones and factories.",
-        "It offers jobs.",
-        "It is industrial."
-    ],
-    "mahara": [
-        "Mahara has offices and homes.",
-        "It is near Gampaha.",
-        "It has services."
-    ],
-    "seeduwa": [
-        "Seeduwa has airport nearby and hotels.",
-        "It is for business.",
-        "It offers stay."
-    ],
-    "ekala": [
-        "Ekala has industries and roads.",
-        "It is developing.",
-        "It has markets."
-    ],
-    "katana": [
-        "Katana has beaches and fields.",
-        "It is calm.",
-        "It offers relax."
-    ],
-    "meerigama": [
-        "Meerigama has rest houses and shops.",
-        "It is on highway.",
-        "It serves travelers."
-    ],
-    "pugoda": [
-        "Pugoda has markets and farms.",
-        "It is small town.",
-        "It has community."
-    ],
-    # Kalutara district (4)
-    "kalutara": [
-        "Kalutara is a coastal city with beaches and forts.",
-        "It has temples and bridges.",
-        "It is good for tourism."
-    ],
-    "panadura": [
-        "Panadura has markets and temples.",
-        "It is near sea.",
-        "It offers trade."
-    ],
-    "horana": [
-        "Horana has rubber farms and schools.",
-        "It is inland.",
-        "It has calm life."
-    ],
-    "beruwala": [
-        "Beruwala has beaches and mosques.",
-        "It is for fishing.",
-        "It offers resorts."
-    ],
-    # Matale district (4)
-    "matale": [
-        "Matale is known for spices and hills.",
-        "It has temples and markets.",
-        "It is cultural."
-    ],
-    "dambulla": [
-        "Dambulla has caves and temples.",
-        "It is for tourism.",
-        "It offers history."
-    ],
-    "sigiriya": [
-        "Sigiriya has rock fortress and views.",
-        "It is ancient.",
-        "It attracts visitors."
-    ],
-    "udugama": [
-        "Udugama has farms and small shops.",
-        "It is rural.",
-        "It has simple life."
-    ],
-    # Nuwara Eliya district (4)
-    "nuwara eliya": [
-        "Nuwara Eliya has cool weather and tea estates.",
-        "It is like England with buildings.",
-        "It offers holidays."
-    ],
-    "hatton": [
-        "Hatton has train stations and hills.",
-        "It is for tea workers.",
-        "It has views."
-    ],
-    "talawakele": [
-        "Talawakele has waterfalls and tea factories.",
-        "It is green.",
-        "It offers nature."
-    ],
-    "ginihiriya": [
-        "Ginihiriya has farms and calm areas.",
-        "It is small.",
-        "It has fresh air."
-    ],
-    # Matara district (4)
-    "matara": [
-        "Matara is a southern city with beaches and forts.",
-        "It has temples and markets.",
-        "It is for relax."
-    ],
-    "weligama": [
-        "Weligama has surfing beaches and fishing.",
-        "It attracts tourists.",
-        "It offers fun."
-    ],
-    "dikwella": [
-        "Dikwella has blowholes and beaches.",
-        "It is peaceful.",
-        "It has resorts."
-    ],
-    "akuressa": [
-        "Akuressa has rivers and farms.",
-        "It is inland.",
-        "It offers local food."
-    ],
-    # Hambantota district (4)
-    "hambantota": [
-        "Hambantota has ports and cricket stadiums.",
-        "It is developing.",
-        "It offers jobs."
-    ],
-    "tangalle": [
-        "Tangalle has quiet beaches and turtles.",
-        "It is for relax.",
-        "It has hotels."
-    ],
-    "tiッサmaharama": [
-        "Tissamaharama has lakes and wildlife parks.",
-        "It is for safaris.",
-        "It offers adventure."
-    ],
-    "ambalantota": [
-        "Ambalantota has salt farms and beaches.",
-        "It is coastal.",
-        "It has history."
-    ],
-    # Jaffna district (4)
-    "jaffna": [
-        "Jaffna is a northern city with temples and forts.",
-        "It has Tamil culture and food.",
-        "It is historical."
-    ],
-    "nallur": [
-        "Nallur has big temples and festivals.",
-        "It is cultural hub.",
-        "It offers traditions."
-    ],
-    "chavakachcheri": [
-        "Chavakachcheri has markets and schools.",
-        "It is rebuilding.",
-        "It has community."
-    ],
-    "point pedro": [
-        "Point Pedro has beaches and lighthouses.",
-        "It is at the tip.",
-        "It offers sea views."
-    ],
-    # Kilinochchi district (4)
-    "kilinochchi": [
-        "Kilinochchi is a town with farms and lakes.",
-        "It is recovering from war.",
-        "It offers peace."
-    ],
-    "pallai": [
-        "Pallai has train lines and fields.",
-        "It is small.",
-        "It has simple life."
-    ],
-    "paranthan": [
-        "Paranthan has junctions and shops.",
-        "It is central.",
-        "It offers travel."
-    ],
-    "iranamadu": [
-        "Iranamadu has tanks and water.",
-        "It is for farming.",
-        "It has nature."
-    ],
-    # Mannar district (4)
-    "mannar": [
-        "Mannar has islands and forts.",
-        "It is for birds and fishing.",
-        "It offers views."
-    ],
-    "thalaimannar": [
-        "Thalaimannar has piers and beaches.",
-        "It was for ferries.",
-        "It has history."
-    ],
-    "pesalai": [
-        "Pesalai has churches and fishing.",
-        "It is coastal.",
-        "It offers sea food."
-    ],
-    "nanaddan": [
-        "Nanaddan has farms and small towns.",
-        "It is rural.",
-        "It has calm."
-    ],
-    # Vavuniya district (4)
-    "vavuniya": [
-        "Vavuniya is a gateway to north with markets.",
-        "It has diverse people.",
-        "It offers trade."
-    ],
-    "settikulam": [
-        "Settikulam has camps and farms.",
-        "It is developing.",
-        "It has community."
-    ],
-    "nedunkeni": [
-        "Nedunkeni has roads and shops.",
-        "It is small.",
-        "It offers basics."
-    ],
-    "omanthai": [
-        "Omanthai has checkpoints and trains.",
-        "It is junction.",
-        "It has travel."
-    ],
-    # Mullaitivu district (4)
-    "mullaitivu": [
-        "Mullaitivu has beaches and lagoons.",
-        "It is rebuilding.",
-        "It offers fishing."
-    ],
-    "pudukudiyiruppu": [
-        "Pudukudiyiruppu has schools and markets.",
-        "It is town.",
-        "It has people."
-    ],
-    "oddusuddan": [
-        "Oddusuddan has junctions and farms.",
-        "It is central.",
-        "It offers food."
-    ],
-    "maritimepattu": [
-        "Maritimepattu has sea and villages.",
-        "It is coastal.",
-        "It has nature."
-    ],
-    # Batticaloa district (4)
-    "batticaloa": [
-        "Batticaloa has lagoons and singing fish.",
-        "It has forts and beaches.",
-        "It is cultural."
-    ],
-    "kattankudy": [
-        "Kattankudy has mosques and markets.",
-        "It is Muslim town.",
-        "It offers trade."
-    ],
-    "eravur": [
-        "Eravur has rivers and farms.",
-        "It is diverse.",
-        "It has peace."
-    ],
-    "valachchenai": [
-        "Valachchenai has paper mills and sea.",
-        "It is industrial.",
-        "It offers jobs."
-    ],
-    # Ampara district (4)
-    "ampara": [
-        "Ampara has lakes and farms.",
-        "It is for agriculture.",
-        "It offers nature."
-    ],
-    "akkaraipattu": [
-        "Akkaraipattu has beaches and mosques.",
-        "It is coastal.",
-        "It has fishing."
-    ],
-    "kalmunai": [
-        "Kalmunai has markets and schools.",
-        "It is busy town.",
-        "It offers services."
-    ],
-    "sainthamaruthu": [
-        "Sainthamaruthu has trade and sea.",
-        "It is commercial.",
-        "It has community."
-    ],
-    # Trincomalee district (4)
-    "trincomalee": [
-        "Trincomalee has natural harbors and beaches.",
-        "It has temples and forts.",
-        "It is for tourism."
-    ],
-    "kinniya": [
-        "Kinniya has hot springs and bridges.",
-        "It is for relax.",
-        "It offers views."
-    ],
-    "mutur": [
-        "Mutur has ferries and farms.",
-        "It is diverse.",
-        "It has peace."
-    ],
-    "kantale": [
-        "Kantale has tanks and sugar farms.",
-        "It is agricultural.",
-        "It offers food."
-    ],
-    # Kurunegala district (4)
-    "kurunegala": [
-        "Kurunegala is a city with rocks and lakes.",
-        "It has hospitals and schools.",
-        "It is central."
-    ],
-    "kuliyapitiya": [
-        "Kuliyapitiya has universities and markets.",
-        "It is for education.",
-        "It offers growth."
-    ],
-    "narammala": [
-        "Narammala has coconut estates and shops.",
-        "It is rural.",
-        "It has calm."
-    ],
-    "pannala": [
-        "Pannala has temples and fields.",
-        "It is small.",
-        "It offers culture."
-    ],
-    # Puttalam district (4)
-    "puttalam": [
-        "Puttalam has salt farms and lagoons.",
-        "It is coastal.",
-        "It offers fishing."
-    ],
-    "chilaw": [
-        "Chilaw has beaches and temples.",
-        "It is for seafood.",
-        "It has markets."
-    ],
-    "wennappuwa": [
-        "Wennappuwa has tile factories and homes.",
-        "It is industrial.",
-        "It offers jobs."
-    ],
-    "marawila": [
-        "Marawila has resorts and beaches.",
-        "It is for holidays.",
-        "It offers relax."
-    ],
-    # Anuradhapura district (4)
-    "anuradhapura": [
-        "Anuradhapura has ancient ruins and temples.",
-        "It is historical city.",
-        "It offers tourism."
-    ],
-    "kekirawa": [
-        "Kekirawa has markets and farms.",
-        "It is town.",
-        "It has trade."
-    ],
-    "medawachchiya": [
-        "Medawachchiya has junctions and shops.",
-        "It is gateway.",
-        "It offers travel."
-    ],
-    "thalawa": [
-        "Thalawa has tanks and fields.",
-        "It is agricultural.",
-        "It has nature."
-    ],
-    # Polonnaruwa district (4)
-    "polonnaruwa": [
-        "Polonnaruwa has old kings' ruins and lakes.",
-        "It is for history.",
-        "It offers views."
-    ],
-    "hingurakgoda": [
-        "Hingurakgoda has airbase and farms.",
-        "It is developing.",
-        "It has services."
-    ],
-    "medirigiriya": [
-        "Medirigiriya has temples and villages.",
-        "It is cultural.",
-        "It offers peace."
-    ],
-    "welikanda": [
-        "Welikanda has rivers and forests.",
-        "It is rural.",
-        "It has adventure."
-    ],
-    # Badulla district (4)
-    "badulla": [
-        "Badulla has hills and trains.",
-        "It is cool climate.",
-        "It offers tea."
-    ],
-    "bandarawela": [
-        "Bandarawela has hotels and views.",
-        "It is for holidays.",
-        "It has fresh air."
-    ],
-    "haputale": [
-        "Haputale has cliffs and tea estates.",
-        "It is scenic.",
-        "It offers walks."
-    ],
-    "maiyanganaya": [
-        "Maiyanganaya has temples and lakes.",
-        "It is historical.",
-        "It has culture."
-    ],
-    # Moneragala district (4)
-    "moneragala": [
-        "Moneragala has forests and wildlife.",
-        "It is for adventure.",
-        "It offers nature."
-    ],
-    "wellawaya": [
-        "Wellawaya has rocks and parks.",
-        "It is junction.",
-        "It has views."
-    ],
-    "bibile": [
-        "Bibile has sugar farms and markets.",
-        "It is agricultural.",
-        "It offers food."
-    ],
-    "siyambalanduwa": [
-        "Siyambalanduwa has roads and shops.",
-        "It is small.",
-        "It has community."
-    ],
-    # Ratnapura district (4)
-    "ratnapura": [
-        "Ratnapura is known for gems and mines.",
-        "It has rivers and forests.",
-        "It offers trade."
-    ],
-    "embilipitiya": [
-        "Embilipitiya has parks and farms.",
-        "It is developing.",
-        "It has wildlife."
-    ],
-    "balangoda": [
-        "Balangoda has tea estates and history.",
-        "It is hilly.",
-        "It offers views."
-    ],
-    "pelmadulla": [
-        "Pelmadulla has temples and fields.",
-        "It is calm.",
-        "It has culture."
-    ],
-    # Kegalle district (4)
-    "kegalle": [
-        "Kegalle has hills and elephant orphanages.",
-        "It is green.",
-        "It offers nature."
-    ],
-    "mawanella": [
-        "Mawanella has markets and mosques.",
-        "It is trade hub.",
-        "It has diversity."
-    ],
-    "rambukkana": [
-        "Rambukkana has elephants and trains.",
-        "It is for tourism.",
-        "It offers fun."
-    ],
-    "warakapola": [
-        "Warakapola has shops and farms.",
-        "It is town.",
-        "It has services."
-    ]
-}
\ No newline at end of file
+import json
+import os
+
+# ────────────────────────────────────────────────
+#   KNOWLEDGE BASE – town vibe sentences
+#   Kept in knowledge_base.json and parsed on first use, so importing
+#   this module costs nothing until a lookup actually needs the data.
+# ────────────────────────────────────────────────
+
+KNOWLEDGE_BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.json')
+
+_knowledge_base = None
+
+def load_knowledge_base():
+    """Return the town -> sentences dict, reading it from disk once."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with open(KNOWLEDGE_BASE_PATH, 'r', encoding='utf-8') as f:
+            _knowledge_base = json.load(f)
+    return _knowledge_base
+
+def __getattr__(name):
+    # `from knowledge_base import knowledge_base` keeps working
+    if name == 'knowledge_base':
+        return load_knowledge_base()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -42,6 +42,7 @@ const scrapeJobSchema = mongoose.Schema(
             duplicatesSkipped: { type: Number, default: 0 },
             inactiveDetected: { type: Number, default: 0 },
             piiAutoFlagged: { type: Number, default: 0 },
+            analysesSkipped: { type: Number, default: 0 },
         },
         errorDetails: [{
             page: { type: Number },
@@ -89,6 +89,13 @@ const scrapedListingSchema = mongoose.Schema(
             default: [],
         },
 
+        // 64-bit SimHash of the redacted description (hex), set by the scrapers
+        descriptionSimhash: {
+            type: String,
+            default: '',
+            index: true,
+        },
+
         // AI Enrichment
         aiAnalysis: {
             estimatedFairPrice: { type: Number },
@@ -1,5 +1,10 @@
 const { spawn } = require('child_process');
 const path = require('path');
+const readline = require('readline');
+
+const SCRIPT_TIMEOUT_MS = 30000;
+// Streamed lines buffered before stdout is paused
+const STREAM_HIGH_WATER = 64;
 
 /**
  * Service to handle execution of AI Python scripts.
@@ -9,6 +14,270 @@ class AiService {
     constructor() {
         this.aiUtilsPath = path.join(__dirname, '../utils/ai');
         this.rootPath = path.join(__dirname, '../'); // For ai_service.py in root
+
+        // Persistent worker (utils/ai/ai_worker.py). Set AI_WORKER=off to spawn per call.
+        // AI_WORKERS > 1 starts the pre-forked pool (utils/ai/ai_supervisor.py) instead.
+        this.useWorker = process.env.AI_WORKER !== 'off' && process.env.NODE_ENV !== 'test';
+        this.poolSize = parseInt(process.env.AI_WORKERS, 10) || 1;
+        this.maxWorkerRssMb = parseInt(process.env.AI_WORKER_MAX_RSS_MB, 10) || 0;
+        this.worker = null;
+        this.pending = new Map();
+        this.nextRequestId = 1;
+    }
+
+    /**
+     * Lazily starts the long-lived Python worker and wires up response routing.
+     * @returns {import('child_process').ChildProcess}
+     */
+    getWorker() {
+        if (this.worker) return this.worker;
+
+        const args = this.poolSize > 1
+            ? [
+                path.join(this.aiUtilsPath, 'ai_supervisor.py'),
+                '--workers', String(this.poolSize),
+                '--max-rss-mb', String(this.maxWorkerRssMb),
+            ]
+            : [path.join(this.aiUtilsPath, 'ai_worker.py')];
+        const worker = spawn('python', args);
+        console.log(`[AiService] Started AI worker (pid ${worker.pid}, pool size ${this.poolSize})`);
+
+        const lines = readline.createInterface({ input: worker.stdout });
+        lines.on('line', (line) => {
+            let response;
+            try {
+                response = JSON.parse(line);
+            } catch (parseError) {
+                console.error(`[AiService] Unparseable worker output: ${line}`);
+                return;
+            }
+            const entry = this.pending.get(response.id);
+            if (!entry) return;
+
+            // Batch item: record it and keep waiting for the closing "done" line
+            if (response.partial) {
+                entry.onPartial(response);
+                return;
+            }
+
+            this.pending.delete(response.id);
+            clearTimeout(entry.timer);
+
+            if (response.done) {
+                entry.resolve(entry.results);
+            } else if (response.ok) {
+                entry.resolve(response.result === undefined ? null : response.result);
+            } else {
+                console.error(`[AiService] Error in ${entry.scriptName}: ${response.error}`);
+                entry.reject(new Error(`Script ${entry.scriptName} failed. Error: ${response.error}`));
+            }
+        });
+
+        worker.stderr.on('data', (data) => {
+            console.error(`[AiService] Worker stderr: ${data.toString()}`);
+        });
+
+        const onExit = (err) => {
+            if (this.worker !== worker) return;
+            this.worker = null;
+            const reason = err ? err.message : `exited with code ${worker.exitCode}`;
+            for (const [id, entry] of this.pending) {
+                clearTimeout(entry.timer);
+                entry.reject(new Error(`AI worker ${reason} while running ${entry.scriptName}`));
+                this.pending.delete(id);
+            }
+        };
+        worker.on('exit', () => onExit());
+        worker.on('error', onExit);
+
+        this.worker = worker;
+        return worker;
+    }
+
+    /**
+     * Reports queue depth and per-worker utilisation from the worker pool.
+     * @returns {Promise<object|null>} - Pool stats, or null when no pool is running
+     */
+    async getWorkerStats() {
+        if (!this.useWorker || this.poolSize <= 1) return null;
+        return this.executeOnWorker('__stats__', {});
+    }
+
+    /**
+     * Sends one request to the persistent worker.
+     * @param {string} scriptName - Script handled by the worker (e.g., 'spam_detector.py')
+     * @param {object} inputData - JSON payload
+     * @returns {Promise<object>} - Parsed JSON result
+     */
+    executeOnWorker(scriptName, inputData) {
+        return new Promise((resolve, reject) => {
+            const id = this.nextRequestId++;
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`Script ${scriptName} timed out after 30s`));
+            }, SCRIPT_TIMEOUT_MS);
+
+            this.pending.set(id, { resolve, reject, timer, scriptName });
+
+            try {
+                const worker = this.getWorker();
+                worker.stdin.write(JSON.stringify({ id, script: scriptName, payload: inputData || {} }) + '\n');
+            } catch (err) {
+                clearTimeout(timer);
+                this.pending.delete(id);
+                reject(new Error(`Failed to write to AI worker for ${scriptName}: ${err.message}`));
+            }
+        });
+    }
+
+    /**
+     * Runs one AI function over many payloads in a single worker request.
+     * Results come back in input order; items that failed are null.
+     * @param {string} scriptName - Script or registered function name (e.g., 'spam_detector.py')
+     * @param {object[]} payloads - One JSON payload per item
+     * @param {function} [onResult] - Called as (index, result, error) while items finish
+     * @returns {Promise<Array<object|null>>} - Results in the same order as payloads
+     */
+    async executeBatch(scriptName, payloads, onResult = null) {
+        if (!this.useWorker) {
+            const output = await this.executeScript(scriptName, { batch: payloads });
+            const results = (output?.results || []).map((r, index) => {
+                const failed = r && Object.keys(r).length === 1 && r.error !== undefined;
+                if (onResult) onResult(index, failed ? null : r, failed ? r.error : null);
+                return failed ? null : r;
+            });
+            return results;
+        }
+
+        return new Promise((resolve, reject) => {
+            const id = this.nextRequestId++;
+            const results = new Array(payloads.length).fill(null);
+
+            // Idle timeout: restarts whenever another item finishes
+            const armTimer = () => setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`Batch ${scriptName} stalled for 30s`));
+            }, SCRIPT_TIMEOUT_MS);
+
+            const entry = { resolve, reject, timer: armTimer(), scriptName, results };
+            entry.onPartial = (response) => {
+                clearTimeout(entry.timer);
+                entry.timer = armTimer();
+                if (response.ok) results[response.index] = response.result;
+                if (onResult) onResult(response.index, response.ok ? response.result : null, response.ok ? null : response.error);
+            };
+            this.pending.set(id, entry);
+
+            try {
+                const worker = this.getWorker();
+                worker.stdin.write(JSON.stringify({ id, script: scriptName, batch: payloads }) + '\n');
+            } catch (err) {
+                clearTimeout(entry.timer);
+                this.pending.delete(id);
+                reject(new Error(`Failed to write to AI worker for ${scriptName}: ${err.message}`));
+            }
+        });
+    }
+
+    /**
+     * Runs a Python script that writes one JSON record per stdout line, handing each
+     * record to onRecord as it arrives. onRecord is awaited and reading pauses while
+     * records pile up, so a slow consumer holds the script back instead of buffering.
+     * The 30s timeout applies to silence between lines, not to the whole run.
+     * @param {string} scriptName - Name of the script (e.g., 'scraper_runner.py')
+     * @param {object} inputData - JSON object to pass to the script via stdin
+     * @param {string} customPath - Directory containing the script
+     * @param {function} onRecord - Called with each parsed record
+     * @returns {Promise<object|null>} - The last record of type 'stats', if any
+     */
+    async streamScript(scriptName, inputData, customPath, onRecord) {
+        const scriptPath = path.join(customPath || this.aiUtilsPath, scriptName);
+        console.log(`[AiService] Streaming: ${scriptName}`);
+
+        const pythonProcess = spawn('python', [scriptPath]);
+        let errorString = '';
+        pythonProcess.stderr.on('data', (data) => {
+            errorString += data.toString();
+        });
+        const exited = new Promise((resolve) => {
+            pythonProcess.on('close', (code) => resolve(code));
+            pythonProcess.on('error', () => resolve(-1));
+        });
+
+        let timedOut = false;
+        let timer = null;
+        const armTimer = () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                timedOut = true;
+                pythonProcess.kill();
+            }, SCRIPT_TIMEOUT_MS);
+        };
+
+        pythonProcess.stdin.end(JSON.stringify(inputData || {}));
+        armTimer();
+
+        // Lines read but not yet handled; stdout is paused while too many wait
+        const lines = readline.createInterface({ input: pythonProcess.stdout });
+        const queued = [];
+        let closed = false;
+        let wake = null;
+        const notify = () => {
+            if (wake) wake();
+            wake = null;
+        };
+        lines.on('line', (line) => {
+            queued.push(line);
+            if (queued.length >= STREAM_HIGH_WATER) lines.pause();
+            notify();
+        });
+        lines.on('close', () => {
+            closed = true;
+            notify();
+        });
+
+        let stats = null;
+        let failure = null;
+        try {
+            while (queued.length || !closed) {
+                if (!queued.length) {
+                    await new Promise((resolve) => { wake = resolve; });
+                    continue;
+                }
+                const line = queued.shift();
+                if (queued.length < STREAM_HIGH_WATER / 2) lines.resume();
+                armTimer();
+                if (!line.trim()) continue;
+                let record;
+                try {
+                    record = JSON.parse(line);
+                } catch (parseError) {
+                    console.error(`[AiService] Unparseable output from ${scriptName}: ${line}`);
+                    continue;
+                }
+                if (record.type === undefined && record.error) {
+                    failure = record.error;
+                    continue;
+                }
+                if (record.type === 'stats') stats = record;
+                // The script may sit idle while the consumer works on this record
+                clearTimeout(timer);
+                await onRecord(record);
+                armTimer();
+            }
+        } finally {
+            clearTimeout(timer);
+        }
+
+        const code = await exited;
+        if (timedOut) {
+            throw new Error(`Script ${scriptName} produced no output for 30s`);
+        }
+        if (code !== 0 || failure) {
+            console.error(`[AiService] Error in ${scriptName}: ${failure || errorString}`);
+            throw new Error(`Script ${scriptName} exited with code ${code}. Error: ${failure || errorString}`);
+        }
+        return stats;
     }
 
     /**
@@ -19,6 +288,11 @@ class AiService {
      * @returns {Promise<object>} - Parsed JSON result
      */
     async executeScript(scriptName, inputData, customPath = null) {
+        // Scripts under utils/ai and the root ai_service.py are served by the worker
+        if (this.useWorker && !customPath) {
+            return this.executeOnWorker(scriptName, inputData);
+        }
+
         return new Promise((resolve, reject) => {
             let scriptPath;
 
@@ -95,7 +369,7 @@ class AiService {
             setTimeout(() => {
                 pythonProcess.kill();
                 reject(new Error(`Script ${scriptName} timed out after 30s`));
-            }, 30000);
+            }, SCRIPT_TIMEOUT_MS);
         });
     }
 }
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import io
+import json
+import time
+import tempfile
+import threading
+from unittest import mock
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai import ai_supervisor, ai_worker
+from utils.ai.ai_supervisor import Supervisor, serve_stream
+
+class TestAISupervisor(unittest.TestCase):
+    def test_requests_spread_across_workers(self):
+        """Test that every request is answered and more than one worker serves them."""
+        requests = [
+            json.dumps({"id": i, "script": "auto_tagger.py", "payload": {"description": "near the beach with parking"}})
+            for i in range(12)
+        ]
+        requests.append(json.dumps({"id": "stats", "script": "__stats__"}))
+        output = io.StringIO()
+        serve_stream(iter(requests), output, workers=2, max_in_flight=2)
+        responses = {r["id"]: r for r in map(json.loads, output.getvalue().splitlines())}
+        self.assertEqual(len(responses), 13)
+        self.assertIn("parking", responses[0]["result"]["tags"])
+        self.assertEqual(len(responses["stats"]["result"]["workers"]), 2)
+
+    def test_batch_split_across_workers(self):
+        """Test that a batch is chunked over the pool and indices map back to the input."""
+        batch = [{"title": f"Room {i}", "town": "Kandy"} for i in range(40)]
+        output = io.StringIO()
+        serve_stream(iter([json.dumps({"id": "b", "script": "spam_detector.py", "batch": batch})]), output, workers=2)
+        responses = [json.loads(l) for l in output.getvalue().splitlines()]
+        partials = [r for r in responses if r.get("partial")]
+        self.assertEqual(sorted(r["index"] for r in partials), list(range(40)))
+        self.assertEqual(responses[-1]["count"], 40)
+        self.assertEqual(responses[-1]["failed"], 0)
+
+    def test_crashed_worker_is_restarted(self):
+        """Test that a killed worker is replaced and the pool keeps serving."""
+        output = io.StringIO()
+        supervisor = Supervisor(output, workers=1)
+        first_pid = supervisor.workers[0].pid
+        supervisor.workers[0].proc.kill()
+
+        deadline = time.monotonic() + 10
+        while supervisor.stats()["restarts"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        supervisor.submit({"id": "after", "script": "pricing_engine.py", "payload": {"town": "Galle", "beds": 1}})
+        supervisor.shutdown()
+        responses = [json.loads(l) for l in output.getvalue().splitlines()]
+        self.assertNotEqual(supervisor.workers[0].pid, first_pid)
+        self.assertTrue(any(r["id"] == "after" and r["ok"] for r in responses))
+
+    def test_crash_looping_worker_backs_off_then_gives_up(self):
+        """Test that a worker dying at startup is restarted with backoff, then abandoned, failing requests."""
+        with tempfile.TemporaryDirectory() as tmp:
+            broken = os.path.join(tmp, 'broken_worker.py')
+            with open(broken, 'w') as f:
+                f.write('import sys\nsys.exit(3)\n')
+            output = io.StringIO()
+            started = time.monotonic()
+            with mock.patch.object(ai_supervisor, 'WORKER_SCRIPT', broken):
+                supervisor = Supervisor(output, workers=1, restart_backoff=0.05, max_restarts=3)
+                deadline = time.monotonic() + 10
+                while not supervisor.stats()['abandonedSlots'] and time.monotonic() < deadline:
+                    time.sleep(0.02)
+            # Three restarts waited 0.05 + 0.1 + 0.2s
+            self.assertGreaterEqual(time.monotonic() - started, 0.35)
+            self.assertEqual(supervisor.stats()['restarts'], 3)
+            self.assertEqual(supervisor.stats()['abandonedSlots'], [0])
+
+            supervisor.submit({"id": "late", "script": "pricing_engine.py", "payload": {"town": "Galle"}})
+            supervisor.shutdown()
+        response = json.loads(output.getvalue().splitlines()[-1])
+        self.assertEqual((response['id'], response['ok']), ('late', False))
+        self.assertIn('not restarting', response['error'])
+
+    def test_busy_worker_still_answers_pings(self):
+        """Test that a ping is answered while every request thread of the worker is busy."""
+        responses = io.StringIO()
+        release = threading.Event()
+        original = ai_worker.handle_request
+
+        def slow(request):
+            if request.get('script') != '__ping__':
+                release.wait(30)
+            return original(request)
+
+        lines = [json.dumps({"id": i, "script": "auto_tagger.py", "payload": {}}) for i in range(2)]
+        lines.append(json.dumps({"id": "ping", "script": "__ping__"}))
+        with mock.patch.object(ai_worker, 'handle_request', slow):
+            server = threading.Thread(target=ai_worker.serve_stream, args=(iter(lines), responses, 2))
+            server.start()
+            deadline = time.monotonic() + 2
+            while '"ping"' not in responses.getvalue() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            answered_while_busy = '"ping"' in responses.getvalue()
+            release.set()
+            server.join()
+        self.assertTrue(answered_while_busy)
+        self.assertEqual(len(responses.getvalue().splitlines()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import io
+import json
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.ai_worker import handle_line, iter_responses, serve_stream
+
+class TestAIWorker(unittest.TestCase):
+    def test_request_is_tagged_with_id(self):
+        """Test that a response carries the request id and the script result."""
+        line = json.dumps({"id": "a1", "script": "pricing_engine.py", "payload": {"town": "Kandy", "beds": 2}})
+        response = handle_line(line)
+        self.assertEqual(response["id"], "a1")
+        self.assertTrue(response["ok"])
+        self.assertIn("suggestedPrice", response["result"])
+
+    def test_unknown_script(self):
+        """Test that unknown scripts fail without killing the worker."""
+        response = handle_line(json.dumps({"id": 7, "script": "missing.py", "payload": {}}))
+        self.assertEqual(response["id"], 7)
+        self.assertFalse(response["ok"])
+
+    def test_invalid_json(self):
+        """Test that malformed lines return an id-less error."""
+        response = handle_line("{not json")
+        self.assertIsNone(response["id"])
+        self.assertFalse(response["ok"])
+
+    def test_serve_stream_many_in_flight(self):
+        """Test that several requests on one stream all get answered."""
+        requests = [
+            json.dumps({"id": i, "script": "spam_detector", "payload": {"title": f"Room {i}", "town": "Galle"}})
+            for i in range(10)
+        ]
+        output = io.StringIO()
+        serve_stream(iter(requests), output)
+        responses = [json.loads(l) for l in output.getvalue().splitlines()]
+        self.assertEqual(sorted(r["id"] for r in responses), list(range(10)))
+        self.assertTrue(all(r["ok"] for r in responses))
+
+    def test_batch_streams_partials_then_done(self):
+        """Test that a batch request yields one line per item and a summary."""
+        line = json.dumps({"id": "b", "script": "auto_tagger.py", "batch": [
+            {"description": "fully furnished"}, {"description": "near the beach"}]})
+        responses = list(iter_responses(line))
+        self.assertEqual([r.get("index") for r in responses[:-1]], [0, 1])
+        self.assertIn("furnished", responses[0]["result"]["tags"])
+        self.assertEqual(responses[-1], {"id": "b", "done": True, "ok": True, "count": 2, "failed": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.duplicate_detector import detect_duplicates, rank_duplicates, index_record, normalized_words
+from utils.ai.minhash_index import MinHashIndex
+from blocking import BlockIndex, block_key, max_score, price_band
+
+def listing(i, town, kind, beds, price, title='Spacious family house'):
+    return {'_id': f'l{i}', 'title': title, 'description': '', 'town': town,
+            'type': kind, 'beds': beds, 'baths': 1, 'price': price}
+
+class TestBlocking(unittest.TestCase):
+    def test_price_bands_never_undercount(self):
+        """Test that prices within 5% and 10% land close enough to keep their points."""
+        for price in (9_999, 25_000, 61_234, 1_500_000):
+            near, similar = block_key({'price': price * 0.951}), block_key({'price': price * 0.901})
+            base = block_key({'price': price})
+            self.assertEqual(max_score(base, near, with_text=False), 15)
+            self.assertGreaterEqual(max_score(base, similar, with_text=False), 10)
+        self.assertIsNone(price_band(0))
+        self.assertIsNone(price_band('n/a'))
+
+    def test_unreachable_blocks_are_pruned(self):
+        """Test that a Galle house never meets a Jaffna apartment with other beds and price."""
+        existing = [listing(i, 'Jaffna', 'Apartment', 3, 90000) for i in range(50)]
+        existing += [listing(100 + i, 'Galle', 'House', 2, 40000 + i) for i in range(5)]
+        blocks = BlockIndex(existing)
+        kept = blocks.viable_blocks(block_key(listing('new', 'Galle', 'House', 2, 40000)))
+        self.assertEqual(blocks.report(kept)['pairsPruned'], 50)
+        self.assertEqual([l['_id'] for l in blocks.members(kept)], [f'l{100 + i}' for i in range(5)])
+
+    def test_detect_duplicates_matches_full_scan(self):
+        """Test that pruning changes the work done, not the duplicates reported."""
+        towns, kinds = ['Kandy', 'Galle', 'Matara', ''], ['House', 'Annex', '']
+        titles = ['Spacious family house', 'Annex near school', 'Spacious house near school']
+        existing = [listing(i, towns[i % 4], kinds[i % 3], i % 4, 30000 + (i % 7) * 1500, titles[i % 3])
+                    for i in range(300)]
+        for probe in existing[:20]:
+            new = dict(probe, _id='new')
+            result = detect_duplicates(new, existing)
+            self.assertEqual(result['potentialDuplicates'], rank_duplicates(new, existing)[:5])
+            self.assertEqual(result['totalChecked'], 300)
+
+    def test_index_finds_attribute_only_duplicates(self):
+        """Test that the catalogue index returns same-block listings whose text differs."""
+        index = MinHashIndex(tokenize=normalized_words)
+        index.upsert([index_record(listing(1, 'Kandy', 'House', 3, 50000, 'Lovely home')),
+                      index_record(listing(2, 'Kandy', 'Annex', 1, 20000, 'Tiny annex')),
+                      index_record(listing(3, 'Galle', 'House', 3, 80000, 'Seaside villa'))])
+        probe = listing('new', 'Kandy', 'House', 3, 51000, 'Completely different words')
+        self.assertEqual(index.candidate_ids(probe), set())
+        self.assertEqual(index.block_candidate_ids(probe), {'l1'})
+        self.assertEqual(max_score(block_key(probe), block_key(listing(3, 'Galle', 'House', 3, 80000))), 70)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import time
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+from card_extractor import CardExtractor, PARSERS, css_to_xpath, extractor_for, parse_price
+from site_specs import SPECS, page_url
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'pages')
+
+def fixture(slug):
+    """A saved results page of a source (40 cards plus the usual page chrome)."""
+    with open(os.path.join(FIXTURES_DIR, f'{slug}.html'), encoding='utf-8') as f:
+        return f.read()
+
+def parse_ms(slug, parser, html, rounds=20):
+    """Mean milliseconds to extract every card of html."""
+    extractor = extractor_for(slug, parser)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        extractor.parse(html, 1, {'totalFound': 0, 'errors': 0}, [])
+    return (time.perf_counter() - started) * 1000 / rounds
+
+IKMAN_PAGE = '''<html><body><ul>
+<li class="normal--2QYVk ad-card--3cmmj">
+  <a href="/en/ad/house-for-rent-kandy-123?src=list"><h2 class="title"> 3 Bedroom <!-- x --> House <b>for&amp;rent</b>
+    <script>var tracking = 1;</script></h2></a>
+  <div class="subtitle--2yB9q">Kandy, Houses</div>
+  <div class="price--3SnqI">Rs 75,000 /month</div>
+  <p>2 baths, 1500 sqft. Call 0771234567</p>
+  <img src="https://i.ikman-st.com/house.jpg">
+</li>
+<li class="ad-card"><h3 class="title">Room for boarding</h3><img src="/placeholder.png"></li>
+<li class="ad-card"><span class="price">Rs 1</span></li>
+</ul></body></html>'''
+
+class TestCardExtractor(unittest.TestCase):
+    def parse(self, slug, html):
+        stats, errors = {'totalFound': 0, 'errors': 0}, []
+        return extractor_for(slug).parse(html, 1, stats, errors), stats, errors
+
+    def test_css_translation(self):
+        """Test that supported selectors translate to descendant XPath and others are refused."""
+        self.assertEqual(css_to_xpath('h2 a'), 'descendant::h2/descendant::a')
+        self.assertEqual(css_to_xpath('li.property, [data-testid="price"]'),
+                         'descendant::li[contains(concat(" ", normalize-space(@class), " "), " property ")]'
+                         ' | descendant::*[@data-testid = "price"]')
+        self.assertEqual(css_to_xpath('a[href*="/ad/"]'), 'descendant::a[contains(@href, "/ad/")]')
+        for selector in ('ul > li', 'a:first-child', 'h2 + p', 'a[href$=".php"]'):
+            with self.subTest(selector=selector), self.assertRaises(ValueError):
+                css_to_xpath(selector)
+
+    def test_every_spec_compiles(self):
+        """Test that every site spec compiles and names the fields the engine reads."""
+        for slug, spec in SPECS.items():
+            with self.subTest(slug=slug):
+                extractor = CardExtractor(dict(spec, slug=slug))
+                self.assertLessEqual({'title', 'price', 'location', 'description', 'image'},
+                                     set(extractor.fields))
+                self.assertIn(spec['link'], ('card-or-link', 'title', 'link'))
+
+    def test_ikman_cards(self):
+        """Test that one pass yields the listing fields, text as get_text(strip=True) reads it."""
+        listings, stats, errors = self.parse('ikman', IKMAN_PAGE)
+        self.assertEqual((stats, errors), ({'totalFound': 2, 'errors': 0}, []))
+        first, second = listings
+        self.assertEqual(first['title'], '3 BedroomHousefor&rent')
+        self.assertEqual(first['sourceUrl'], 'https://ikman.lk/en/ad/house-for-rent-kandy-123?src=list')
+        self.assertEqual(first['sourceId'], 'house-for-rent-kandy-123')
+        self.assertEqual(first['price'], 75000)
+        self.assertEqual(first['location'], {'town': 'Kandy', 'district': 'Kandy',
+                                             'province': 'Central', 'rawAddress': 'Kandy, Houses'})
+        self.assertEqual((first['beds'], first['baths'], first['size']), (3, 2, 1500))
+        self.assertEqual(first['type'], 'House')
+        self.assertEqual(first['images'], ['https://i.ikman-st.com/house.jpg'])
+        self.assertTrue(first['piiDetected'])
+        self.assertNotIn('0771234567', first['description'])
+        self.assertEqual((second['type'], second['images'], second['sourceUrl']), ('Boarding Room', [], ''))
+
+    def test_fallback_card_selectors(self):
+        """Test that later card selectors are tried only when earlier ones match nothing."""
+        html = '<ul><li><a href="/en/ad/flat-1"><h3>Flat in Galle</h3></a></li></ul>'
+        listings, _, _ = self.parse('ikman', html)
+        self.assertEqual([(l['sourceId'], l['type']) for l in listings], [('flat-1', 'Apartment')])
+        self.assertEqual(self.parse('ikman', '')[0], [])
+
+    def test_title_link_and_missing_size(self):
+        """Test lpw's title-link href and hitad's spec without a size pattern."""
+        lpw = '<div class="property-item"><h2><a href="/rent/annex-77.php">Annex 1 br</a></h2><p>900 sq</p></div>'
+        listing = self.parse('lpw', lpw)[0][0]
+        self.assertEqual((listing['sourceId'], listing['type'], listing['size']), ('annex-77', 'Annex', 900))
+        hitad = '<div class="ad-item"><h2>House 2 bed</h2><p>900 sq</p></div>'
+        self.assertEqual(self.parse('hitad', hitad)[0][0]['size'], 0)
+
+    def test_backends_agree_on_saved_pages(self):
+        """Test that the lxml and BeautifulSoup backends extract identical listings from every fixture."""
+        for slug in SPECS:
+            with self.subTest(slug=slug):
+                html = fixture(slug)
+                results = {}
+                for parser in PARSERS:
+                    stats, errors = {'totalFound': 0, 'errors': 0}, []
+                    results[parser] = extractor_for(slug, parser).parse(html, 1, stats, errors)
+                    self.assertEqual((stats, errors), ({'totalFound': 40, 'errors': 0}, []), parser)
+                self.assertEqual(results['lxml'], results['bs4'])
+
+    def test_parser_choice(self):
+        """Test that the backend is selectable and unknown parsers are refused."""
+        self.assertEqual(extractor_for('house').backend, 'lxml')
+        self.assertEqual(extractor_for('house', 'bs4').backend, 'bs4')
+        self.assertIs(extractor_for('house', 'bs4'), extractor_for('house', 'bs4'))
+        with self.assertRaises(ValueError):
+            extractor_for('house', 'regex')
+        self.assertEqual(self.parse('house', '<!-- nothing here -->')[0], [])
+
+    def test_page_urls(self):
+        """Test that location and price filters apply only to sources whose spec supports them."""
+        config = {'location': 'Nuwara Eliya', 'priceMin': 20000}
+        self.assertEqual(page_url('ikman', 2, config),
+                         'https://ikman.lk/en/ads/nuwara-eliya/properties?type=rent&page=2&price_min=20000')
+        self.assertEqual(page_url('lpw', 2, config), 'https://www.lankapropertyweb.com/rent/nuwara-eliya.php?page=2')
+        self.assertEqual(page_url('house', 1, config), 'https://www.house.lk/rent')
+        self.assertEqual(parse_price('Rs. 45,000 per month'), 45000)
+
+if __name__ == '__main__':
+    # python tests/test_card_extractor.py --bench times both backends on the fixtures
+    if '--bench' in sys.argv:
+        print(f'{"source":8} {"lxml":>9} {"bs4":>9}  speedup')
+        for slug in SPECS:
+            html = fixture(slug)
+            lxml_ms, soup_ms = parse_ms(slug, 'lxml', html), parse_ms(slug, 'bs4', html)
+            print(f'{slug:8} {lxml_ms:7.2f}ms {soup_ms:7.2f}ms  {soup_ms / lxml_ms:5.1f}x')
+    else:
+        unittest.main()
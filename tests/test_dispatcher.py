@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai import dispatcher
+
+class TestDispatcher(unittest.TestCase):
+    def test_every_entry_resolves_to_a_function(self):
+        """Test that each registered name points at a real function."""
+        for name, entry in dispatcher.REGISTRY.items():
+            module = dispatcher.load_module(entry)
+            self.assertTrue(callable(getattr(module, entry.function, None)), name)
+
+    def test_resolve_script_names(self):
+        """Test that legacy script names map onto registered functions."""
+        self.assertEqual(dispatcher.resolve('pricing_engine.py'), 'suggest_price')
+        self.assertEqual(dispatcher.resolve('parse_nlp_query'), 'parse_nlp_query')
+        self.assertEqual(dispatcher.resolve('sentiment_analyzer.py', {'reviews': []}), 'analyze_reviews')
+        self.assertEqual(dispatcher.resolve('sentiment_analyzer.py', {'text': 'ok'}), 'analyze_sentiment')
+        with self.assertRaises(ValueError):
+            dispatcher.resolve('missing.py')
+
+    def test_town_vibe_comes_from_shared_knowledge_base(self):
+        """Test that ai_service describes towns from knowledge_base.json rather than a fallback."""
+        import knowledge_base
+        result = dispatcher.dispatch('generate_description', {'type': 'House', 'location': {'town': 'Dehiwala'}})
+        self.assertEqual(result['townVibe'], ' '.join(knowledge_base.load_knowledge_base()['dehiwala']))
+
+    def test_params_mapping(self):
+        """Test that payload fields are passed as positional arguments."""
+        result = dispatcher.dispatch('calculate_safety_score', {'town': 'Kandy', 'reviewData': {}})
+        self.assertIn('basedOn', result)
+
+    def test_schema_rejects_wrong_type(self):
+        """Test that a mistyped field is rejected before the function runs."""
+        with self.assertRaises(ValueError):
+            dispatcher.dispatch('detect_spam', {'title': 123})
+
+    def test_stats_are_recorded(self):
+        """Test that calls are timed per function."""
+        dispatcher.dispatch('suggest_price', {'town': 'Galle', 'beds': 1})
+        stats = dispatcher.stats()['suggest_price']
+        self.assertGreaterEqual(stats['calls'] + stats['cacheHits'], 1)
+
+    def test_repeat_call_is_served_from_cache(self):
+        """Test that an identical payload (in any key order) hits the result cache."""
+        first = dispatcher.dispatch('estimate_commute', {'town': 'Kandy', 'destination': 'Galle'})
+        hits_before = dispatcher.stats()['estimate_commute']['cacheHits']
+        second = dispatcher.dispatch('estimate_commute', {'destination': 'Galle', 'town': 'Kandy'})
+        self.assertEqual(first, second)
+        self.assertEqual(dispatcher.stats()['estimate_commute']['cacheHits'], hits_before + 1)
+
+    def test_batch_keeps_order_and_isolates_failures(self):
+        """Test that a batch returns one result per payload in input order."""
+        payloads = [{'town': 'Kandy', 'beds': 1}, {'town': 7}, {'town': 'Galle', 'beds': 3}]
+        results = dispatcher.dispatch_batch('suggest_price', payloads)
+        self.assertEqual(len(results), 3)
+        self.assertIn('suggestedPrice', results[0])
+        self.assertIn('error', results[1])
+        self.assertGreater(results[2]['suggestedPrice'], results[0]['suggestedPrice'])
+
+if __name__ == '__main__':
+    unittest.main()
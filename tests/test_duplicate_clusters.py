@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+import itertools
+import subprocess
+from collections import Counter
+from unittest import mock
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai import duplicate_clusters
+from utils.ai.duplicate_clusters import UnionFind, bulk_record, find_clusters, iter_clusters
+from utils.ai.duplicate_detector import listing_features, score_pair
+
+SCRIPT = os.path.join(project_root, 'utils', 'ai', 'duplicate_clusters.py')
+
+def random_records(n, seed=3):
+    rng = random.Random(seed)
+    words = [f'word{i}' for i in range(300)] + 'spacious house annex room villa garden pool quiet'.split()
+    originals = []
+    records = []
+    for i in range(n):
+        if originals and rng.random() < 0.3:
+            record = dict(rng.choice(originals), _id=f'r{i}')
+            record['price'] = int(record['price'] * rng.uniform(0.96, 1.04))
+        else:
+            record = {'_id': f'r{i}', 'title': ' '.join(rng.sample(words, 4)), 'description': ' '.join(rng.sample(words, 8)),
+                      'town': rng.choice(['Kandy', 'Galle', '']), 'type': rng.choice(['House', 'Annex']),
+                      'beds': rng.randint(1, 3), 'baths': 1, 'price': rng.randint(20, 60) * 1000}
+            originals.append(record)
+        records.append(bulk_record(record, 'catalogue', i))
+    return records
+
+def brute_force_clusters(records, threshold):
+    features = [listing_features(r) for r in records]
+    uf = UnionFind(len(records))
+    for i, j in itertools.combinations(range(len(records)), 2):
+        if score_pair(features[i], features[j])[0] >= threshold:
+            uf.union(i, j)
+    groups = {}
+    for i in range(len(records)):
+        groups.setdefault(uf.find(i), []).append(i)
+    return sorted(g for g in groups.values() if len(g) > 1)
+
+class TestDuplicateClusters(unittest.TestCase):
+    def test_matches_all_pairs_clustering(self):
+        """Test that blocking and LSH find the same clusters as scoring every pair."""
+        records = random_records(400)
+        for threshold in (50, 75):
+            for workers in (1, 2):
+                with self.subTest(threshold=threshold, workers=workers):
+                    clusters, stats = find_clusters(records, threshold, workers)
+                    self.assertEqual(sorted(c['members'] for c in clusters), brute_force_clusters(records, threshold))
+                    self.assertLess(stats['pairsScored'], stats['pairsTotal'])
+
+    def test_each_pair_is_scored_once(self):
+        """Test that a pair sharing several buckets and groups is scored in one unit only."""
+        records = random_records(400)
+        index = {}
+        calls = Counter()
+
+        def counting_score_pair(a, b):
+            calls[frozenset((index[id(a)], index[id(b)]))] += 1
+            return score_pair(a, b)
+
+        real_init = duplicate_clusters._init_scorer
+
+        def init_scorer(features, *args):
+            index.update((id(f), i) for i, f in enumerate(features))
+            real_init(features, *args)
+
+        with mock.patch.object(duplicate_clusters, 'score_pair', counting_score_pair), \
+                mock.patch.object(duplicate_clusters, '_init_scorer', init_scorer):
+            clusters, stats = find_clusters(records, 50, workers=1)
+        self.assertTrue(calls)
+        self.assertEqual(max(calls.values()), 1)
+        self.assertEqual(stats['pairsScored'], len(calls))
+        self.assertEqual(sorted(c['members'] for c in clusters), brute_force_clusters(records, 50))
+
+    def test_clusters_stream_before_the_job_ends(self):
+        """Test that complete clusters are yielded while units are still being scored."""
+        records = random_records(400)
+        stats = {}
+        clusters = iter_clusters(records, 75, workers=1, stats=stats)
+        first = next(clusters)
+        self.assertGreater(len(first['members']), 1)
+        self.assertNotIn('pairsScored', stats)
+        rest = list(clusters)
+        self.assertEqual(stats['clusters'], len(rest) + 1)
+        self.assertEqual(sorted([first['members']] + [c['members'] for c in rest]),
+                         brute_force_clusters(records, 75))
+
+    def test_cli_streams_clusters_across_sources(self):
+        """Test that catalogue and scraper_runner listings land in one NDJSON cluster."""
+        original = {'title': 'Spacious annex near Kandy lake', 'description': 'Two rooms, parking and garden',
+                    'type': 'Annex', 'beds': 2, 'baths': 1, 'price': 35000}
+        catalogue = [dict(original, _id={'$oid': 'abc123'}, location={'town': 'Kandy'}),
+                     {'_id': 'other', 'title': 'Villa with pool', 'location': {'town': 'Galle'}, 'price': 90000}]
+        scraped = {'combined': {'listings': [dict(original, price=35500, location={'town': 'Kandy'},
+                                                  sourceId='ik-9', _sourceSlug='ikman')]}}
+        with tempfile.TemporaryDirectory() as tmp:
+            catalogue_path = os.path.join(tmp, 'catalogue.ndjson')
+            scraped_path = os.path.join(tmp, 'scraped.json')
+            with open(catalogue_path, 'w') as f:
+                f.write(''.join(json.dumps(l) + '\n' for l in catalogue))
+            with open(scraped_path, 'w') as f:
+                json.dump(scraped, f)
+            proc = subprocess.run([sys.executable, SCRIPT, '--catalogue', catalogue_path, '--scraped', scraped_path,
+                                   '--workers', '1'], capture_output=True, text=True, check=True)
+        clusters = [json.loads(line) for line in proc.stdout.splitlines()]
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual([(m['_id'], m['source']) for m in clusters[0]['members']],
+                         [('abc123', 'catalogue'), ('ikman:ik-9', 'ikman')])
+        self.assertEqual(clusters[0]['links'][0][2], 100)
+        self.assertEqual(json.loads(proc.stderr)['stats']['listings'], 3)
+
+    def test_cli_reads_runner_ndjson_stream(self):
+        """Test that listings streamed by scraper_runner's NDJSON output are clustered, other records skipped."""
+        import io
+        import types
+        from unittest import mock
+        scrapers_dir = os.path.join(project_root, 'utils', 'scrapers')
+        if scrapers_dir not in sys.path:
+            sys.path.insert(0, scrapers_dir)
+        import scraper_runner
+
+        annex = {'title': 'Spacious annex near Kandy lake', 'description': 'Two rooms, parking and garden',
+                 'type': 'Annex', 'beds': 2, 'baths': 1, 'location': {'town': 'Kandy'}}
+        module = types.ModuleType('ikman_scraper')
+        module.scrape = lambda config: {
+            'listings': [dict(annex, price=35000, sourceId='ik-1', sourceUrl='u1'),
+                         dict(annex, price=35500, sourceId='ik-2', sourceUrl='u2')],
+            'stats': {'pagesScraped': 1}, 'errors': [], 'source': 'ikman.lk'}
+        out = io.StringIO()
+        with mock.patch.dict(scraper_runner.SCRAPER_MAP, {'ikman': ('ikman_scraper', 'scrape')}), \
+                mock.patch.object(scraper_runner, 'REGISTRY', scraper_runner.ScraperRegistry()), \
+                mock.patch.object(scraper_runner, 'load_scraper', lambda name: module):
+            scraper_runner.run_scrapers({'sources': [{'slug': 'ikman'}]}, scraper_runner.NdjsonWriter(out))
+        self.assertEqual({json.loads(line)['type'] for line in out.getvalue().splitlines()},
+                         {'listing', 'source', 'stats'})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            catalogue_path = os.path.join(tmp, 'catalogue.ndjson')
+            scraped_path = os.path.join(tmp, 'scraped.ndjson')
+            with open(catalogue_path, 'w') as f:
+                f.write(json.dumps({'_id': 'other', 'title': 'Villa with pool', 'price': 90000}) + '\n')
+            with open(scraped_path, 'w') as f:
+                f.write(out.getvalue())
+            proc = subprocess.run([sys.executable, SCRIPT, '--catalogue', catalogue_path, '--scraped', scraped_path,
+                                   '--workers', '1'], capture_output=True, text=True, check=True)
+        clusters = [json.loads(line) for line in proc.stdout.splitlines()]
+        self.assertEqual([[m['_id'] for m in c['members']] for c in clusters], [['ikman:ik-1', 'ikman:ik-2']])
+        self.assertEqual(json.loads(proc.stderr)['stats']['listings'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
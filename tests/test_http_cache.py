@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import house_scraper
+import site_specs
+
+class Site(BaseHTTPRequestHandler):
+    """Two results pages with an ETag per page version."""
+    version = 1
+    statuses = []
+
+    def do_GET(self):
+        page = self.path.split('page=')[1] if 'page=' in self.path else '1'
+        etag = f'"p{page}-v{Site.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            Site.statuses.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        cards = ''.join(f'<div class="property-item"><h2>House {page}-{n} v{Site.version}</h2>'
+                        f'<a href="/ad/{page}-{n}">view</a><p>2 bed 1 bath</p></div>' for n in range(3))
+        body = f'<html>{cards}</html>'.encode()
+        Site.statuses.append(200)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Site.version, Site.statuses = 1, []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scrape(self, **config):
+        config = dict({'maxPages': 2, 'rateLimit': 0, 'stateDir': self.tmp.name}, **config)
+        with mock.patch.dict(site_specs.SPECS['house'], baseUrl=self.base, searchUrl=f'{self.base}/rent'):
+            result = house_scraper.scrape_house(config)
+        return result, result['stats']['pipeline']['parse']['pages']
+
+    def test_unchanged_pages_are_not_parsed(self):
+        """Test that a 304 reuses the cached listings without parsing the page."""
+        first, parsed = self.scrape()
+        self.assertEqual(parsed, 2)
+        self.assertEqual(first['stats']['cache']['hits'], 0)
+
+        second, parsed = self.scrape()
+        self.assertEqual(parsed, 0)
+        self.assertEqual(Site.statuses, [200, 200, 304, 304])
+        self.assertEqual(second['listings'], first['listings'])
+        self.assertEqual(second['stats']['totalFound'], 6)
+        cache = second['stats']['cache']
+        self.assertEqual((cache['lookups'], cache['hits'], cache['hitRatio']), (2, 2, 1.0))
+        self.assertGreater(cache['bytesSaved'], 0)
+
+    def test_changed_pages_are_refetched(self):
+        """Test that a new ETag means a full download and a fresh parse."""
+        self.scrape()
+        Site.version = 2
+        result, parsed = self.scrape()
+        self.assertEqual(parsed, 2)
+        self.assertEqual(result['stats']['cache']['hits'], 0)
+        self.assertTrue(result['listings'][0]['title'].endswith('v2'))
+
+    def test_cache_can_be_disabled(self):
+        """Test that httpCache false sends no validators."""
+        self.scrape()
+        result, parsed = self.scrape(httpCache=False)
+        self.assertEqual(parsed, 2)
+        self.assertEqual(Site.statuses, [200] * 4)
+        self.assertEqual(result['stats']['cache']['lookups'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
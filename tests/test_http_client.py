@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import requests
+from http_client import HttpClient, RequestMetrics
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    ports = set()
+    hits = {}
+
+    def do_GET(self):
+        Handler.ports.add(self.client_address[1])
+        Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        if self.path == '/flaky' and Handler.hits[self.path] == 1:
+            return self.reply(503, b'busy')
+        if self.path == '/missing':
+            return self.reply(404, b'nope')
+        body = b'<html>' + b'listing ' * 500 + b'</html>'
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            return self.reply(200, gzip.compress(body), {'Content-Encoding': 'gzip'})
+        self.reply(200, body)
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.ports.clear()
+        Handler.hits.clear()
+        self.client = HttpClient(sleep=lambda seconds: None)
+        self.metrics = RequestMetrics()
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_keep_alive_and_compression(self):
+        """Test that page fetches reuse one connection and arrive gzip-encoded."""
+        for page in range(3):
+            response = self.client.get(f'{self.base}/page{page}', metrics=self.metrics)
+            self.assertTrue(response.text.startswith('<html>listing'))
+        self.assertEqual(len(Handler.ports), 1)
+        summary = self.metrics.summary()
+        self.assertEqual(summary['requests'], 3)
+        self.assertEqual(summary['compressedResponses'], 3)
+
+    def test_retries_transient_errors(self):
+        """Test that a 503 is retried and counted while the caller sees the success."""
+        response = self.client.get(f'{self.base}/flaky', metrics=self.metrics)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Handler.hits['/flaky'], 2)
+        self.assertEqual(self.metrics.summary()['retries'], 1)
+
+    def test_client_errors_raise_without_retry(self):
+        """Test that a 404 raises HTTPError after a single attempt."""
+        with self.assertRaises(requests.HTTPError):
+            self.client.get(f'{self.base}/missing', metrics=self.metrics)
+        self.assertEqual(Handler.hits['/missing'], 1)
+        self.assertEqual(self.metrics.summary()['failures'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
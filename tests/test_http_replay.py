@@ -0,0 +1,175 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import house_scraper
+import scraper_runner
+import site_specs
+from http_replay import Corpus
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'pages')
+
+class Site(BaseHTTPRequestHandler):
+    """Two gzip-free results pages of three cards, revalidated by ETag."""
+    paths = []
+    headers = []
+
+    def do_GET(self):
+        Site.paths.append(self.path)
+        Site.headers.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        page = int(self.path.split('page=')[1]) if 'page=' in self.path else 1
+        cards = ''.join(
+            f'<div class="property-item"><h2>House {page}-{n} in Kandy – ලංකා</h2><a href="/ad/{page}-{n}">view</a>'
+            f'<span class="price">Rs {40 + n},000</span><p>{n + 1} bed</p></div>' for n in range(3))
+        body = f'<html>{cards}</html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def seed_corpus(directory, pages):
+    """A replay corpus serving each source's saved fixture page as its first `pages` results pages."""
+    for slug in site_specs.SPECS:
+        with open(os.path.join(FIXTURES_DIR, f'{slug}.html'), encoding='utf-8') as f:
+            html = f.read()
+        corpus = Corpus(directory, slug)
+        for page in range(1, pages + 1):
+            corpus.save(site_specs.page_url(slug, page, {}), 200, {'Content-Type': 'text/html; charset=utf-8'}, html)
+
+def replay_benchmark(corpus_dir, pages, rounds=1, **config):
+    """
+    Scrape every source end to end from a replay corpus, `rounds` times after
+    one warm-up run; returns one row per source with pages/sec and listings/sec.
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as state:
+        config = dict({'maxPages': pages, 'rateLimit': 0, 'replay': 'replay', 'replayDir': corpus_dir,
+                       'stateDir': state, 'httpCache': False, 'checkpoint': False}, **config)
+        for slug in site_specs.SPECS:
+            _, scrape = scraper_runner.REGISTRY.get(slug)
+            scrape(dict(config))
+            started = time.perf_counter()
+            for _ in range(rounds):
+                result = scrape(dict(config))
+            seconds = (time.perf_counter() - started) / rounds
+            stats = result['stats']
+            rows.append({
+                'source': slug,
+                'pages': stats['pagesScraped'],
+                'listings': len(result['listings']),
+                'errors': result['errors'],
+                'seconds': seconds,
+                'pagesPerSec': stats['pagesScraped'] / seconds,
+                'listingsPerSec': len(result['listings']) / seconds,
+            })
+    return rows
+
+class TestHttpReplay(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.tmp = tempfile.TemporaryDirectory()
+        Site.paths, Site.headers = [], []
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def scrape(self, **config):
+        config = dict({'maxPages': 2, 'rateLimit': 0, 'parseWorkers': 0, 'enrich': False,
+                       'stateDir': self.tmp.name, 'httpCache': False}, **config)
+        with mock.patch.dict(site_specs.SPECS['house'], baseUrl=self.base, searchUrl=f'{self.base}/rent'):
+            return house_scraper.scrape_house(config)
+
+    def test_replay_matches_recorded_crawl_offline(self):
+        """Test that replaying a recorded crawl yields the same listings without any request."""
+        recorded = self.scrape(replay='record')
+        self.assertEqual(len(Site.paths), 2)
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, 'replay', 'house'))), 2)
+        self.server.shutdown()
+
+        replayed = self.scrape(replay='replay')
+        self.assertEqual(len(Site.paths), 2)
+        self.assertEqual(replayed['errors'], [])
+        self.assertEqual(replayed['listings'], recorded['listings'])
+        self.assertIn('ලංකා', replayed['listings'][0]['title'])
+
+    def test_recording_with_warm_page_cache_saves_every_page(self):
+        """Test that recording over a warm page cache still saves full pages, not 304s."""
+        self.scrape(httpCache=True)
+        Site.paths, Site.headers = [], []
+        recorded = self.scrape(httpCache=True, replay='record')
+        self.assertEqual(len(Site.paths), 2)
+        self.assertFalse(any('If-None-Match' in headers or 'If-Modified-Since' in headers for headers in Site.headers))
+        self.server.shutdown()
+
+        replayed = self.scrape(replay='replay')
+        self.assertEqual(replayed['errors'], [])
+        self.assertEqual(replayed['listings'], recorded['listings'])
+
+    def test_unrecorded_page_fails_without_network(self):
+        """Test that a URL missing from the corpus is a per-page error, not a live fetch."""
+        self.scrape(replay='record', maxPages=1)
+        result = self.scrape(replay='replay', maxPages=2)
+        self.assertEqual(len(Site.paths), 1)
+        self.assertEqual(len(result['listings']), 3)
+        self.assertEqual([e['page'] for e in result['errors']], [2])
+        self.assertIn('Not in the replay corpus', result['errors'][0]['message'])
+        with self.assertRaises(ValueError):
+            self.scrape(replay='rewind')
+
+    def test_benchmark_runs_every_scraper_offline(self):
+        """Test that the replay benchmark drives all five scrapers end to end from the fixtures."""
+        seed_corpus(self.tmp.name, pages=2)
+        rows = replay_benchmark(self.tmp.name, pages=2, parseWorkers=0, enrich=False)
+        self.assertEqual([row['source'] for row in rows], list(site_specs.SPECS))
+        for row in rows:
+            with self.subTest(source=row['source']):
+                self.assertEqual((row['pages'], row['listings'], row['errors']), (2, 80, []))
+                self.assertGreater(row['listingsPerSec'], 0)
+
+if __name__ == '__main__':
+    # python tests/test_http_replay.py --bench [--corpus DIR] [--pages N] [--no-enrich]
+    # times whole scrapes served from a replay corpus (the saved fixture pages by default)
+    if '--bench' in sys.argv:
+        def option(name, default):
+            return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+        pages = int(option('--pages', 5))
+        with tempfile.TemporaryDirectory() as seeded:
+            corpus_dir = option('--corpus', None)
+            if corpus_dir is None:
+                seed_corpus(seeded, pages)
+                corpus_dir = seeded
+            rows = replay_benchmark(corpus_dir, pages, rounds=3, enrich='--no-enrich' not in sys.argv)
+        print(f'{"source":8} {"pages":>5} {"listings":>8} {"seconds":>8} {"pages/s":>8} {"listings/s":>10}')
+        for row in rows:
+            print(f'{row["source"]:8} {row["pages"]:5} {row["listings"]:8} {row["seconds"]:8.3f} '
+                  f'{row["pagesPerSec"]:8.1f} {row["listingsPerSec"]:10.1f}'
+                  + (f'  ({len(row["errors"])} errors)' if row['errors'] else ''))
+    else:
+        unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import re
+import subprocess
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+AI_DIR = os.path.join(project_root, 'utils', 'ai')
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+
+# Cold-import budget per entry point, in milliseconds. Scale all budgets on
+# slow machines with IMPORT_BUDGET_SCALE=2 rather than editing the numbers.
+DEFAULT_BUDGET_MS = 60
+BUDGETS_MS = {
+    'ai_worker': 120,
+    'ai_supervisor': 120,
+    'dispatcher': 80,
+}
+SCALE = float(os.environ.get('IMPORT_BUDGET_SCALE', 1))
+
+# Dependencies that must only load when a function actually needs them
+LAZY_DEPENDENCIES = ('requests', 'bs4', 'lxml', 'sqlite3')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+def entry_points():
+    """(module, directory) for every script Node spawns or imports."""
+    points = [(name[:-3], AI_DIR) for name in sorted(os.listdir(AI_DIR)) if name.endswith('.py')]
+    points += [(name[:-3], SCRAPERS_DIR) for name in sorted(os.listdir(SCRAPERS_DIR)) if name.endswith('.py')]
+    points += [('ai_service', project_root), ('knowledge_base', project_root)]
+    return points
+
+def measure(module, directory):
+    """Import module in a fresh interpreter; return (cumulative_ms, imported module names)."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=directory, capture_output=True, text=True, timeout=60,
+    )
+    if proc.returncode != 0:
+        raise AssertionError(f'import {module} failed:\n{proc.stderr[-2000:]}')
+    cumulative_us, imported = None, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        imported.add(match.group(4))
+        if match.group(4) == module and not match.group(3):
+            cumulative_us = int(match.group(2))
+    return (cumulative_us or 0) / 1000, imported
+
+class TestImportBudget(unittest.TestCase):
+    def test_entry_points_within_budget(self):
+        """Test that cold import of every entry point stays under its budget."""
+        for module, directory in entry_points():
+            with self.subTest(module=module):
+                elapsed_ms, _ = measure(module, directory)
+                budget = BUDGETS_MS.get(module, DEFAULT_BUDGET_MS) * SCALE
+                self.assertLessEqual(elapsed_ms, budget, f'{module} imported in {elapsed_ms:.1f}ms')
+
+    def test_heavy_dependencies_load_on_first_use(self):
+        """Test that no entry point pulls in the HTTP stack or sqlite3 at import time."""
+        for module, directory in entry_points():
+            with self.subTest(module=module):
+                _, imported = measure(module, directory)
+                self.assertFalse(imported & set(LAZY_DEPENDENCIES), module)
+
+    def test_scraper_helpers_usable_without_fetching(self):
+        """Test that parse helpers work without touching the HTTP stack."""
+        # Fresh interpreter: other tests in this process do run scrapers
+        proc = subprocess.run(
+            [sys.executable, '-c', 'import sys, house_scraper, card_extractor, scraper_deps; '
+             'print(card_extractor.parse_price("Rs. 45,000 per month"), '
+             '*(name in sys.modules for name in ("requests", "bs4", "lxml")))'],
+            cwd=SCRAPERS_DIR, capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(proc.stdout.split(), ['45000', 'False', 'False', 'False'], proc.stderr[-2000:])
+
+if __name__ == '__main__':
+    # python tests/test_import_budget.py --table prints the measurements
+    if '--table' in sys.argv:
+        for module, directory in entry_points():
+            elapsed_ms, _ = measure(module, directory)
+            budget = BUDGETS_MS.get(module, DEFAULT_BUDGET_MS) * SCALE
+            print(f'{module:24} {elapsed_ms:8.1f}ms  budget {budget:6.0f}ms')
+    else:
+        unittest.main()
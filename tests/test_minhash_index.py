@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.minhash_index import MinHashIndex, signature
+from utils.ai.duplicate_detector import normalized_words, index_record, rank_duplicates
+
+TOWNS = ['Kandy', 'Galle', 'Matara', 'Negombo', 'Jaffna']
+
+def catalogue(n):
+    """Listings whose titles and descriptions share almost no words."""
+    return [index_record({
+        '_id': f'l{i}',
+        'title': f'listing{i} alpha{i} beta{i} gamma{i}',
+        'description': f'word{i} text{i} more{i} detail{i} extra{i} final{i}',
+        'town': TOWNS[i % len(TOWNS)],
+        'price': 20000 + i * 1000,
+        'beds': 1 + i % 4,
+        'baths': 1,
+        'type': 'House',
+    }) for i in range(n)]
+
+class TestMinHashIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MinHashIndex(tokenize=normalized_words)
+        self.index.upsert(catalogue(200))
+
+    def test_signature_estimates_jaccard(self):
+        """Test that identical sets share a signature and disjoint sets almost never agree."""
+        a = signature({'spacious', 'house', 'kandy'})
+        self.assertEqual(a, signature({'kandy', 'house', 'spacious'}))
+        b = signature({'tiny', 'annex', 'galle'})
+        self.assertLess(sum(x == y for x, y in zip(a, b)), 5)
+
+    def test_lookup_only_touches_lookalikes(self):
+        """Test that a repost finds its original without scoring the whole catalogue."""
+        repost = {'_id': 'new', 'title': 'Listing17 alpha17 beta17 gamma17!', 'description': 'word17 text17 more17 detail17 extra17 final17',
+                  'town': 'Galle', 'price': 37000, 'beds': 2, 'baths': 1, 'type': 'House'}
+        candidates = self.index.candidates(repost)
+        # The lookalike plus the Galle 2BR houses its block can match on attributes alone
+        self.assertLess(len(candidates), 20)
+        best = rank_duplicates(repost, candidates)[0]
+        self.assertEqual(best['listingId'], 'l17')
+        self.assertTrue(best['isDuplicate'])
+
+    def test_incremental_update_and_delete(self):
+        """Test that upserts replace stale buckets and removals drop them."""
+        probe = {'title': 'brand new villa with pool', 'description': ''}
+        self.assertEqual(self.index.candidate_ids(probe), set())
+        self.index.upsert([index_record({'_id': 'l3', 'title': 'Brand new villa with pool'})])
+        self.assertEqual(self.index.candidate_ids(probe), {'l3'})
+        self.assertEqual(len(self.index), 200)
+        self.assertEqual(self.index.remove(['l3', 'missing']), 1)
+        self.assertEqual(self.index.candidate_ids(probe), set())
+        self.assertEqual(len(self.index), 199)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.result_cache import ResultCache, make_key
+
+class TestResultCache(unittest.TestCase):
+    def test_key_ignores_payload_key_order(self):
+        """Test that the cache key is canonical over dict ordering."""
+        self.assertEqual(make_key('f', {'a': 1, 'b': 2}, 'v1'), make_key('f', {'b': 2, 'a': 1}, 'v1'))
+        self.assertNotEqual(make_key('f', {'a': 1}, 'v1'), make_key('f', {'a': 1}, 'v2'))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache(max_entries=2)
+        cache.put('a', {'v': 1})
+        cache.put('b', {'v': 2})
+        cache.get('a')
+        cache.put('c', {'v': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'v': 1})
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        cache = ResultCache(ttl=0.05)
+        cache.put('k', [1, 2])
+        self.assertEqual(cache.get('k'), [1, 2])
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('k'))
+
+    def test_disk_tier_survives_new_process_cache(self):
+        """Test that a second cache on the same SQLite file sees earlier results."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+            ResultCache(db_path=path).put('k', {'score': 80})
+            cache = ResultCache(db_path=path)
+            self.assertEqual(cache.get('k'), {'score': 80})
+            self.assertEqual(cache.stats()['diskHits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import house_scraper
+import site_specs
+import card_extractor
+from scrape_details import merge_details
+from scrape_state import content_hash
+
+class Site(BaseHTTPRequestHandler):
+    """One results page of four cards, each linking to a slow detail page."""
+    paths = []
+    prices = {}
+    in_flight = max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        Site.paths.append(self.path)
+        if self.path.startswith('/ad/'):
+            with Site.lock:
+                Site.in_flight += 1
+                Site.max_in_flight = max(Site.max_in_flight, Site.in_flight)
+            time.sleep(0.05)
+            with Site.lock:
+                Site.in_flight -= 1
+            n = self.path.rsplit('/', 1)[1]
+            body = (f'<html><div class="description">House {n} in Kandy, a quiet family home near the lake '
+                    f'with a garden and parking. Call 0771234567.</div>'
+                    f'<div class="gallery"><img src="/img/{n}-1.jpg"><img src="/img/{n}-2.jpg"></div>'
+                    f'<dl><dt>Bedrooms</dt><dd>4</dd><dt>Bathrooms</dt><dd>2</dd>'
+                    f'<dt>Size</dt><dd>1,800 sqft</dd><dt>Furnishing</dt><dd>Unfurnished</dd></dl></html>')
+        else:
+            body = '<html>' + ''.join(
+                f'<div class="property-item"><h2>House {n} in Kandy</h2><a href="/ad/{n}">view</a>'
+                f'<span class="price">Rs {Site.prices.get(n, 50)},000</span><p>Nice house</p>'
+                f'<img src="/img/{n}-1.jpg"></div>' for n in range(4)) + '</html>'
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestScrapeDetails(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.tmp = tempfile.TemporaryDirectory()
+        Site.paths, Site.prices = [], {}
+        Site.in_flight = Site.max_in_flight = 0
+        # Compiled extractors keep the spec they were built from, base URL included
+        card_extractor.extractor_for.cache_clear()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def scrape(self, **config):
+        config = dict({'maxPages': 1, 'rateLimit': 0, 'parseWorkers': 0, 'enrich': False, 'details': True,
+                       'stateDir': self.tmp.name, 'httpCache': False, 'checkpoint': False}, **config)
+        with mock.patch.dict(site_specs.SPECS['house'], baseUrl=self.base, searchUrl=f'{self.base}/rent'):
+            return house_scraper.scrape_house(config)
+
+    def detail_requests(self):
+        return [path for path in Site.paths if path.startswith('/ad/')]
+
+    def test_detail_pages_fill_in_listings(self):
+        """Test that each new listing gets its detail page's description, gallery and facts."""
+        result = self.scrape()
+        self.assertEqual(len(result['listings']), 4)
+        listing = result['listings'][0]
+        self.assertIn('quiet family home', listing['description'])
+        self.assertNotIn('0771234567', listing['description'])
+        self.assertTrue(listing['piiDetected'])
+        self.assertEqual(listing['images'], ['/img/0-1.jpg', '/img/0-2.jpg'])
+        self.assertEqual((listing['beds'], listing['baths'], listing['size']), (4, 2, 1800))
+        self.assertEqual(listing['furnished'], 'Unfurnished')
+        self.assertEqual(result['stats']['details'], {'fetched': 4, 'reused': 0, 'failed': 0, 'maxInFlight': 2})
+        self.assertEqual(result['stats']['pipeline']['details']['listings'], 4)
+
+    def test_concurrency_is_capped_per_host(self):
+        """Test that detail fetches overlap but never exceed detailConcurrency per host."""
+        self.scrape(detailConcurrency=3)
+        self.assertEqual(len(self.detail_requests()), 4)
+        self.assertEqual(Site.max_in_flight, 3)
+
+    def test_results_page_rate_limit_does_not_serialize_details(self):
+        """Test that detail fetches overlap under a slow rateLimit and do not each wait it out."""
+        started = time.monotonic()
+        result = self.scrape(rateLimit=1000)
+        elapsed = time.monotonic() - started
+        self.assertEqual(len(self.detail_requests()), 4)
+        self.assertEqual(Site.max_in_flight, 2)
+        self.assertEqual(result['stats']['details']['maxInFlight'], 2)
+        # Four details at 1000ms apiece would take 3s or more
+        self.assertLess(elapsed, 1.5)
+
+    def test_unchanged_listings_reuse_stored_details(self):
+        """Test that a re-scrape only fetches detail pages of listings whose card changed."""
+        first = self.scrape()
+        Site.paths = []
+        Site.prices = {2: 65}
+        second = self.scrape()
+        self.assertEqual(self.detail_requests(), ['/ad/2'])
+        self.assertEqual(second['stats']['details'], {'fetched': 1, 'reused': 3, 'failed': 0, 'maxInFlight': 1})
+        self.assertEqual(second['listings'][0], first['listings'][0])
+        self.assertEqual(second['listings'][2]['price'], 65000)
+        self.assertEqual(second['listings'][2]['beds'], 4)
+
+    def test_failed_detail_keeps_card_listing(self):
+        """Test that a detail page that cannot be fetched leaves the card's listing as it was."""
+        with mock.patch('scrape_details.DetailFetcher.fetch', side_effect=ConnectionError('refused')):
+            result = self.scrape()
+        self.assertEqual(len(result['listings']), 4)
+        self.assertEqual(result['listings'][0]['description'], 'Nice house')
+        self.assertEqual(result['stats']['details']['failed'], 4)
+
+    def test_merge_keeps_what_the_card_knew(self):
+        """Test that merging never overwrites card values with shorter or empty detail values."""
+        listing = {'description': 'A long card description', 'beds': 3, 'baths': 0, 'size': 0,
+                   'furnished': 'Furnished', 'images': ['a.jpg'], 'piiDetails': ['email'], 'piiDetected': True}
+        merge_details(listing, {'description': 'Short', 'beds': 5, 'baths': 2, 'size': 0,
+                                'furnished': 'Unfurnished', 'images': ['a.jpg', 'b.jpg'], 'piiDetails': ['phone']})
+        self.assertEqual(listing['description'], 'A long card description')
+        self.assertEqual((listing['beds'], listing['baths'], listing['size']), (3, 2, 0))
+        self.assertEqual(listing['furnished'], 'Furnished')
+        self.assertEqual(listing['images'], ['a.jpg', 'b.jpg'])
+        self.assertEqual(listing['piiDetails'], ['email', 'phone'])
+
+    def test_content_hash_ignores_case_and_spacing(self):
+        """Test that the content hash changes with the listing's content but not its formatting."""
+        listing = {'title': 'House in Kandy', 'description': 'Nice  house', 'price': 50000,
+                   'location': {'town': 'Kandy'}, 'images': ['b.jpg', 'a.jpg']}
+        same = dict(listing, title='house in  KANDY', images=['a.jpg', 'b.jpg'])
+        self.assertEqual(content_hash(listing), content_hash(same))
+        self.assertNotEqual(content_hash(listing), content_hash(dict(listing, price=55000)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import house_scraper
+import site_specs
+import scrape_pipeline
+import card_extractor
+
+class Site(BaseHTTPRequestHandler):
+    """Six results pages of five cards."""
+    paths = []
+    prices = {}
+
+    def do_GET(self):
+        Site.paths.append(self.path)
+        page = int(self.path.split('page=')[1]) if 'page=' in self.path else 1
+        cards = ''.join(
+            f'<div class="property-item"><h2>House {page}-{n} for rent</h2><a href="/ad/{page}-{n}">view</a>'
+            f'<span class="price">Rs {Site.prices.get(f"{page}-{n}", 40 + n)},000</span><span class="location">Kandy, Central</span>'
+            f'<p>{n + 1} bed 1 bath, AC, close to the school</p></div>' for n in range(5))
+        body = f'<html>{cards}</html>'.encode() if page <= 6 else b'<html></html>'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestScrapePipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Site.paths, Site.prices = [], {}
+        # Compiled extractors keep the spec they were built from, base URL included
+        card_extractor.extractor_for.cache_clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scrape(self, **config):
+        config = dict({'maxPages': 6, 'rateLimit': 0, 'stateDir': self.tmp.name}, **config)
+        with mock.patch.dict(site_specs.SPECS['house'], baseUrl=self.base, searchUrl=f'{self.base}/rent'):
+            return house_scraper.scrape_house(config)
+
+    def test_process_pool_matches_inline_parse(self):
+        """Test that parsing on the pool yields the same listings, in page order."""
+        pooled = self.scrape(parseWorkers=2, enrich=False, httpCache=False)
+        inline = self.scrape(parseWorkers=0, enrich=False, httpCache=False, stateDir=self.tmp.name + '/inline')
+        self.assertEqual(pooled['listings'], inline['listings'])
+        self.assertEqual([l['sourceId'] for l in pooled['listings'][:6]], ['1-0', '1-1', '1-2', '1-3', '1-4', '2-0'])
+        pipeline = pooled['stats']['pipeline']
+        self.assertEqual((pipeline['fetch']['pages'], pipeline['parse']['pages']), (6, 6))
+        self.assertEqual(pipeline['enrich']['listings'], 0)
+        self.assertEqual(pooled['stats']['totalFound'], 30)
+
+    def test_parse_workers_do_not_inherit_held_locks(self):
+        """Test that pool workers parse even while another thread holds text_scanner's lock."""
+        import text_scanner
+        text_scanner._lock.acquire()
+        try:
+            result = self.scrape(maxPages=2, parseWorkers=2, enrich=False, httpCache=False, parseTimeout=20)
+        finally:
+            text_scanner._lock.release()
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(len(result['listings']), 10)
+
+    def test_stuck_parse_times_out_as_page_error(self):
+        """Test that a page whose parse never returns becomes an error instead of hanging the crawl."""
+        from concurrent.futures import ThreadPoolExecutor
+        release = threading.Event()
+        original = scrape_pipeline.parse_page
+
+        def stuck_on_page_2(slug, html, page, parser='lxml'):
+            if page == 2:
+                release.wait(10)
+            return original(slug, html, page, parser)
+
+        try:
+            with mock.patch.object(scrape_pipeline, 'parse_pool', lambda workers: ThreadPoolExecutor(workers)), \
+                    mock.patch.object(scrape_pipeline, 'parse_page', stuck_on_page_2):
+                result = self.scrape(maxPages=3, parseWorkers=2, enrich=False, httpCache=False, parseTimeout=0.3)
+        finally:
+            release.set()
+        self.assertEqual([(e['page'], e['message']) for e in result['errors']], [(2, 'Parse timed out after 0.3s')])
+        self.assertEqual(len(result['listings']), 10)
+
+    def test_enrich_stage_analyses_new_listings(self):
+        """Test that each listing carries analyser, scam and tag output, using town stats."""
+        local = {'kandy': {'avgPrice': 42000, 'avgBeds': 2, 'totalListings': 10}}
+        result = self.scrape(maxPages=1, parseWorkers=0, localStats=local)
+        analysis = result['listings'][0]['aiAnalysis']
+        self.assertTrue(analysis['localStatsUsed'])
+        self.assertEqual(analysis['priceRating'], 'Fair')
+        self.assertIn('ac', analysis['autoTags'])
+        self.assertIn(analysis['riskLevel'], ('LOW', 'MEDIUM', 'HIGH'))
+        self.assertEqual(result['stats']['pipeline']['enrich']['listings'], 5)
+
+    def test_unchanged_listings_keep_stored_analysis(self):
+        """Test that a re-crawl only re-analyses listings whose content or town stats changed."""
+        local = {'kandy': {'avgPrice': 42000, 'avgBeds': 2, 'totalListings': 10}}
+        first = self.scrape(maxPages=2, parseWorkers=0, localStats=local)
+        self.assertEqual(first['stats']['analysis']['analysed'], 10)
+
+        Site.prices = {'1-3': 95}
+        second = self.scrape(maxPages=2, parseWorkers=0, localStats=local)
+        self.assertEqual((second['stats']['analysis']['analysed'], second['stats']['analysis']['reused']), (1, 9))
+        self.assertEqual(second['listings'][0]['aiAnalysis'], first['listings'][0]['aiAnalysis'])
+        self.assertNotEqual(second['listings'][3]['aiAnalysis'], first['listings'][3]['aiAnalysis'])
+
+        local['kandy']['avgPrice'] = 60000
+        third = self.scrape(maxPages=2, parseWorkers=0, localStats=local)
+        self.assertEqual(third['stats']['analysis']['analysed'], 10)
+        uncached = self.scrape(maxPages=2, parseWorkers=0, localStats=local, analysisCache=False)
+        self.assertEqual(uncached['stats']['analysis']['reused'], 0)
+        self.assertEqual([l['aiAnalysis'] for l in uncached['listings']], [l['aiAnalysis'] for l in third['listings']])
+
+    def test_fetching_waits_for_slow_consumer(self):
+        """Test that no more than pipelineDepth pages are fetched ahead of enrichment."""
+        seen = []
+        original = scrape_pipeline.Enricher.enrich
+
+        def slow_enrich(enricher, listing):
+            seen.append(len(Site.paths))
+            threading.Event().wait(0.02)
+            original(enricher, listing)
+
+        with mock.patch.object(scrape_pipeline.Enricher, 'enrich', slow_enrich):
+            result = self.scrape(parseWorkers=0, pipelineDepth=2)
+        self.assertEqual(len(result['listings']), 30)
+        self.assertLessEqual(seen[0], 2)
+
+    def test_interrupted_crawl_resumes_from_checkpoint(self):
+        """Test that a resumed crawl skips finished pages yet returns every listing once."""
+        original = scrape_pipeline.Enricher.enrich
+
+        def crash_on_page_4(enricher, listing):
+            if listing['title'].startswith('House 4-'):
+                raise RuntimeError('killed')
+            original(enricher, listing)
+
+        with mock.patch.object(scrape_pipeline.Enricher, 'enrich', crash_on_page_4), \
+                self.assertRaises(RuntimeError):
+            self.scrape(parseWorkers=0, pipelineDepth=1)
+        checkpoints = os.path.join(self.tmp.name, 'checkpoints')
+        with open(os.path.join(checkpoints, 'house.ndjson'), 'a', encoding='utf-8') as f:
+            f.write('{"title": "torn wri')
+
+        Site.paths = []
+        result = self.scrape(parseWorkers=0, resume=True)
+        self.assertEqual(Site.paths, ['/rent?page=4', '/rent?page=5', '/rent?page=6'])
+        self.assertEqual([l['sourceId'] for l in result['listings']],
+                         [f'{page}-{n}' for page in range(1, 7) for n in range(5)])
+        self.assertIn('aiAnalysis', result['listings'][0])
+        self.assertEqual(result['stats']['checkpoint'], {'resumedAfterPage': 3, 'restoredListings': 15})
+        self.assertEqual((result['stats']['pagesScraped'], result['stats']['totalFound']), (6, 30))
+        self.assertEqual(os.listdir(checkpoints), [])
+
+        # Finished crawls leave nothing to resume; another crawl never resumes this one
+        Site.paths = []
+        self.scrape(maxPages=2, parseWorkers=0, enrich=False, resume=True)
+        self.assertEqual(len(Site.paths), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import house_scraper
+import site_specs
+from scrape_state import SourceState, Tracker, Checkpoint, recheck_source
+
+def card(n):
+    return (f'<div class="property-item"><h2>House {n} for rent</h2><a href="/ad/{n}">view</a>'
+            f'<span class="price">Rs {n},000</span><p>3 bed 2 bath</p></div>')
+
+class Site(BaseHTTPRequestHandler):
+    """Results pages of four cards, newest first; /ad/<n> detail pages."""
+    newest = 20
+    gone = set()
+    paths = []
+
+    def do_GET(self):
+        Site.paths.append(self.path)
+        if self.path.startswith('/ad/'):
+            status = 404 if self.path in Site.gone else 200
+            return self.reply(status, '<html>ad</html>')
+        page = int(self.path.split('page=')[1]) if 'page=' in self.path else 1
+        top = Site.newest - (page - 1) * 4
+        self.reply(200, '<html>' + ''.join(card(n) for n in range(top, top - 4, -1)) + '</html>')
+
+    def reply(self, status, body):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class TestScrapeState(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Site.newest, Site.gone, Site.paths = 20, set(), []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scrape(self, mode, max_pages=4):
+        config = {'maxPages': max_pages, 'rateLimit': 0, 'mode': mode, 'stateDir': self.tmp.name}
+        with mock.patch.dict(site_specs.SPECS['house'], baseUrl=self.base, searchUrl=f'{self.base}/rent'):
+            return house_scraper.scrape_house(config)
+
+    def test_incremental_stops_at_first_known_page(self):
+        """Test that a steady-state run fetches only the pages with new listings."""
+        self.assertEqual(len(self.scrape('full')['listings']), 16)
+        Site.newest, Site.paths = 22, []
+        result = self.scrape('incremental')
+        self.assertEqual([l['sourceId'] for l in result['listings']], ['22', '21'])
+        self.assertEqual(len(Site.paths), 2)
+        self.assertEqual(result['stats']['incremental']['stoppedAtPage'], 2)
+        self.assertEqual(result['stats']['incremental']['knownListings'], 18)
+
+    def test_recheck_fetches_only_stale_listings(self):
+        """Test that recheck visits stale detail pages and reports removed ones."""
+        state = SourceState('house', self.tmp.name)
+        now = time.time()
+        state.mark_seen([{'sourceId': str(n), 'sourceUrl': f'{self.base}/ad/{n}'} for n in (1, 2)], now - 3 * 86400)
+        state.mark_seen([{'sourceId': '3', 'sourceUrl': f'{self.base}/ad/3'}], now)
+        state.save()
+        Site.gone = {'/ad/2'}
+        result = recheck_source('house', {'rateLimit': 0, 'stateDir': self.tmp.name}, {})
+        self.assertEqual(sorted(Site.paths), ['/ad/1', '/ad/2'])
+        self.assertEqual({l['sourceId']: l['isActive'] for l in result['listings']}, {'1': True, '2': False})
+        self.assertEqual(set(SourceState('house', self.tmp.name).ids), {'1', '3'})
+
+    def test_state_files_are_replaced_atomically(self):
+        """Test that saving leaves only the state file, and full mode emits every listing."""
+        tracker = Tracker('ikman', {'mode': 'full', 'stateDir': self.tmp.name})
+        page = [{'sourceId': 'a'}, {'sourceId': 'b'}]
+        self.assertEqual(tracker.page_done(page), (page, True))
+        self.assertEqual(tracker.page_done(page), (page, True))
+        tracker.finish({})
+        self.assertEqual(os.listdir(self.tmp.name), ['ikman.json'])
+
+    def test_checkpoint_resumes_only_its_own_recent_crawl(self):
+        """Test that a checkpoint restores for the same URLs and mode, and not once stale."""
+        config = {'stateDir': self.tmp.name, 'resume': True}
+        urls = ['https://x.lk/rent', 'https://x.lk/rent?page=2']
+        checkpoint = Checkpoint('ikman', config, urls)
+        checkpoint.start()
+        stats = {'pagesScraped': 1, 'totalFound': 2, 'errors': 0}
+        checkpoint.page_done(1, [{'sourceId': 'a'}, {'sourceId': 'b'}], stats, [])
+        self.assertEqual(Checkpoint('ikman', config, urls).restore(),
+                         (1, [{'sourceId': 'a'}, {'sourceId': 'b'}], stats, []))
+        self.assertIsNone(Checkpoint('ikman', config, urls[:1]).restore())
+        self.assertIsNone(Checkpoint('ikman', dict(config, mode='incremental'), urls).restore())
+        self.assertIsNone(Checkpoint('ikman', dict(config, resume=False), urls).restore())
+        with mock.patch('time.time', return_value=time.time() + 25 * 3600):
+            self.assertIsNone(Checkpoint('ikman', config, urls).restore())
+        checkpoint.clear()
+        self.assertIsNone(Checkpoint('ikman', config, urls).restore())
+
+if __name__ == '__main__':
+    unittest.main()
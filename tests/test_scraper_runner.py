@@ -0,0 +1,156 @@
+import unittest
+import sys
+import os
+import io
+import json
+import time
+import types
+from unittest import mock
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+SCRAPERS_DIR = os.path.join(project_root, 'utils', 'scrapers')
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+import scraper_runner
+
+def fake_scraper(slug, delay, urls):
+    """A scraper module whose scrape function sleeps like a rate-limited crawl."""
+    def scrape(config):
+        time.sleep(delay)
+        return {
+            'listings': [{'title': f'{slug} {url}', 'sourceUrl': url} for url in urls],
+            'stats': {'pagesScraped': 1, 'totalFound': len(urls), 'errors': 0},
+            'errors': [],
+            'source': f'{slug}.lk',
+        }
+    module = types.ModuleType(f'{slug}_scraper')
+    module.scrape = scrape
+    return module
+
+def streaming_scraper(slug, delay, urls):
+    """A scraper module that emits its first page at once, then crawls on."""
+    def scrape(config):
+        config['emit'](1, [{'title': f'{slug} {urls[0]}', 'sourceUrl': urls[0]}])
+        time.sleep(delay)
+        config['emit'](2, [{'title': f'{slug} {url}', 'sourceUrl': url} for url in urls[1:]])
+        return {'listings': [], 'stats': {'pagesScraped': 2}, 'errors': [], 'source': f'{slug}.lk'}
+    module = types.ModuleType(f'{slug}_scraper')
+    module.scrape = scrape
+    return module
+
+class TestScraperRunner(unittest.TestCase):
+    def run_with(self, modules, sources, writer=None, registry=None):
+        scraper_map = {slug: (f'{slug}_scraper', 'scrape') for slug in modules}
+        registry = registry or scraper_runner.ScraperRegistry()
+        with mock.patch.dict(scraper_runner.SCRAPER_MAP, scraper_map), \
+                mock.patch.object(scraper_runner, 'REGISTRY', registry), \
+                mock.patch.object(scraper_runner, 'load_scraper', lambda name: modules.get(name[:-len('_scraper')])):
+            return scraper_runner.run_scrapers({'sources': sources}, writer)
+
+    def test_sources_run_concurrently(self):
+        """Test that wall time follows the slowest source rather than the sum."""
+        modules = {
+            'slow': fake_scraper('slow', 0.4, ['u1', 'u2']),
+            'fast': fake_scraper('fast', 0.1, ['u3']),
+            'mid': fake_scraper('mid', 0.2, ['u2', 'u4']),
+        }
+        started = time.time()
+        result = self.run_with(modules, [{'slug': s} for s in modules])
+        self.assertLess(time.time() - started, 0.6)
+        self.assertEqual(result['combined']['totalScraped'], 4)
+        self.assertEqual(result['combined']['duplicatesRemoved'], 1)
+        self.assertEqual(set(result['results']), {'slow', 'fast', 'mid'})
+        # Faster sources merge first
+        self.assertEqual(result['combined']['listings'][0]['_sourceSlug'], 'fast')
+
+    def test_failures_stay_per_source(self):
+        """Test that an unknown slug or a crashing scraper does not stop the others."""
+        broken = types.ModuleType('broken_scraper')
+        broken.scrape = lambda config: 1 / 0
+        modules = {'ok': fake_scraper('ok', 0, ['a']), 'broken': broken}
+        result = self.run_with(modules, [{'slug': 'ok'}, {'slug': 'broken'}, {'slug': 'nope'}])
+        self.assertEqual(result['combined']['totalScraped'], 1)
+        self.assertIn('error', result['results']['broken'])
+        self.assertEqual(sorted(e['source'] for e in result['errors']), ['broken', 'nope'])
+
+    def test_report_totals_skipped_analyses(self):
+        """Test that the run report adds up analyses run and reused across sources."""
+        results = {
+            'ikman': {'stats': {'analysis': {'analysed': 3, 'reused': 17, 'estimatedSecondsSaved': 0.25}}},
+            'lpw': {'stats': {'analysis': {'analysed': 5, 'reused': 0, 'estimatedSecondsSaved': 0.0}}},
+            'broken': {'stats': {}, 'error': 'boom'},
+        }
+        self.assertEqual(scraper_runner.analysis_report(results),
+                         {'analysed': 8, 'reused': 17, 'estimatedSecondsSaved': 0.25})
+        result = self.run_with({'ok': fake_scraper('ok', 0, ['a'])}, [{'slug': 'ok'}])
+        self.assertEqual(result['combined']['analysis']['reused'], 0)
+
+    def test_registry_loads_each_scraper_once(self):
+        """Test that later runs reuse the loaded module and a bad entry point is reported up front."""
+        loads = []
+        modules = {'ok': fake_scraper('ok', 0, ['a']), 'nofunc': types.ModuleType('nofunc_scraper')}
+        def load(name):
+            loads.append(name)
+            return modules.get(name[:-len('_scraper')])
+        registry = scraper_runner.ScraperRegistry()
+        with mock.patch.dict(scraper_runner.SCRAPER_MAP, {s: (f'{s}_scraper', 'scrape') for s in modules}), \
+                mock.patch.object(scraper_runner, 'REGISTRY', registry), \
+                mock.patch.object(scraper_runner, 'load_scraper', load):
+            for _ in range(3):
+                result = scraper_runner.run_scrapers({'sources': [{'slug': 'ok'}, {'slug': 'nofunc'}]})
+                self.assertEqual(result['combined']['totalScraped'], 1)
+                self.assertEqual(result['errors'], [{'source': 'nofunc', 'message': 'Scraper function not found: scrape'}])
+                self.assertNotIn('nofunc', result['results'])
+        self.assertEqual(sorted(loads), ['nofunc_scraper', 'ok_scraper'])
+
+    def test_real_scrapers_validate(self):
+        """Test that every mapped scraper module exists and exposes its entry function."""
+        registry = scraper_runner.ScraperRegistry()
+        self.assertEqual(registry.validate(scraper_runner.SCRAPER_MAP), {})
+        module, scrape = registry.get('ikman')
+        self.assertIs(scrape, module.scrape_ikman)
+        self.assertIs(registry.get('ikman')[0], sys.modules['ikman_scraper'])
+
+    def test_serve_answers_one_line_per_job(self):
+        """Test that serve mode runs each input line as a job and keeps going after a bad one."""
+        out = io.StringIO()
+        modules = {'ok': fake_scraper('ok', 0, ['a', 'b'])}
+        jobs = [json.dumps({'sources': [{'slug': 'ok'}]}), 'not json', '', json.dumps({'sources': [{'slug': 'ok'}]})]
+        with mock.patch.dict(scraper_runner.SCRAPER_MAP, {'ok': ('ok_scraper', 'scrape')}), \
+                mock.patch.object(scraper_runner, 'REGISTRY', scraper_runner.ScraperRegistry()), \
+                mock.patch.object(scraper_runner.ScraperRegistry, 'warm', lambda self: {}), \
+                mock.patch.object(scraper_runner, 'load_scraper', lambda name: modules.get(name[:-len('_scraper')])):
+            scraper_runner.serve(iter(jobs), out)
+        answers = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(answers), 3)
+        self.assertEqual([a.get('combined', {}).get('totalScraped') for a in answers], [2, None, 2])
+        self.assertIn('error', answers[1])
+
+    def test_ndjson_streams_listings_as_pages_finish(self):
+        """Test that NDJSON mode writes listings before their source finishes, stats last."""
+        out = io.StringIO()
+        modules = {
+            'stream': streaming_scraper('stream', 0.3, ['s1', 's2', 'f1']),
+            'fast': fake_scraper('fast', 0.1, ['f1', 'f2']),
+        }
+        stats = self.run_with(modules, [{'slug': 'stream'}, {'slug': 'fast'}, {'slug': 'nope'}],
+                              scraper_runner.NdjsonWriter(out))
+        lines = out.getvalue().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(lines, [json.dumps(r, ensure_ascii=False, separators=(',', ':')) for r in records])
+        kinds = [(r['type'], r.get('source') or r.get('error', {}).get('source')) for r in records]
+        self.assertEqual(kinds[:2], [('error', 'nope'), ('listing', 'stream')])
+        self.assertLess(kinds.index(('source', 'fast')), kinds.index(('source', 'stream')))
+        self.assertEqual(records[-1], stats)
+        self.assertEqual((stats['totalScraped'], stats['duplicatesRemoved']), (4, 1))
+        self.assertEqual(stats['results']['stream']['listingCount'], 3)
+        urls = [r['listing']['sourceUrl'] for r in records if r['type'] == 'listing']
+        self.assertEqual(sorted(urls), ['f1', 'f2', 's1', 's2'])
+
+if __name__ == '__main__':
+    unittest.main()
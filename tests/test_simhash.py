@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import random
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.duplicate_detector import index_record, listing_features, normalized_words, score_pair
+from utils.ai.minhash_index import MinHashIndex
+from utils.ai.simhash import MAX_DISTANCE, fingerprint, fingerprint_hex, from_hex, hamming, table_keys, to_hex
+
+DESCRIPTION = ('Spacious two bedroom annex near Kandy lake with parking, garden and hot water. '
+               'Quiet neighbourhood close to schools. Rent 35000, call 0771234567')
+
+class TestSimHash(unittest.TestCase):
+    def test_repost_with_new_contact_details_matches(self):
+        """Test that another phone number or price leaves the fingerprint unchanged."""
+        repost = DESCRIPTION.replace('0771234567', '+94 71 987 6543').replace('35000', '36000')
+        self.assertEqual(hamming(fingerprint(DESCRIPTION), fingerprint(repost)), 0)
+        other = 'Luxury apartment in Colombo 7 with pool, gym and sea view'
+        self.assertGreater(hamming(fingerprint(DESCRIPTION), fingerprint(other)), MAX_DISTANCE)
+        self.assertIsNone(fingerprint('  ... '))
+
+    def test_hex_round_trip(self):
+        """Test that fingerprints survive JSON as 16-char hex strings."""
+        fp = fingerprint(DESCRIPTION)
+        self.assertEqual(len(to_hex(fp)), 16)
+        self.assertEqual(from_hex(to_hex(fp)), fp)
+        self.assertEqual(fingerprint_hex(''), '')
+        self.assertIsNone(from_hex('not hex'))
+
+    def test_near_fingerprints_share_a_table_key(self):
+        """Test that any fingerprint within MAX_DISTANCE bits shares a lookup key."""
+        rng = random.Random(5)
+        for _ in range(200):
+            fp = rng.getrandbits(64)
+            near = fp
+            for bit in rng.sample(range(64), rng.randint(1, MAX_DISTANCE)):
+                near ^= 1 << bit
+            self.assertTrue(set(table_keys(fp)) & set(table_keys(near)))
+
+    def test_index_finds_reposted_description(self):
+        """Test that the catalogue index returns a listing whose description is a repost."""
+        index = MinHashIndex(tokenize=normalized_words)
+        index.upsert([index_record({'_id': 'a1', 'title': 'Annex for rent', 'description': DESCRIPTION}),
+                      index_record({'_id': 'a2', 'title': 'Villa', 'description': 'Sea view villa in Galle fort'})])
+        probe = {'_id': 'new', 'description': DESCRIPTION.replace('0771234567', '0719876543'),
+                 'descriptionSimhash': fingerprint_hex(DESCRIPTION.replace('0771234567', '0719876543'))}
+        self.assertEqual(index.simhash_candidate_ids(probe), {'a1'})
+
+        _, reasons = score_pair(listing_features(probe), listing_features(index.records(['a1'])[0]))
+        self.assertIn('Near-identical description', reasons)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import re
+
+# Add Backend to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.ai.spam_detector import SPAM_PATTERNS
+from utils.ai.auto_tagger import TAG_PATTERNS
+
+# The detectors import the scanner as a top-level module; share their registry
+import text_scanner
+
+class TestTextScanner(unittest.TestCase):
+    def test_literal_prefixes(self):
+        """Test that prefixes are derived from literals, branches and required repeats."""
+        self.assertEqual(text_scanner.literal_prefixes(r'(?:\+94|0)\s*\d'), {'+94', '0'})
+        self.assertEqual(text_scanner.literal_prefixes(r'\b(?<!smoke\s)FREE\b', re.I), {'free'})
+        self.assertEqual(text_scanner.literal_prefixes(r'\bnear\s+school\b|\bschool\s+nearby\b'), {'near', 'school'})
+        self.assertIsNone(text_scanner.literal_prefixes(r'(.)\1{5,}'))
+        self.assertIsNone(text_scanner.literal_prefixes(r'\s*free'))
+
+    def test_pii_hits_carry_spans(self):
+        """Test that a scan reports each PII type once, in rule order, with its span."""
+        text = 'Mail john@example.com or call 0771234567'
+        result = text_scanner.scan(text)
+        self.assertEqual(result.names('pii'), ['phone_number', 'email', 'whatsapp'])
+        email = result.first('pii')['email']
+        self.assertEqual(text[email.start:email.end], 'john@example.com')
+        self.assertIn((email.start, email.end, 'pii', 'email'), result.spans())
+
+    def test_matches_agree_with_separate_searches(self):
+        """Test that the prefix filter never hides a match a plain re.search would find."""
+        texts = [
+            'FULLY FURNISHED house near the beach, A/C, smoke free, WiFi',
+            'Deposit first!!!!!!! send money via Western Union https://example.com',
+            'quiet AND SPACIOUS ANNEX FOR RENT NOW bills included, near a school',
+            '',
+        ]
+        rules = [(p, f) for p, f, _ in SPAM_PATTERNS] + [(p, t) for p, t, _ in TAG_PATTERNS]
+        for text in texts:
+            result = text_scanner.scan(text)
+            found = {rule.regex.pattern for group in ('spam', 'tag') for rule, _ in result.matches(group)}
+            expected = {p for p, _ in rules if re.search(p, text, re.IGNORECASE)}
+            self.assertEqual(found, expected, text)
+
+    def test_redact_pii(self):
+        """Test that every PII match is replaced in one pass and clean text is untouched."""
+        self.assertEqual(text_scanner.redact_pii('a@b.com / 0771234567'), '[REDACTED] / [REDACTED]')
+        self.assertEqual(text_scanner.redact_pii('Two bedroom annex'), 'Two bedroom annex')
+
+    def test_repeat_text_reuses_scan(self):
+        """Test that detectors asking about the same text share one scan."""
+        text = 'Brand new house with parking'
+        self.assertIs(text_scanner.scan(text), text_scanner.scan(text))
+
+if __name__ == '__main__':
+    unittest.main()
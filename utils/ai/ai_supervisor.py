@@ -0,0 +1,447 @@
+"""
+AI Supervisor — Pre-forked pool of ai_worker.py processes behind one NDJSON pipe.
+
+One worker is bound by the GIL, so the supervisor starts N workers (each with
+every utils/ai module already imported) and routes each request to the
+least-loaded one. Crashed workers are restarted after a backoff that doubles
+while they keep dying young; a slot that crashes max_restarts times in a row
+is given up, and once every slot is, queued requests fail instead of waiting.
+Workers whose resident memory grows past a threshold are drained and replaced.
+
+Protocol: identical to ai_worker.py, plus one reserved script:
+Request:  { "id": "...", "script": "__stats__" }
+Response: { "id": "...", "ok": true, "result": { "queueDepth": N, "workers": [...], ... } }
+
+Batch requests are split into chunks spread over the pool; partial results
+are streamed back with their original batch index, then one "done" line.
+
+Usage:
+    python ai_supervisor.py --workers 4 --max-rss-mb 300
+"""
+import sys
+import json
+import os
+import time
+import math
+import argparse
+import threading
+import itertools
+import subprocess
+from collections import deque
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(AI_DIR, 'ai_worker.py')
+
+STATS_SCRIPT = '__stats__'
+PING_SCRIPT = '__ping__'
+
+# Upper bound on items per batch chunk sent to one worker
+MAX_CHUNK = 500
+# Longest wait before restarting a crashed worker
+MAX_RESTART_BACKOFF = 30.0
+
+# ──────────────────────────────────────────────
+#   WORKER HANDLE
+# ──────────────────────────────────────────────
+
+def read_rss_kb(pid):
+    """Resident set size of a process in KB, or 0 where /proc is unavailable."""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+class WorkerHandle:
+    """One ai_worker.py child process and its in-flight bookkeeping."""
+
+    def __init__(self, slot, python=sys.executable):
+        self.slot = slot
+        self.proc = subprocess.Popen(
+            [python, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        self.in_flight = {}
+        self.served = 0
+        self.failed = 0
+        self.retiring = False
+        self.started_at = time.monotonic()
+        self.busy_since = None
+        self.busy_seconds = 0.0
+        self.last_ping = time.monotonic()
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def send(self, internal_id, request):
+        if not self.in_flight:
+            self.busy_since = time.monotonic()
+        self.in_flight[internal_id] = request
+        message = {'id': internal_id, 'script': request.get('script')}
+        if 'batch' in request:
+            message['batch'] = request['batch']
+        else:
+            message['payload'] = request.get('payload')
+        line = json.dumps(message, ensure_ascii=False)
+        self.proc.stdin.write(line + '\n')
+        self.proc.stdin.flush()
+
+    def complete(self, internal_id):
+        request = self.in_flight.pop(internal_id, None)
+        if not self.in_flight and self.busy_since is not None:
+            self.busy_seconds += time.monotonic() - self.busy_since
+            self.busy_since = None
+        return request
+
+    def utilisation(self):
+        """Fraction of this worker's lifetime spent with at least one request in flight."""
+        now = time.monotonic()
+        busy = self.busy_seconds + (now - self.busy_since if self.busy_since is not None else 0)
+        alive = max(now - self.started_at, 1e-9)
+        return round(busy / alive, 4)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+
+# ──────────────────────────────────────────────
+#   SUPERVISOR
+# ──────────────────────────────────────────────
+
+class Supervisor:
+    """Routes NDJSON requests across a pool of workers."""
+
+    def __init__(self, writer, workers=2, max_in_flight=8, max_rss_mb=0,
+                 ping_interval=15.0, ping_timeout=10.0,
+                 restart_backoff=0.5, max_restarts=5, stable_after=30.0):
+        self.writer = writer
+        self.size = max(1, workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_rss_kb = int(max_rss_mb * 1024)
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.restart_backoff = restart_backoff
+        self.max_restarts = max_restarts
+        # A worker that ran this long before crashing resets its slot's crash count
+        self.stable_after = stable_after
+
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.queue = deque()
+        self.workers = []
+        self.retired = []
+        self.restarts = 0
+        self.recycled = 0
+        self.crashes = [0] * self.size
+        self.abandoned = set()
+        self.script_counts = {}
+        self.closing = False
+
+        for slot in range(self.size):
+            self.workers.append(self._start_worker(slot))
+
+        self.health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self.health_thread.start()
+
+    # ── worker lifecycle ──
+
+    def _start_worker(self, slot):
+        handle = WorkerHandle(slot)
+        threading.Thread(target=self._read_loop, args=(handle,), daemon=True).start()
+        return handle
+
+    def _read_loop(self, handle):
+        """Route one worker's responses back to the caller until it exits."""
+        for line in handle.proc.stdout:
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            with self.cond:
+                if response.get('partial'):
+                    request = handle.in_flight.get(response.get('id'))
+                    if request is not None:
+                        self._forward_partial(request, response)
+                    continue
+                request = handle.complete(response.get('id'))
+                if request is None:
+                    continue
+                if '_job' in request:
+                    handle.served += 1
+                    self._finish_chunk(request, response.get('error'))
+                elif request.get('_internal'):
+                    handle.last_ping = time.monotonic()
+                else:
+                    handle.served += 1
+                    if not response.get('ok'):
+                        handle.failed += 1
+                    response['id'] = request.get('id')
+                    self._write(response)
+                self._check_memory(handle)
+                self._drain_queue()
+                self.cond.notify_all()
+        handle.proc.wait()
+        with self.cond:
+            self._on_exit(handle)
+            self.cond.notify_all()
+
+    def _on_exit(self, handle):
+        """Fail a dead worker's in-flight requests and refill its slot."""
+        for internal_id in list(handle.in_flight):
+            request = handle.complete(internal_id)
+            if request.get('_internal'):
+                continue
+            if '_job' in request:
+                self._finish_chunk(request, f'AI worker {handle.pid} exited with code {handle.proc.returncode}')
+                continue
+            self._write({
+                'id': request.get('id'), 'ok': False,
+                'error': f'AI worker {handle.pid} exited with code {handle.proc.returncode}',
+            })
+        if handle in self.retired:
+            self.retired.remove(handle)
+            return
+        if handle in self.workers and not self.closing:
+            self._schedule_restart(handle)
+
+    def _schedule_restart(self, handle):
+        """Restart a crashed worker's slot after a backoff, or give the slot up."""
+        slot = handle.slot
+        if time.monotonic() - handle.started_at >= self.stable_after:
+            self.crashes[slot] = 0
+        self.crashes[slot] += 1
+        if self.crashes[slot] > self.max_restarts:
+            self.abandoned.add(slot)
+            self._drain_queue()
+            return
+        delay = min(MAX_RESTART_BACKOFF, self.restart_backoff * 2 ** (self.crashes[slot] - 1))
+        timer = threading.Timer(delay, self._restart, args=(slot,))
+        timer.daemon = True
+        timer.start()
+
+    def _restart(self, slot):
+        with self.cond:
+            if self.closing:
+                return
+            self.restarts += 1
+            self.workers[slot] = self._start_worker(slot)
+            self._drain_queue()
+            self.cond.notify_all()
+
+    # ── batches ──
+
+    def _submit_batch(self, request):
+        """Split a batch into chunks so every worker takes a share."""
+        batch = request.get('batch')
+        if not isinstance(batch, list):
+            self._write({'id': request.get('id'), 'ok': False, 'error': 'batch must be a JSON array'})
+            return
+        job = {'id': request.get('id'), 'count': len(batch), 'failed': 0, 'pending': 0}
+        chunk = max(1, min(MAX_CHUNK, math.ceil(len(batch) / self.size)))
+        for offset in range(0, len(batch), chunk):
+            job['pending'] += 1
+            self.queue.append({
+                'script': request.get('script'),
+                'batch': batch[offset:offset + chunk],
+                '_job': job,
+                '_offset': offset,
+                '_seen': set(),
+            })
+        if not job['pending']:
+            self._write({'id': job['id'], 'done': True, 'ok': True, 'count': 0, 'failed': 0})
+
+    def _forward_partial(self, request, response):
+        job = request['_job']
+        index = request['_offset'] + response.get('index', 0)
+        request['_seen'].add(response.get('index', 0))
+        if not response.get('ok'):
+            job['failed'] += 1
+        response['id'] = job['id']
+        response['index'] = index
+        self._write(response)
+
+    def _finish_chunk(self, request, error=None):
+        """Close one chunk; items it never answered are reported as failed."""
+        job = request['_job']
+        if error:
+            for i in range(len(request['batch'])):
+                if i not in request['_seen']:
+                    job['failed'] += 1
+                    self._write({'id': job['id'], 'partial': True, 'index': request['_offset'] + i,
+                                 'ok': False, 'error': error})
+        job['pending'] -= 1
+        if job['pending'] == 0:
+            self._write({'id': job['id'], 'done': True, 'ok': True,
+                         'count': job['count'], 'failed': job['failed']})
+
+    def _check_memory(self, handle):
+        """Replace a worker whose RSS passed the threshold once it is idle."""
+        if self.max_rss_kb and not handle.retiring and not self.closing \
+                and read_rss_kb(handle.pid) > self.max_rss_kb:
+            handle.retiring = True
+            self.recycled += 1
+            self.retired.append(handle)
+            self.workers[handle.slot] = self._start_worker(handle.slot)
+        if handle.retiring and not handle.in_flight:
+            handle.close()
+
+    def _health_loop(self):
+        """Ping idle workers; kill any that stop answering so they get restarted."""
+        while True:
+            time.sleep(self.ping_interval)
+            with self.cond:
+                if self.closing:
+                    return
+                now = time.monotonic()
+                for handle in list(self.workers):
+                    if handle.proc.poll() is not None:
+                        continue
+                    pinging = any(r.get('_internal') for r in handle.in_flight.values())
+                    if pinging and now - handle.last_ping > self.ping_interval + self.ping_timeout:
+                        handle.proc.kill()
+                    elif not pinging:
+                        self._send(handle, {'script': PING_SCRIPT, '_internal': True})
+
+    # ── routing ──
+
+    def _pick_worker(self):
+        candidates = [
+            w for w in self.workers
+            if not w.retiring and w.proc.poll() is None and len(w.in_flight) < self.max_in_flight
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda w: (len(w.in_flight), w.served))
+
+    def _send(self, handle, request):
+        try:
+            handle.send(next(self.ids), request)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _drain_queue(self):
+        if self.queue and len(self.abandoned) == self.size:
+            self._fail_queue(f'AI workers crashed {self.max_restarts + 1} times in a row; not restarting them')
+            return
+        while self.queue:
+            handle = self._pick_worker()
+            if handle is None:
+                return
+            request = self.queue.popleft()
+            if not self._send(handle, request):
+                self.queue.appendleft(request)
+                return
+
+    def _fail_queue(self, error):
+        while self.queue:
+            request = self.queue.popleft()
+            if '_job' in request:
+                self._finish_chunk(request, error)
+            else:
+                self._write({'id': request.get('id'), 'ok': False, 'error': error})
+
+    def submit(self, request):
+        """Queue one decoded request; control scripts are answered inline."""
+        script = os.path.basename(request.get('script') or '')
+        if script == STATS_SCRIPT:
+            self._write({'id': request.get('id'), 'ok': True, 'result': self.stats()})
+            return
+        with self.cond:
+            key = script[:-3] if script.endswith('.py') else script
+            self.script_counts[key] = self.script_counts.get(key, 0) + 1
+            if 'batch' in request:
+                self._submit_batch(request)
+            else:
+                self.queue.append(request)
+            self._drain_queue()
+
+    def stats(self):
+        """Queue depth, per-worker utilisation and restart counters."""
+        with self.cond:
+            return {
+                'queueDepth': len(self.queue),
+                'inFlight': sum(len(w.in_flight) for w in self.workers + self.retired),
+                'restarts': self.restarts,
+                'abandonedSlots': sorted(self.abandoned),
+                'recycled': self.recycled,
+                'requestsByScript': dict(self.script_counts),
+                'workers': [{
+                    'slot': w.slot,
+                    'pid': w.pid,
+                    'inFlight': len(w.in_flight),
+                    'served': w.served,
+                    'failed': w.failed,
+                    'utilisation': w.utilisation(),
+                    'rssKb': read_rss_kb(w.pid),
+                } for w in self.workers],
+            }
+
+    def _write(self, response):
+        with self.write_lock:
+            self.writer.write(json.dumps(response, ensure_ascii=False) + '\n')
+            self.writer.flush()
+
+    def shutdown(self):
+        """Wait for queued and in-flight requests, then stop every worker."""
+        with self.cond:
+            while self.queue or any(
+                    any(not r.get('_internal') for r in w.in_flight.values())
+                    for w in self.workers + self.retired):
+                self.cond.wait(timeout=1.0)
+            self.closing = True
+            handles = self.workers + self.retired
+        for handle in handles:
+            handle.close()
+        for handle in handles:
+            handle.proc.wait()
+
+def serve_stream(reader, writer, **options):
+    """Read NDJSON requests from reader and answer them through a worker pool."""
+    supervisor = Supervisor(writer, **options)
+    for line in reader:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            supervisor._write({'id': None, 'ok': False, 'error': f'Invalid JSON: {str(e)}'})
+            continue
+        if not isinstance(request, dict):
+            supervisor._write({'id': None, 'ok': False, 'error': 'Request must be a JSON object'})
+            continue
+        for key in [k for k in request if k.startswith('_')]:
+            request.pop(key)
+        supervisor.submit(request)
+    supervisor.shutdown()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-forked AI worker pool')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-in-flight', type=int, default=8, help='Requests per worker before queueing')
+    parser.add_argument('--max-rss-mb', type=float, default=0, help='Recycle a worker above this RSS (0 = off)')
+    parser.add_argument('--ping-interval', type=float, default=15.0)
+    parser.add_argument('--max-restarts', type=int, default=5, help='Crashes in a row before a slot is given up')
+    args = parser.parse_args()
+
+    sys.stdin = open(sys.stdin.fileno(), 'r', encoding='utf-8', closefd=False)
+    sys.stdout = open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+    serve_stream(
+        sys.stdin, sys.stdout,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        max_rss_mb=args.max_rss_mb,
+        ping_interval=args.ping_interval,
+        max_restarts=args.max_restarts,
+    )
@@ -0,0 +1,183 @@
+"""
+AI Worker — Long-lived Python process serving every AI script over one pipe.
+
+Imports each utils/ai module (and the root ai_service.py) once at startup so
+requests skip interpreter start-up, module import and regex compilation.
+Requests are routed through dispatcher.py, so "script" may be a script file
+name ("pricing_engine.py") or a registered function name ("suggest_price").
+
+Protocol: newline-delimited JSON, one object per line.
+Request:  { "id": "...", "script": "pricing_engine.py", "payload": {...} }
+Response: { "id": "...", "ok": true, "result": {...} }
+          { "id": "...", "ok": false, "error": "..." }
+
+Batch request: { "id": "...", "script": "spam_detector.py", "batch": [{...}, {...}] }
+Streams one line per item as it finishes, then a closing summary line:
+          { "id": "...", "partial": true, "index": 0, "ok": true, "result": {...} }
+          { "id": "...", "done": true, "ok": true, "count": N, "failed": N }
+
+Requests are handled on a thread pool, so several can be in flight at once and
+responses may come back out of order; callers match them by "id".
+The reserved script "__ping__" answers with the worker pid for health checks,
+straight from the reading thread so it never waits behind the pool, and
+"__stats__" with per-function call timings and result-cache counters.
+
+Usage:
+    python ai_worker.py                       # serve on stdin/stdout
+    python ai_worker.py --socket /tmp/ai.sock # serve on a Unix socket
+"""
+import sys
+import json
+import os
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import dispatcher
+
+# Import every registered module once, before the first request arrives
+dispatcher.warm()
+
+PING_SCRIPT = '__ping__'
+STATS_SCRIPT = '__stats__'
+
+# ──────────────────────────────────────────────
+#   REQUEST HANDLING
+# ──────────────────────────────────────────────
+
+def handle_request(request):
+    """Run one decoded request through the dispatcher and build its tagged response."""
+    req_id = request.get('id')
+    script = request.get('script', '')
+    payload = request.get('payload') or {}
+    if script == PING_SCRIPT:
+        return {'id': req_id, 'ok': True, 'result': {'pid': os.getpid()}}
+    if script == STATS_SCRIPT:
+        return {'id': req_id, 'ok': True, 'result': {
+            'pid': os.getpid(), 'functions': dispatcher.stats(), 'cache': dispatcher.cache_stats()}}
+    try:
+        name = dispatcher.resolve(script, payload)
+        return {'id': req_id, 'ok': True, 'result': dispatcher.dispatch(name, payload)}
+    except Exception as e:
+        return {'id': req_id, 'ok': False, 'error': str(e)}
+
+def handle_batch(request):
+    """Run a batch request in-process, yielding partial results then a summary."""
+    req_id = request.get('id')
+    batch = request.get('batch')
+    if not isinstance(batch, list):
+        yield {'id': req_id, 'ok': False, 'error': 'batch must be a JSON array'}
+        return
+    try:
+        name = dispatcher.resolve(request.get('script', ''), batch[0] if batch else {})
+        failed = 0
+        for index, ok, value in dispatcher.iter_batch(name, batch):
+            failed += 0 if ok else 1
+            item = {'id': req_id, 'partial': True, 'index': index, 'ok': ok}
+            item['result' if ok else 'error'] = value
+            yield item
+    except Exception as e:
+        yield {'id': req_id, 'ok': False, 'error': str(e)}
+        return
+    yield {'id': req_id, 'done': True, 'ok': True, 'count': len(batch), 'failed': failed}
+
+def decode_line(line):
+    """Decode one NDJSON request line into (request, error_response)."""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return None, {'id': None, 'ok': False, 'error': f'Invalid JSON: {str(e)}'}
+    if not isinstance(request, dict):
+        return None, {'id': None, 'ok': False, 'error': 'Request must be a JSON object'}
+    return request, None
+
+def handle_line(line):
+    """Decode and run one single-payload request; malformed lines get an id-less error."""
+    request, error = decode_line(line)
+    return error or handle_request(request)
+
+def iter_responses(line):
+    """Every response line owed for one request line (several for a batch)."""
+    request, error = decode_line(line)
+    if error:
+        yield error
+    elif 'batch' in request:
+        yield from handle_batch(request)
+    else:
+        yield handle_request(request)
+
+def serve_stream(reader, writer, max_in_flight=8):
+    """Serve NDJSON requests from reader, writing responses as they finish."""
+    write_lock = threading.Lock()
+
+    def write(response):
+        payload = json.dumps(response, ensure_ascii=False) + '\n'
+        with write_lock:
+            writer.write(payload)
+            writer.flush()
+
+    def respond(line):
+        for response in iter_responses(line):
+            write(response)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for line in reader:
+            line = line.strip()
+            if not line:
+                continue
+            if PING_SCRIPT in line:
+                request, _ = decode_line(line)
+                # Answered here rather than queued behind long requests, so a busy worker still looks alive
+                if request is not None and request.get('script') == PING_SCRIPT and 'batch' not in request:
+                    write(handle_request(request))
+                    continue
+            pool.submit(respond, line)
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        reader = (raw.decode('utf-8') for raw in self.rfile)
+        writer = _SocketWriter(self.wfile)
+        serve_stream(reader, writer, self.server.max_in_flight)
+
+class _SocketWriter:
+    """Text adapter so serve_stream can write to a binary socket file."""
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
+
+def serve_socket(path, max_in_flight=8):
+    """Serve the same protocol on a Unix socket, one stream per connection."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socketserver.ThreadingUnixStreamServer(path, _SocketHandler)
+    server.max_in_flight = max_in_flight
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Persistent AI script worker')
+    parser.add_argument('--socket', help='Serve on this Unix socket path instead of stdin/stdout')
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.socket:
+        serve_socket(args.socket, args.max_in_flight)
+    else:
+        sys.stdin = open(sys.stdin.fileno(), 'r', encoding='utf-8', closefd=False)
+        sys.stdout = open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+        serve_stream(sys.stdin, sys.stdout, args.max_in_flight)
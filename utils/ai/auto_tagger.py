@@ -1,7 +1,14 @@
 import sys
+import os
 import json
 import re
 
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import text_scanner
+
 # Tag patterns: (regex_pattern, tag_name, display_label)
 TAG_PATTERNS = [
     # Furnishing
@@ -47,13 +54,16 @@ TAG_PATTERNS = [
     (r'\b(?:close|near)\s+(?:to\s+)?(?:colombo|city)\b', 'near_city', 'Close to Colombo'),
 ]
 
+text_scanner.register('tag', [(tag_name, pattern, label) for pattern, tag_name, label in TAG_PATTERNS],
+                      re.IGNORECASE)
+
 
 def extract_tags(data):
     """
     Extracts tags from listing description and amenities.
     """
-    description = data.get('description', '').lower()
-    title = data.get('title', '').lower()
+    description = data.get('description', '')
+    title = data.get('title', '')
     amenities = data.get('amenities', {})
     furnished = data.get('furnished', '')
 
@@ -63,9 +73,10 @@ def extract_tags(data):
     nearby_places = []
     tag_names_set = set()  # avoid duplicates
 
-    # 1. Pattern-based extraction from text
-    for pattern, tag_name, label in TAG_PATTERNS:
-        if tag_name not in tag_names_set and re.search(pattern, combined_text, re.IGNORECASE):
+    # 1. Pattern-based extraction from text (patterns are case-insensitive)
+    for rule, _ in text_scanner.scan(combined_text).matches('tag'):
+        tag_name, label = rule.name, rule.meta
+        if tag_name not in tag_names_set:
             tag_names_set.add(tag_name)
             entry = {"tag": tag_name, "label": label, "source": "text"}
             if tag_name.startswith('near_') or tag_name in ('bus_route', 'main_road'):
@@ -106,14 +117,5 @@ def extract_tags(data):
 
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-
-        data = json.loads(input_data)
-        result = extract_tags(data)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("extract_tags", sys.modules[__name__])
@@ -0,0 +1,143 @@
+"""
+Blocking — Skip duplicate comparisons that cannot reach the score cut-off.
+
+Listings are grouped by a block key: town, property type, bed/bath count and
+a log-price band. Everything duplicate_detector.score_pair() awards for
+attributes depends only on those fields, so two blocks give an upper bound
+on the score of any pair drawn from them:
+
+    town 25 + type 15 + beds/baths 20 + price 15|10 + title 25 + description 10
+
+A block whose bound stays below DUPLICATE_THRESHOLD is never compared. The
+price band is ln(price) / -ln(0.95): prices within 5% land in the same or
+an adjacent band, and prices within 10% are at most 3 bands apart, so the
+bound never undercounts.
+
+    blocks = BlockIndex(existing_listings)
+    kept = blocks.viable_blocks(block_key(new_listing))
+    blocks.members(kept)  -> the only listings worth scoring
+    blocks.report(kept)   -> {"blocks": 40, "blocksKept": 6, "pairsPruned": ...}
+"""
+import math
+import itertools
+from collections import OrderedDict, namedtuple
+
+DUPLICATE_THRESHOLD = 50
+# Most that title (25) and description (10) similarity can add
+TEXT_MAX = 35
+PRICE_BAND_WIDTH = -math.log(0.95)
+# Points for sharing each exact-match attribute ('beds' means beds and baths)
+ATTRIBUTE_POINTS = (('town', 25), ('type', 15), ('beds', 20))
+PRICE_MAX = 15
+
+BlockKey = namedtuple('BlockKey', ['town', 'type', 'beds', 'baths', 'band'])
+
+def price_band(price):
+    """Log-price band, or None when the price is unknown."""
+    if not isinstance(price, (int, float)) or not 0 < price < float('inf'):
+        return None
+    return math.floor(math.log(price) / PRICE_BAND_WIDTH)
+
+def block_key(listing):
+    """Block key of a listing, normalized the way score_pair() compares fields."""
+    return BlockKey(
+        (listing.get('town') or '').lower(),
+        (listing.get('type') or '').lower(),
+        listing.get('beds', 0),
+        listing.get('baths', 0),
+        price_band(listing.get('price', 0)),
+    )
+
+def max_score(a, b, with_text=True):
+    """Upper bound on score_pair() for any listings with block keys a and b."""
+    score = 0
+    if a.town and a.town == b.town:
+        score += 25
+    if a.type and a.type == b.type:
+        score += 15
+    if a.beds == b.beds and a.baths == b.baths and is_positive(a.beds):
+        score += 20
+    if a.band is not None and b.band is not None:
+        distance = abs(a.band - b.band)
+        score += 15 if distance <= 1 else 10 if distance <= 3 else 0
+    return score + (TEXT_MAX if with_text else 0)
+
+def is_positive(value):
+    try:
+        return value > 0
+    except TypeError:
+        return False
+
+def can_reach_threshold(a, b, with_text=True, threshold=DUPLICATE_THRESHOLD):
+    return max_score(a, b, with_text) >= threshold
+
+def attribute_groups(threshold=DUPLICATE_THRESHOLD):
+    """
+    Minimal sets of shared attributes that can reach threshold without any
+    text similarity: every such pair shares all attributes of one set.
+    """
+    groups = []
+    for size in range(1, len(ATTRIBUTE_POINTS) + 1):
+        for combo in itertools.combinations(ATTRIBUTE_POINTS, size):
+            fields = tuple(name for name, _ in combo)
+            if sum(points for _, points in combo) + PRICE_MAX < threshold:
+                continue
+            if not any(set(group) <= set(fields) for group in groups):
+                groups.append(fields)
+    return groups
+
+def group_key(key, fields):
+    """Values of a block key for an attribute group, or None when one is missing."""
+    values = []
+    for field in fields:
+        if field == 'beds':
+            if not is_positive(key.beds):
+                return None
+            values.append((key.beds, key.baths))
+        else:
+            value = getattr(key, field)
+            if not value:
+                return None
+            values.append(value)
+    return tuple(values)
+
+class BlockIndex:
+    """Listings grouped by block key."""
+
+    def __init__(self, listings=()):
+        self.blocks = OrderedDict()
+        self.keys = []  # block key of each listing, in insertion order
+        for listing in listings:
+            self.add(listing)
+
+    @property
+    def size(self):
+        return len(self.keys)
+
+    def add(self, listing, key=None):
+        key = key or block_key(listing)
+        self.blocks.setdefault(key, []).append(listing)
+        self.keys.append(key)
+
+    def viable_blocks(self, key, with_text=True, threshold=DUPLICATE_THRESHOLD):
+        """[(block key, members)] for blocks that could reach the cut-off against key."""
+        return [(other, members) for other, members in self.blocks.items()
+                if can_reach_threshold(key, other, with_text, threshold)]
+
+    def members(self, kept):
+        """Listings of the kept blocks, in insertion order."""
+        wanted = {key for key, _ in kept}
+        cursors = {key: iter(members) for key, members in kept}
+        return [next(cursors[key]) for key in self.keys if key in wanted]
+
+    def report(self, kept):
+        """How much of the comparison space the kept blocks pruned."""
+        pairs_kept = sum(len(members) for _, members in kept)
+        return {
+            'blocks': len(self.blocks),
+            'blocksKept': len(kept),
+            'pairs': self.size,
+            'pairsKept': pairs_kept,
+            'pairsPruned': self.size - pairs_kept,
+            'prunedRatio': round(1 - pairs_kept / self.size, 4) if self.size else 0.0,
+        }
@@ -59,17 +59,5 @@ def estimate_commute(origin_town, destination_hub="colombo"):
     return results
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-            
-        data = json.loads(input_data)
-        town = data.get('town', 'Colombo')
-        destination = data.get('destination', 'Colombo')
-        
-        commute_data = estimate_commute(town, destination)
-        print(json.dumps(commute_data))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("estimate_commute", sys.modules[__name__])
@@ -134,7 +134,5 @@ def generate_comparison(listings):
     }
 
 if __name__ == '__main__':
-    input_data = json.loads(sys.stdin.read())
-    listings = input_data.get('listings', [])
-    result = generate_comparison(listings)
-    print(json.dumps(result))
+    from dispatcher import run_cli
+    run_cli('generate_comparison', sys.modules[__name__])
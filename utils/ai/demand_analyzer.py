@@ -104,7 +104,5 @@ def analyze_demand(town_data):
     }
 
 if __name__ == '__main__':
-    input_data = json.loads(sys.stdin.read())
-    towns = input_data.get('towns', [])
-    result = analyze_demand(towns)
-    print(json.dumps(result))
+    from dispatcher import run_cli
+    run_cli('analyze_demand', sys.modules[__name__])
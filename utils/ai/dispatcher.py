@@ -0,0 +1,346 @@
+"""
+Dispatcher — Single registry of AI entry functions shared by every call path.
+
+Each entry function is registered once under a stable name together with the
+script it lives in, how the JSON payload maps onto its arguments and the
+shape of its input. The per-script __main__ blocks (spawn path), ai_worker.py
+and ai_supervisor.py all call through dispatch(), so batching, caching and
+timing can be added here once instead of in every script.
+
+Entries registered with cacheable=True are pure functions of their payload;
+their results are served from result_cache.py when the same input repeats.
+
+    dispatch('suggest_price', {"town": "Kandy", "beds": 2})
+    dispatch(resolve('pricing_engine.py', payload), payload)
+    dispatch_batch('detect_spam', [listing1, listing2, ...])
+"""
+import sys
+import json
+import os
+import time
+import threading
+import importlib
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(AI_DIR, '..', '..'))
+
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import result_cache
+
+# JSON type names used by input schemas
+JSON_TYPES = {
+    'string': (str,),
+    'number': (int, float),
+    'boolean': (bool,),
+    'object': (dict,),
+    'array': (list,),
+}
+
+# ──────────────────────────────────────────────
+#   REGISTRY
+# ──────────────────────────────────────────────
+
+class Entry:
+    """One registered AI function and how to call it from a JSON payload."""
+
+    def __init__(self, name, module, function, params=None, schema=None,
+                 error_fields=None, requires_input=True, path=None,
+                 cacheable=False, data_files=()):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.params = params
+        self.schema = schema or {}
+        self.error_fields = error_fields or {}
+        self.requires_input = requires_input
+        self.path = path
+        self.cacheable = cacheable
+        self.data_files = data_files
+
+    def version(self):
+        """Hash of the module source and data files, used in cache keys."""
+        source = self.path or os.path.join(AI_DIR, f'{self.module}.py')
+        return result_cache.code_version([source] + [os.path.join(AI_DIR, f) for f in self.data_files])
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'script': f'{self.module}.py',
+            'function': self.function,
+            'input': self.schema,
+            'cacheable': self.cacheable,
+        }
+
+REGISTRY = {}
+SCRIPTS = {}
+STATS = {}
+_stats_lock = threading.Lock()
+
+# Process-wide result cache (None when AI_CACHE=off)
+CACHE = result_cache.from_env()
+
+def register(name, module, function=None, params=None, schema=None, **options):
+    """
+    Register an entry function.
+    params: list of (field, default) pairs passed positionally; None passes the whole payload.
+    schema: {field: json_type} for fields given as a whole payload.
+    """
+    if params is not None:
+        schema = {field: _json_type(default) for field, default in params}
+    REGISTRY[name] = Entry(name, module, function or name, params, schema, **options)
+    SCRIPTS.setdefault(module, name)
+    return REGISTRY[name]
+
+def _json_type(value):
+    for type_name, types in JSON_TYPES.items():
+        if type(value) in types:
+            return type_name
+    return 'any'
+
+# Shared scanning engine; part of the cache version of every module using it
+SCANNER_FILES = ('text_scanner.py',)
+
+def _analyze_sentiment_route(payload):
+    return 'analyze_reviews' if 'reviews' in payload else 'analyze_sentiment'
+
+def _duplicate_detector_route(payload):
+    if 'upsert' in payload or 'remove' in payload:
+        return 'update_duplicate_index'
+    return 'detect_duplicates' if 'existingListings' in payload else 'find_duplicates'
+
+register('extract_tags', 'auto_tagger', schema={
+    'title': 'string', 'description': 'string', 'amenities': 'object', 'furnished': 'string'},
+    cacheable=True, data_files=SCANNER_FILES)
+register('estimate_commute', 'commute_analyzer', params=[('town', 'Colombo'), ('destination', 'Colombo')],
+         cacheable=True)
+register('generate_comparison', 'comparison_ai', params=[('listings', [])])
+register('analyze_demand', 'demand_analyzer', params=[('towns', [])])
+register('detect_duplicates', 'duplicate_detector', params=[('newListing', {}), ('existingListings', [])])
+register('find_duplicates', 'duplicate_detector', params=[('newListing', {}), ('limit', 5)])
+register('update_duplicate_index', 'duplicate_detector', params=[('upsert', []), ('remove', [])])
+register('generate_health_metrics', 'health_analytics', params=[('listings', [])])
+register('analyze_image_quality', 'image_quality', params=[('images', [])], cacheable=True)
+register('process_kyc', 'kyc_processor', params=[('imagePath', '')])
+register('generate_report', 'market_intelligence', schema={
+    'scrapedByArea': 'array', 'localByArea': 'array', 'scrapedBySource': 'array',
+    'totalScraped': 'number', 'totalLocal': 'number'})
+register('calculate_match_score', 'matching_engine', 'match_listing', schema={
+    'preferences': 'object', 'listing': 'object'}, cacheable=True)
+register('parse_nlp_query', 'nlp_search', params=[('query', '')],
+         error_fields={'confidence': '0'}, requires_input=False,
+         cacheable=True, data_files=('towns.json',))
+register('analyze_performance', 'performance_analyzer', params=[('listing', {}), ('peerStats', {})])
+register('suggest_price', 'pricing_engine', schema={
+    'town': 'string', 'beds': 'number', 'baths': 'number', 'size': 'number'}, cacheable=True)
+register('calculate_safety_score', 'safety_scorer', params=[('town', ''), ('reviewData', {})],
+         error_fields={'trustScore': 0}, cacheable=True)
+register('analyze_listings', 'scam_detector', schema={'listings': 'array', 'avgPrice': 'number'},
+         cacheable=True, data_files=SCANNER_FILES)
+register('analyze_listing', 'scraped_analyzer', schema={'listing': 'object', 'localStats': 'object'},
+         cacheable=True, data_files=SCANNER_FILES)
+register('analyze_reviews', 'sentiment_analyzer', params=[('reviews', [])], cacheable=True)
+register('analyze_sentiment', 'sentiment_analyzer', params=[('text', '')], cacheable=True)
+register('detect_spam', 'spam_detector', schema={
+    'title': 'string', 'description': 'string', 'price': 'number', 'town': 'string'},
+    error_fields={'trustScore': 0, 'verdict': 'error'}, cacheable=True, data_files=SCANNER_FILES)
+register('generate_title', 'title_generator', schema={
+    'type': 'string', 'town': 'string', 'beds': 'number', 'baths': 'number', 'price': 'number',
+    'tenantType': 'string', 'amenities': 'object', 'furnished': 'string'})
+register('generate_description', 'ai_service', 'describe_listing', schema={
+    'title': 'string', 'type': 'string', 'location': 'object', 'amenities': 'object'},
+    path=os.path.join(ROOT_DIR, 'ai_service.py'), cacheable=True,
+    data_files=(os.path.join(ROOT_DIR, 'knowledge_base.py'), os.path.join(ROOT_DIR, 'knowledge_base.json')))
+
+# sentiment_analyzer.py serves both a batch and a single-text payload
+SCRIPTS['sentiment_analyzer'] = _analyze_sentiment_route
+# duplicate_detector.py: owner-scoped list, catalogue index lookup or index update
+SCRIPTS['duplicate_detector'] = _duplicate_detector_route
+
+# ──────────────────────────────────────────────
+#   LOADING
+# ──────────────────────────────────────────────
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+def load_module(entry):
+    """Import an entry's module once (root scripts are loaded by file path)."""
+    module = _modules.get(entry.module)
+    if module is not None:
+        return module
+    with _modules_lock:
+        if entry.module not in _modules:
+            if entry.path:
+                from importlib.util import spec_from_file_location, module_from_spec
+                spec = spec_from_file_location(entry.module, entry.path)
+                module = module_from_spec(spec)
+                spec.loader.exec_module(module)
+                sys.modules.setdefault(entry.module, module)
+            else:
+                module = importlib.import_module(entry.module)
+            _modules[entry.module] = module
+        return _modules[entry.module]
+
+def bind_module(name, module):
+    """Reuse an already-executed module (e.g. a script running as __main__)."""
+    with _modules_lock:
+        _modules.setdefault(REGISTRY[name].module, module)
+
+def warm():
+    """Import every registered module up front (used by long-lived workers)."""
+    for entry in REGISTRY.values():
+        load_module(entry)
+
+# ──────────────────────────────────────────────
+#   DISPATCH
+# ──────────────────────────────────────────────
+
+def resolve(script, payload=None):
+    """Map a script name ('pricing_engine.py') or entry name to an entry name."""
+    name = os.path.basename(script or '')
+    name = name[:-3] if name.endswith('.py') else name
+    if name in REGISTRY:
+        return name
+    target = SCRIPTS.get(name)
+    if callable(target):
+        return target(payload or {})
+    if target is None:
+        raise ValueError(f'Unknown script: {script}')
+    return target
+
+def validate(entry, payload):
+    """Check the payload against the entry's input schema."""
+    if not isinstance(payload, dict):
+        raise ValueError(f'Input for {entry.name} must be a JSON object')
+    for field, type_name in entry.schema.items():
+        value = payload.get(field)
+        types = JSON_TYPES.get(type_name)
+        if value is None or types is None:
+            continue
+        if not isinstance(value, types) or (type_name == 'number' and isinstance(value, bool)):
+            raise ValueError(f"Invalid input for {entry.name}: '{field}' must be {type_name}")
+
+def _bind(name):
+    entry = REGISTRY.get(name)
+    if entry is None:
+        raise ValueError(f'Unknown AI function: {name}')
+    return entry, getattr(load_module(entry), entry.function)
+
+def _call(entry, func, payload):
+    validate(entry, payload)
+    key = None
+    if CACHE is not None and entry.cacheable:
+        key = result_cache.make_key(entry.name, payload, entry.version())
+        cached = CACHE.get(key)
+        if cached is not None:
+            _record_hit(entry.name)
+            return cached
+
+    started = time.perf_counter()
+    ok = False
+    try:
+        if entry.params is None:
+            result = func(payload)
+        else:
+            result = func(*(payload.get(field, default) for field, default in entry.params))
+        ok = True
+    finally:
+        _record(entry.name, time.perf_counter() - started, ok)
+    if key is not None:
+        CACHE.put(key, result)
+    return result
+
+def dispatch(name, payload):
+    """Validate the payload and call the registered function by name."""
+    entry, func = _bind(name)
+    return _call(entry, func, payload)
+
+def iter_batch(name, payloads):
+    """
+    Run one function over many payloads in this process, yielding
+    (index, ok, result_or_error) in input order as each item finishes.
+    A failing item does not stop the batch.
+    """
+    entry, func = _bind(name)
+    for index, payload in enumerate(payloads):
+        try:
+            yield index, True, _call(entry, func, payload)
+        except Exception as e:
+            yield index, False, str(e)
+
+def dispatch_batch(name, payloads):
+    """Run a whole batch; failed items become {"error": ...} in their slot."""
+    return [
+        result if ok else {'error': result}
+        for _, ok, result in iter_batch(name, payloads)
+    ]
+
+def _new_stats():
+    return {'calls': 0, 'errors': 0, 'cacheHits': 0, 'totalMs': 0.0}
+
+def _record(name, elapsed, ok):
+    with _stats_lock:
+        stats = STATS.setdefault(name, _new_stats())
+        stats['calls'] += 1
+        stats['errors'] += 0 if ok else 1
+        stats['totalMs'] += elapsed * 1000
+
+def _record_hit(name):
+    with _stats_lock:
+        STATS.setdefault(name, _new_stats())['cacheHits'] += 1
+
+def cache_stats():
+    """Hit/miss counters of the result cache, or None when caching is off."""
+    return CACHE.stats() if CACHE is not None else None
+
+def stats():
+    """Per-function call counts, cache hits, error counts and average latency."""
+    with _stats_lock:
+        return {
+            name: {**s, 'totalMs': round(s['totalMs'], 3),
+                   'avgMs': round(s['totalMs'] / s['calls'], 3) if s['calls'] else 0.0}
+            for name, s in STATS.items()
+        }
+
+def catalog():
+    """Describe every registered function and its input schema."""
+    return [entry.describe() for entry in REGISTRY.values()]
+
+# ──────────────────────────────────────────────
+#   CLI (spawn path)
+# ──────────────────────────────────────────────
+
+def run_cli(name, module=None):
+    """Read one JSON payload from stdin, dispatch it and print the result."""
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+    entry = REGISTRY[name]
+    if module is not None:
+        bind_module(name, module)
+
+    try:
+        input_data = sys.stdin.read().strip()
+        if not input_data and entry.requires_input:
+            print(json.dumps({"error": "No input provided", **entry.error_fields}))
+            sys.exit(1)
+        payload = json.loads(input_data) if input_data else {}
+        if isinstance(payload, dict) and isinstance(payload.get('batch'), list):
+            # {"batch": [payload, ...]} runs every item in this one process
+            batch = payload['batch']
+            target = resolve(entry.module, batch[0] if batch else {})
+            results, failed = [], 0
+            for _, ok, result in iter_batch(target, batch):
+                results.append(result if ok else {'error': result})
+                failed += 0 if ok else 1
+            print(json.dumps({'results': results, 'count': len(results), 'failed': failed}, ensure_ascii=False))
+            return
+        target = resolve(entry.module, payload) if isinstance(payload, dict) else name
+        print(json.dumps(dispatch(target, payload), ensure_ascii=False))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}", **entry.error_fields}))
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e), **entry.error_fields}))
+        sys.exit(1)
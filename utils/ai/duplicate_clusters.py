@@ -0,0 +1,400 @@
+"""
+Duplicate Clusters — Nightly all-pairs near-duplicate clustering job.
+
+Reads the local catalogue (NDJSON, or a JSON array / {"listings": [...]}, e.g.
+a mongoexport) and scraper_runner output files (JSON, or its NDJSON stream), finds every pair scoring at
+least --min-score with duplicate_detector.score_pair(), and merges the pairs
+into clusters with union-find. One NDJSON record is written per cluster as
+soon as it is complete: when every unit holding one of its members has been
+merged, no later edge can reach it.
+
+Candidate pairs come from two kinds of work units:
+  - LSH buckets: listings sharing a title or description MinHash band
+    (same banding as minhash_index, so text lookalikes meet)
+  - attribute groups: listings sharing every attribute of one of
+    blocking.attribute_groups(), the only way to reach the cut-off
+    without text similarity
+Inside a unit, members are grouped by block key and only block pairs whose
+bound reaches the cut-off are scored. A pair sharing several units is scored
+in the first of them only (band slots in order, then attribute groups).
+Signatures and units are spread over a process pool; the parent only merges
+edges.
+
+Usage:
+    python duplicate_clusters.py --catalogue listings.ndjson --scraped scrape.json \\
+        --workers 8 --min-score 75 > clusters.ndjson
+
+Output (stdout NDJSON, clusters in the order they complete):
+    {"clusterId": 1, "size": 3, "maxScore": 90,
+     "members": [{"_id": "...", "source": "catalogue", "title": "..."}, ...],
+     "links": [["a", "b", 90], ...]}
+Stats are written to stderr as one JSON line.
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import itertools
+from array import array
+from collections import OrderedDict
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+from blocking import attribute_groups, block_key, can_reach_threshold, group_key
+from duplicate_detector import listing_features, normalized_words, score_pair
+from minhash_index import BANDING, band_keys, signature
+
+# isDuplicate in detect_duplicates(); 50 would also link every same-block pair
+DEFAULT_MIN_SCORE = 75
+# Listings per signature task sent to one worker
+SIGNATURE_CHUNK = 2000
+
+# ──────────────────────────────────────────────
+#   INPUT
+# ──────────────────────────────────────────────
+
+# scraper_runner NDJSON records that carry no listing
+RUNNER_RECORDS = {'page', 'source', 'error', 'stats'}
+
+def unwrap_records(records):
+    """Listings out of plain listings or scraper_runner NDJSON records (other record types dropped)."""
+    listings = []
+    for record in records:
+        kind = record.get('type')
+        if kind == 'listing' and isinstance(record.get('listing'), dict):
+            listings.append(record['listing'])
+        elif kind not in RUNNER_RECORDS:
+            listings.append(record)
+    return listings
+
+def read_listings(path):
+    """Listings from an NDJSON file (scraper_runner's included), a JSON array or a {"listings": [...]} object."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return unwrap_records(json.loads(line) for line in text.splitlines() if line.strip())
+    if isinstance(data, dict) and ('combined' in data or 'listings' in data):
+        # scraper_runner output keeps its listings under "combined"; a lone record is a one-line NDJSON file
+        data = (data.get('combined') or data).get('listings', [])
+    return unwrap_records(data if isinstance(data, list) else [data])
+
+def bulk_record(listing, source, fallback_id):
+    """The fields score_pair() needs, for a catalogue or scraped listing."""
+    listing_id = listing.get('_id')
+    if isinstance(listing_id, dict):
+        listing_id = listing_id.get('$oid')  # mongoexport
+    if not listing_id:
+        listing_id = f"{source}:{listing.get('sourceId') or listing.get('sourceUrl') or fallback_id}"
+    location = listing.get('location') or {}
+    return {
+        '_id': str(listing_id),
+        'source': source,
+        'title': listing.get('title') or '',
+        'description': listing.get('description') or '',
+        'town': listing.get('town') or location.get('town') or '',
+        'price': listing.get('price') or 0,
+        'beds': listing.get('beds') or 0,
+        'baths': listing.get('baths') or 0,
+        'type': listing.get('type') or '',
+        # Scrapers fingerprint descriptions at ingest
+        'descriptionSimhash': listing.get('descriptionSimhash') or '',
+    }
+
+def load_records(catalogue_paths, scraped_paths):
+    records = []
+    for path in catalogue_paths:
+        records.extend(bulk_record(l, 'catalogue', i) for i, l in enumerate(read_listings(path)))
+    for path in scraped_paths:
+        for i, listing in enumerate(read_listings(path)):
+            records.append(bulk_record(listing, listing.get('_sourceSlug') or 'scraped', i))
+    return records
+
+# ──────────────────────────────────────────────
+#   UNION-FIND
+# ──────────────────────────────────────────────
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        """Merge the sets of a and b; False when they were already one set."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+        self.parent[b] = a
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+        return True
+
+# ──────────────────────────────────────────────
+#   WORKERS
+# ──────────────────────────────────────────────
+
+def text_signature(record):
+    """(titleWords, descWords, one LSH bucket key per band slot, 0 for an empty field)."""
+    words = {'title': normalized_words(record['title']), 'description': normalized_words(record['description'])}
+    keys = array('q')
+    for field, bands, rows in BANDING:
+        sig = signature(words[field])
+        keys.extend(band_keys(field, sig, bands, rows) if sig else [0] * bands)
+    return words['title'], words['description'], keys
+
+def _signature_chunk(records):
+    return [text_signature(r) for r in records]
+
+# Set in each scoring worker by _init_scorer (inherited when forked)
+_features = _keys = _buckets = _groups = None
+_threshold = DEFAULT_MIN_SCORE
+
+def _init_scorer(features, keys, buckets, groups, threshold):
+    global _features, _keys, _buckets, _groups, _threshold
+    _features, _keys, _buckets, _groups, _threshold = features, keys, buckets, groups, threshold
+
+def shared_before(i, j, rank):
+    """Whether i and j already share a unit ranked before rank (band slots, then attribute groups)."""
+    a, b = _buckets[i], _buckets[j]
+    for slot in range(min(rank, len(a))):
+        if a[slot] and a[slot] == b[slot]:
+            return True
+    a, b = _groups[i], _groups[j]
+    for group in range(rank - len(_buckets[i])):
+        if a[group] is not None and a[group] == b[group]:
+            return True
+    return False
+
+def score_unit(unit):
+    """
+    Edges (i, j, score) at or above the threshold inside one unit, and pairs
+    scored. Pairs that meet in an earlier unit are left to that unit; its
+    bound is never tighter (text units come first).
+    """
+    members, with_text, rank = unit
+    blocks = OrderedDict()
+    for i in members:
+        blocks.setdefault(_keys[i], []).append(i)
+    keys = list(blocks)
+    edges = []
+    scored = 0
+    for x, key in enumerate(keys):
+        for y in range(x, len(keys)):
+            other = keys[y]
+            if not can_reach_threshold(key, other, with_text, _threshold):
+                continue
+            if x == y:
+                pairs = itertools.combinations(blocks[key], 2)
+            else:
+                pairs = itertools.product(blocks[key], blocks[other])
+            for i, j in pairs:
+                if rank and shared_before(i, j, rank):
+                    continue
+                scored += 1
+                score, _ = score_pair(_features[i], _features[j])
+                if score >= _threshold:
+                    edges.append((i, j, score))
+    return edges, scored
+
+# ──────────────────────────────────────────────
+#   JOB
+# ──────────────────────────────────────────────
+
+def work_units(bucket_keys, groups):
+    """
+    (members, with_text, rank) units: every LSH bucket and attribute group with
+    two or more members, ranked by band slot and then attribute group. Units
+    with identical members (e.g. identical titles sharing all their bands) are
+    only emitted once, at their first rank.
+    """
+    seen = set()
+
+    def emit(members, with_text, rank):
+        unit_key = (with_text, tuple(members))
+        if unit_key not in seen:
+            seen.add(unit_key)
+            yield members, with_text, rank
+
+    # One band slot at a time, so only one band's buckets are held in memory
+    slots = sum(bands for _, bands, _ in BANDING)
+    for slot in range(slots):
+        first, shared = {}, {}
+        for i, listing_keys in enumerate(bucket_keys):
+            bucket = listing_keys[slot]
+            if bucket:
+                owner = first.setdefault(bucket, i)
+                if owner != i:
+                    shared.setdefault(bucket, [owner]).append(i)
+        del first
+        for members in shared.values():
+            yield from emit(members, True, slot)
+
+    for group in range(len(groups[0]) if groups else 0):
+        shared = {}
+        for i, values in enumerate(groups):
+            if values[group] is not None:
+                shared.setdefault(values[group], []).append(i)
+        for members in shared.values():
+            if len(members) > 1:
+                yield from emit(members, False, slots + group)
+
+def _pool(workers, **kwargs):
+    import multiprocessing
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    return context.Pool(workers, **kwargs)
+
+def _score_numbered(item):
+    number, unit = item
+    return number, score_unit(unit)
+
+def iter_clusters(records, threshold=DEFAULT_MIN_SCORE, workers=None, stats=None):
+    """
+    Yield clusters of near-duplicate records as each one completes, each
+    {'members': [index, ...], 'links': [(i, j, score), ...], 'maxScore': n}.
+    stats, if given, is filled in as the job runs and is final once the
+    generator is exhausted.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.time()
+    stats = {} if stats is None else stats
+    stats.update({'listings': len(records), 'workers': workers, 'minScore': threshold})
+
+    chunks = [records[i:i + SIGNATURE_CHUNK] for i in range(0, len(records), SIGNATURE_CHUNK)]
+    if workers > 1 and len(chunks) > 1:
+        with _pool(workers) as pool:
+            signatures = list(itertools.chain.from_iterable(pool.imap(_signature_chunk, chunks)))
+    else:
+        signatures = _signature_chunk(records)
+    features = [listing_features(dict(r, titleWords=title, descWords=desc))
+                for r, (title, desc, _) in zip(records, signatures)]
+    keys = [block_key(r) for r in records]
+    buckets = [s[2] for s in signatures]
+    del signatures
+    fields = attribute_groups(threshold)
+    groups = [tuple(group_key(key, f) for f in fields) for key in keys]
+    units = list(work_units(buckets, groups))
+    stats['signatureSeconds'] = round(time.time() - started, 2)
+    stats['units'] = len(units)
+
+    # Units still to merge per listing, summed over each union-find root
+    remaining = [0] * len(records)
+    for members, _, _ in units:
+        for i in members:
+            remaining[i] += 1
+    uf = UnionFind(len(records))
+    clusters = {}
+    scored = edges_found = emitted = clustered = 0
+    # Large units first so one straggler does not hold up the pool at the end
+    units.sort(key=lambda unit: len(unit[0]), reverse=True)
+    if workers > 1 and len(units) > 1:
+        pool = _pool(workers, initializer=_init_scorer, initargs=(features, keys, buckets, groups, threshold))
+        results = pool.imap_unordered(_score_numbered, enumerate(units), chunksize=64)
+    else:
+        pool = None
+        _init_scorer(features, keys, buckets, groups, threshold)
+        results = map(_score_numbered, enumerate(units))
+    try:
+        for number, (unit_edges, unit_scored) in results:
+            scored += unit_scored
+            edges_found += len(unit_edges)
+            for i, j, score in unit_edges:
+                a, b = uf.find(i), uf.find(j)
+                if uf.union(a, b):
+                    root = uf.find(a)
+                    remaining[root] = remaining[a] + remaining[b]
+                    cluster = clusters.setdefault(root, {'members': set(), 'links': [], 'maxScore': 0})
+                    for old in (a, b):
+                        if old != root and old in clusters:
+                            merged = clusters.pop(old)
+                            cluster['members'] |= merged['members']
+                            cluster['links'].extend(merged['links'])
+                            cluster['maxScore'] = max(cluster['maxScore'], merged['maxScore'])
+                    cluster['members'].update((i, j))
+                    cluster['links'].append((i, j, score))
+                cluster = clusters[uf.find(i)]
+                cluster['maxScore'] = max(cluster['maxScore'], score)
+            done = set()
+            for i in units[number][0]:
+                root = uf.find(i)
+                remaining[root] -= 1
+                if not remaining[root]:
+                    done.add(root)
+            units[number] = None
+            for root in done:
+                cluster = clusters.pop(root, None)
+                if cluster is not None:
+                    cluster['members'] = sorted(cluster['members'])
+                    emitted += 1
+                    clustered += len(cluster['members'])
+                    yield cluster
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    total_pairs = len(records) * (len(records) - 1) // 2
+    stats.update({
+        'pairsScored': scored,
+        'pairsTotal': total_pairs,
+        'prunedRatio': round(1 - scored / total_pairs, 6) if total_pairs else 0.0,
+        'edges': edges_found,
+        'clusters': emitted,
+        'clusteredListings': clustered,
+        'seconds': round(time.time() - started, 2),
+    })
+
+def find_clusters(records, threshold=DEFAULT_MIN_SCORE, workers=None):
+    """All clusters of iter_clusters(), largest first, and the job's stats."""
+    stats = {}
+    clusters = list(iter_clusters(records, threshold, workers, stats))
+    clusters.sort(key=lambda c: (-len(c['members']), c['members'][0]))
+    return clusters, stats
+
+def cluster_record(cluster_id, cluster, records):
+    return {
+        'clusterId': cluster_id,
+        'size': len(cluster['members']),
+        'maxScore': min(cluster['maxScore'], 100),
+        'members': [{'_id': records[i]['_id'], 'source': records[i]['source'], 'title': records[i]['title']}
+                    for i in cluster['members']],
+        'links': [[records[i]['_id'], records[j]['_id'], min(score, 100)] for i, j, score in cluster['links']],
+    }
+
+def write_clusters(clusters, records, out):
+    """Stream one NDJSON line per cluster, flushed as each one arrives."""
+    for cluster_id, cluster in enumerate(clusters, 1):
+        out.write(json.dumps(cluster_record(cluster_id, cluster, records), ensure_ascii=False) + '\n')
+        out.flush()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='All-pairs near-duplicate clustering')
+    parser.add_argument('--catalogue', action='append', default=[], help='Catalogue listings (NDJSON or JSON)')
+    parser.add_argument('--scraped', action='append', default=[], help='scraper_runner output (JSON)')
+    parser.add_argument('--min-score', type=int, default=DEFAULT_MIN_SCORE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        records = load_records(args.catalogue, args.scraped)
+        stats = {}
+        sys.stdout = open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+        write_clusters(iter_clusters(records, args.min_score, args.workers, stats), records, sys.stdout)
+        sys.stderr.write(json.dumps({'stats': stats}) + '\n')
+    except (OSError, json.JSONDecodeError) as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -1,6 +1,15 @@
 import sys
+import os
 import json
 import re
+import threading
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+from blocking import BlockIndex, block_key
+import simhash
 
 def normalize(text):
     """Normalize text for comparison."""
@@ -11,88 +20,108 @@ def normalize(text):
 
 def word_overlap(text1, text2):
     """Calculate Jaccard similarity between two texts."""
-    words1 = set(normalize(text1).split())
-    words2 = set(normalize(text2).split())
+    return jaccard(normalized_words(text1), normalized_words(text2))
+
+def normalized_words(text):
+    """Word set used for title/description similarity."""
+    return set(normalize(text or '').split())
+
+def jaccard(words1, words2):
+    """Jaccard similarity of two word sets."""
     if not words1 or not words2:
         return 0.0
-    intersection = words1 & words2
-    union = words1 | words2
-    return len(intersection) / len(union)
+    return len(words1 & words2) / len(words1 | words2)
 
-def detect_duplicates(new_listing, existing_listings):
+def listing_features(listing):
     """
-    Detect potential duplicate listings.
-    Compares: title similarity, same location, same price range, same beds/baths
-    Returns: list of potential duplicates with similarity scores
+    Everything the scoring rules look at, normalized once per listing.
+    Records already carrying 'titleWords'/'descWords' (as stored in the
+    duplicate index) are not re-tokenised; 'descriptionSimhash' is only
+    used when the listing carries one.
     """
-    potential_duplicates = []
-
-    new_title = new_listing.get('title', '')
-    new_desc = new_listing.get('description', '')
-    new_town = new_listing.get('town', '').lower()
-    new_price = new_listing.get('price', 0)
-    new_beds = new_listing.get('beds', 0)
-    new_baths = new_listing.get('baths', 0)
-    new_type = new_listing.get('type', '').lower()
+    title = listing.get('title', '')
+    description = listing.get('description', '')
+    title_words = listing.get('titleWords')
+    desc_words = listing.get('descWords')
+    return {
+        'id': listing.get('_id', ''),
+        'title': title,
+        'description': description,
+        'town': listing.get('town', '').lower(),
+        'price': listing.get('price', 0),
+        'beds': listing.get('beds', 0),
+        'baths': listing.get('baths', 0),
+        'type': listing.get('type', '').lower(),
+        'titleWords': set(title_words) if title_words is not None else normalized_words(title),
+        'descWords': set(desc_words) if desc_words is not None else normalized_words(description),
+        'simhash': simhash.from_hex(listing.get('descriptionSimhash')),
+    }
 
-    for listing in existing_listings:
-        score = 0
-        reasons = []
-
-        ex_town = listing.get('town', '').lower()
-        ex_price = listing.get('price', 0)
-        ex_beds = listing.get('beds', 0)
-        ex_baths = listing.get('baths', 0)
-        ex_type = listing.get('type', '').lower()
-        ex_title = listing.get('title', '')
-        ex_desc = listing.get('description', '')
-
-        # Same town (+25)
-        if new_town and ex_town and new_town == ex_town:
-            score += 25
-            reasons.append('Same town')
-
-        # Same property type (+15)
-        if new_type and ex_type and new_type == ex_type:
+def score_pair(new, existing):
+    """Apply the duplicate scoring rules to two listing_features() dicts: (score, reasons)."""
+    score = 0
+    reasons = []
+
+    # Same town (+25)
+    if new['town'] and existing['town'] and new['town'] == existing['town']:
+        score += 25
+        reasons.append('Same town')
+
+    # Same property type (+15)
+    if new['type'] and existing['type'] and new['type'] == existing['type']:
+        score += 15
+        reasons.append('Same property type')
+
+    # Same beds + baths (+20)
+    if new['beds'] == existing['beds'] and new['baths'] == existing['baths'] and new['beds'] > 0:
+        score += 20
+        reasons.append(f"Same {new['beds']}BR/{new['baths']}BA")
+
+    # Price within 10% (+15)
+    new_price, ex_price = new['price'], existing['price']
+    if new_price > 0 and ex_price > 0:
+        price_diff = abs(new_price - ex_price) / max(new_price, ex_price)
+        if price_diff < 0.05:
             score += 15
-            reasons.append('Same property type')
-
-        # Same beds + baths (+20)
-        if new_beds == ex_beds and new_baths == ex_baths and new_beds > 0:
-            score += 20
-            reasons.append(f'Same {new_beds}BR/{new_baths}BA')
-
-        # Price within 10% (+15)
-        if new_price > 0 and ex_price > 0:
-            price_diff = abs(new_price - ex_price) / max(new_price, ex_price)
-            if price_diff < 0.05:
-                score += 15
-                reasons.append('Nearly identical price')
-            elif price_diff < 0.10:
-                score += 10
-                reasons.append('Similar price range')
-
-        # Title similarity (+25)
-        title_sim = word_overlap(new_title, ex_title)
-        if title_sim > 0.7:
-            score += 25
-            reasons.append(f'Very similar title ({int(title_sim * 100)}%)')
-        elif title_sim > 0.5:
-            score += 15
-            reasons.append(f'Similar title ({int(title_sim * 100)}%)')
-
-        # Description similarity (bonus)
-        if new_desc and ex_desc:
-            desc_sim = word_overlap(new_desc, ex_desc)
-            if desc_sim > 0.6:
-                score += 10
-                reasons.append(f'Similar description ({int(desc_sim * 100)}%)')
+            reasons.append('Nearly identical price')
+        elif price_diff < 0.10:
+            score += 10
+            reasons.append('Similar price range')
+
+    # Title similarity (+25)
+    title_sim = jaccard(new['titleWords'], existing['titleWords'])
+    if title_sim > 0.7:
+        score += 25
+        reasons.append(f'Very similar title ({int(title_sim * 100)}%)')
+    elif title_sim > 0.5:
+        score += 15
+        reasons.append(f'Similar title ({int(title_sim * 100)}%)')
+
+    # Description similarity (bonus); fingerprints settle near-identical ones
+    if new['description'] and existing['description']:
+        if (new['simhash'] is not None and existing['simhash'] is not None
+                and simhash.hamming(new['simhash'], existing['simhash']) <= simhash.MAX_DISTANCE):
+            score += 10
+            reasons.append('Near-identical description')
+        elif (desc_sim := jaccard(new['descWords'], existing['descWords'])) > 0.6:
+            score += 10
+            reasons.append(f'Similar description ({int(desc_sim * 100)}%)')
+
+    return score, reasons
+
+def rank_duplicates(new_listing, existing_listings):
+    """Score every existing listing against the new one; keep those scoring >= 50."""
+    new = listing_features(new_listing)
+    potential_duplicates = []
+    for listing in existing_listings:
+        existing = listing_features(listing)
+        score, reasons = score_pair(new, existing)
 
         # Only flag if score is significant
         if score >= 50:
             potential_duplicates.append({
-                'listingId': listing.get('_id', ''),
-                'title': ex_title,
+                'listingId': existing['id'],
+                'title': existing['title'],
                 'similarityScore': min(score, 100),
                 'reasons': reasons,
                 'isDuplicate': score >= 75
@@ -100,16 +129,93 @@ def detect_duplicates(new_listing, existing_listings):
 
     # Sort by similarity
     potential_duplicates.sort(key=lambda x: x['similarityScore'], reverse=True)
+    return potential_duplicates
+
+def detect_duplicates(new_listing, existing_listings):
+    """
+    Detect potential duplicate listings.
+    Compares: title similarity, same location, same price range, same beds/baths
+    Returns: list of potential duplicates with similarity scores
+    Only listings in blocks that could reach the cut-off are scored.
+    """
+    blocks = BlockIndex(existing_listings)
+    kept = blocks.viable_blocks(block_key(new_listing))
+    potential_duplicates = rank_duplicates(new_listing, blocks.members(kept))
 
     return {
         'hasDuplicates': any(d['isDuplicate'] for d in potential_duplicates),
         'potentialDuplicates': potential_duplicates[:5],
-        'totalChecked': len(existing_listings)
+        'totalChecked': len(existing_listings),
+        'blocking': blocks.report(kept),
+    }
+
+# ──────────────────────────────────────────────
+#   CATALOGUE INDEX (MinHash / LSH)
+# ──────────────────────────────────────────────
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """Process-wide MinHash index at $AI_DUPLICATE_INDEX (in memory when unset)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from minhash_index import MinHashIndex
+            _index = MinHashIndex(os.environ.get('AI_DUPLICATE_INDEX') or ':memory:', tokenize=normalized_words)
+        return _index
+
+def index_record(listing):
+    """The stored form of a listing: scoring fields plus its normalized word sets."""
+    return {
+        '_id': str(listing.get('_id', '')),
+        'title': listing.get('title', ''),
+        'description': listing.get('description', ''),
+        'town': listing.get('town', ''),
+        'price': listing.get('price', 0),
+        'beds': listing.get('beds', 0),
+        'baths': listing.get('baths', 0),
+        'type': listing.get('type', ''),
+        'titleWords': sorted(normalized_words(listing.get('title', ''))),
+        'descWords': sorted(normalized_words(listing.get('description', ''))),
+        'descriptionSimhash': listing.get('descriptionSimhash') or simhash.fingerprint_hex(listing.get('description', '')),
+    }
+
+def update_duplicate_index(upsert, remove):
+    """Incrementally add/replace and delete listings in the catalogue index."""
+    index = get_index()
+    removed = index.remove(remove) if remove else 0
+    indexed = index.upsert([index_record(l) for l in upsert]) if upsert else 0
+    return {'indexed': indexed, 'removed': removed, 'size': len(index)}
+
+def find_duplicates(new_listing, limit=5):
+    """
+    detect_duplicates() against the whole indexed catalogue: only listings
+    sharing a title or description LSH bucket, a near-identical description
+    fingerprint, or a block that could reach the cut-off on attributes alone
+    are scored.
+    """
+    index = get_index()
+    if new_listing.get('description') and not new_listing.get('descriptionSimhash'):
+        new_listing = dict(new_listing, descriptionSimhash=simhash.fingerprint_hex(new_listing['description']))
+    text_ids = index.candidate_ids(new_listing) | index.simhash_candidate_ids(new_listing)
+    block_ids = index.block_candidate_ids(new_listing)
+    candidates = index.records(text_ids | block_ids)
+    potential_duplicates = rank_duplicates(new_listing, candidates)
+    size = len(index)
+    return {
+        'hasDuplicates': any(d['isDuplicate'] for d in potential_duplicates),
+        'potentialDuplicates': potential_duplicates[:limit],
+        'totalChecked': len(candidates),
+        'indexSize': size,
+        'blocking': {
+            'textCandidates': len(text_ids),
+            'blockCandidates': len(block_ids),
+            'pairsPruned': size - len(candidates),
+            'prunedRatio': round(1 - len(candidates) / size, 4) if size else 0.0,
+        },
     }
 
 if __name__ == '__main__':
-    input_data = json.loads(sys.stdin.read())
-    new_listing = input_data.get('newListing', {})
-    existing = input_data.get('existingListings', [])
-    result = detect_duplicates(new_listing, existing)
-    print(json.dumps(result))
+    from dispatcher import run_cli
+    run_cli('detect_duplicates', sys.modules[__name__])
@@ -39,16 +39,5 @@ def generate_health_metrics(listings_data):
     }
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-            
-        data = json.loads(input_data)
-        listings = data.get('listings', [])
-        
-        result = generate_health_metrics(listings)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("generate_health_metrics", sys.modules[__name__])
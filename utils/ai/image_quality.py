@@ -104,7 +104,5 @@ def analyze_image_quality(images_data):
     }
 
 if __name__ == '__main__':
-    input_data = json.loads(sys.stdin.read())
-    images = input_data.get('images', [])
-    result = analyze_image_quality(images)
-    print(json.dumps(result))
+    from dispatcher import run_cli
+    run_cli('analyze_image_quality', sys.modules[__name__])
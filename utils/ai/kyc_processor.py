@@ -30,16 +30,5 @@ def process_kyc(image_path):
     }
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-            
-        data = json.loads(input_data)
-        path = data.get('imagePath', '')
-        
-        result = process_kyc(path)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("process_kyc", sys.modules[__name__])
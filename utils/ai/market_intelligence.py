@@ -299,22 +299,5 @@ def generate_report(data: Dict[str, Any]) -> MarketReport:
     }
 
 if __name__ == '__main__':
-    # Set up UTF-8 encoding for stdin and stdout
-    sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-    try:
-        input_data = sys.stdin.read().strip()
-        if not input_data:
-            print(json.dumps({"error": "No input provided"}))
-            sys.exit(1)
-        data = json.loads(input_data)
-        result = generate_report(data)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-    except json.JSONDecodeError as e:
-        print(json.dumps({"error": f"Invalid JSON: {str(e)}"}))
-        sys.exit(1)
-    except Exception as e:
-        # Catch-all for unexpected runtime errors to output JSON error rather than stack trace
-        print(json.dumps({"error": f"Internal Error: {str(e)}"}))
-        sys.exit(1)
+    from dispatcher import run_cli
+    run_cli('generate_report', sys.modules[__name__])
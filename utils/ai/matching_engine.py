@@ -48,31 +48,28 @@ def calculate_match_score(renter_prefs, property_features):
     final_score = (total_score / max_score) * 100
     return round(final_score, 1)
 
+def match_listing(data):
+    """
+    Scores a listing against renter preferences and labels the match.
+    """
+    prefs = data.get('preferences', {})
+    listing = data.get('listing', {})
+
+    score = calculate_match_score(prefs, listing)
+
+    result = {
+        "matchScore": score,
+        "matchLevel": "Excellent" if score > 85 else "Good" if score > 65 else "Fair" if score > 40 else "Poor",
+        "highlights": [
+            "Perfect Location" if prefs.get("town") == listing.get("town") else None,
+            "Within Budget" if listing.get("price", 0) <= prefs.get("maxPrice", 0) else None,
+            "Ideal Space" if listing.get("beds", 0) >= prefs.get("beds", 0) else None
+        ]
+    }
+    # Filter out None values from highlights
+    result["highlights"] = [h for h in result["highlights"] if h]
+    return result
+
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-            
-        data = json.loads(input_data)
-        prefs = data.get('preferences', {})
-        listing = data.get('listing', {})
-        
-        score = calculate_match_score(prefs, listing)
-        
-        result = {
-            "matchScore": score,
-            "matchLevel": "Excellent" if score > 85 else "Good" if score > 65 else "Fair" if score > 40 else "Poor",
-            "highlights": [
-                "Perfect Location" if prefs.get("town") == listing.get("town") else None,
-                "Within Budget" if listing.get("price", 0) <= prefs.get("maxPrice", 0) else None,
-                "Ideal Space" if listing.get("beds", 0) >= prefs.get("beds", 0) else None
-            ]
-        }
-        # Filter out None values from highlights
-        result["highlights"] = [h for h in result["highlights"] if h]
-        
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("calculate_match_score", sys.modules[__name__])
@@ -0,0 +1,294 @@
+"""
+MinHash Index — Persistent LSH candidate index for duplicate detection.
+
+Each indexed listing stores a MinHash signature of its title words and of its
+description words (the same normalized word sets word_overlap() compares).
+Signatures are cut into bands; listings that agree on every row of any band
+share a bucket. A lookup only touches the new listing's buckets, so its cost
+depends on how many listings look alike, not on the catalogue size.
+
+With 64 permutations, titles use 32 bands of 2 rows (catches word Jaccard
+> 0.5, the "Similar title" rule, with ~99% probability) and descriptions use
+16 bands of 4 rows (Jaccard > 0.6 with ~90%).
+
+Listings are also stored under their blocking key (town, type, beds/baths,
+price band; see blocking.py) so block_candidate_ids() can find the pairs
+that reach the duplicate cut-off on attributes alone, whatever their text,
+and under the table keys of their description SimHash ('descriptionSimhash';
+see simhash.py) so simhash_candidate_ids() finds near-identical descriptions.
+
+Storage is SQLite (a file shared by every worker process, or ':memory:'),
+updated incrementally with upsert() and remove().
+
+    index = MinHashIndex('/var/data/duplicates.db')
+    index.upsert([{"_id": "a1", "title": "...", "description": "...", ...}])
+    index.candidates(new_listing)   -> [stored record, ...] (LSH or block candidates)
+    index.remove(["a1"])
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import functools
+import threading
+from array import array
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+from blocking import BlockKey, block_key, can_reach_threshold, is_positive
+import simhash
+
+NUM_PERM = 64
+# (field, bands, rows per band)
+BANDING = (('title', 32, 2), ('description', 16, 4))
+
+_MERSENNE_61 = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_61), _rng.randrange(0, _MERSENNE_61)) for _ in range(NUM_PERM)]
+
+# SQLite's default limit on bound parameters is 999
+_MAX_PARAMS = 900
+# Tokens whose permuted hashes are kept (512 bytes each)
+TOKEN_CACHE_SIZE = 65536
+# Bumped when derived tables change; older files are rebuilt from their records
+SCHEMA_VERSION = 2
+
+def token_hash(token):
+    """Stable 61-bit hash of a token (hash() is salted per process)."""
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & _MERSENNE_61
+
+@functools.lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def token_permutations(token):
+    """The token's hash under every permutation; words repeat across listings."""
+    h = token_hash(token)
+    return array('Q', [(a * h + b) % _MERSENNE_61 for a, b in _PERMUTATIONS])
+
+def signature(tokens):
+    """MinHash signature of a token set, or None for an empty set."""
+    if not tokens:
+        return None
+    return list(map(min, zip(*map(token_permutations, tokens))))
+
+def _signed(value):
+    """An unsigned 64-bit value as SQLite's signed INTEGER."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def band_keys(field, sig, bands, rows):
+    """One bucket key per band, as a signed 64-bit int for SQLite."""
+    keys = []
+    for band in range(bands):
+        chunk = sig[band * rows:(band + 1) * rows]
+        text = f'{field}:{band}:' + ','.join(map(str, chunk))
+        digest = hashlib.blake2b(text.encode('ascii'), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+class MinHashIndex:
+    """LSH index over title/description MinHash signatures, stored in SQLite."""
+
+    def __init__(self, path=':memory:', tokenize=None):
+        self.path = path
+        self.tokenize = tokenize or (lambda text: set(text.lower().split()))
+        self.lock = threading.Lock()
+        import sqlite3  # deferred so importing the module stays cheap
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS listings ('
+            ' id TEXT PRIMARY KEY, record TEXT NOT NULL, signatures BLOB NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            ' bucket INTEGER NOT NULL, id TEXT NOT NULL, PRIMARY KEY (bucket, id)) WITHOUT ROWID')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS blocks ('
+            ' id TEXT PRIMARY KEY, town TEXT, type TEXT, beds, baths, band INTEGER)')
+        # One index per combination of attributes that can reach the cut-off
+        self.conn.execute('CREATE INDEX IF NOT EXISTS blocks_town_type ON blocks (town, type)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS blocks_town_beds ON blocks (town, beds, baths)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS blocks_type_beds ON blocks (type, beds, baths, band)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS simhash ('
+            ' tbl INTEGER NOT NULL, value INTEGER NOT NULL, id TEXT NOT NULL, fingerprint INTEGER NOT NULL,'
+            ' PRIMARY KEY (tbl, value, id)) WITHOUT ROWID')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            self._rebuild_derived()
+        self.conn.commit()
+
+    def _rebuild_derived(self):
+        """Re-derive block and SimHash rows for files written by an older version."""
+        self.conn.execute('DELETE FROM blocks')
+        self.conn.execute('DELETE FROM simhash')
+        for listing_id, record in self.conn.execute('SELECT id, record FROM listings').fetchall():
+            record = json.loads(record)
+            if 'descriptionSimhash' not in record:
+                record['descriptionSimhash'] = simhash.fingerprint_hex(record.get('description') or '')
+                self.conn.execute('UPDATE listings SET record = ? WHERE id = ?',
+                                  (json.dumps(record, ensure_ascii=False), listing_id))
+            self._insert_derived(listing_id, record)
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _insert_derived(self, listing_id, listing):
+        self.conn.execute('INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)', (listing_id, *block_key(listing)))
+        fp = simhash.from_hex(listing.get('descriptionSimhash'))
+        if fp is not None:
+            self.conn.executemany('INSERT OR IGNORE INTO simhash VALUES (?, ?, ?, ?)',
+                                  [(tbl, value, listing_id, _signed(fp)) for tbl, value in simhash.table_keys(fp)])
+
+    # ── signatures ──────────────────────────────
+
+    def signatures(self, listing):
+        """{field: signature or None} for a listing."""
+        return {field: signature(self.tokenize(listing.get(field) or '')) for field, _, _ in BANDING}
+
+    def bucket_keys(self, sigs):
+        keys = []
+        for field, bands, rows in BANDING:
+            if sigs.get(field):
+                keys.extend(band_keys(field, sigs[field], bands, rows))
+        return keys
+
+    @staticmethod
+    def _pack(sigs):
+        values = []
+        for field, _, _ in BANDING:
+            values.extend(sigs.get(field) or [0] * NUM_PERM)
+        return array('Q', values).tobytes()
+
+    @staticmethod
+    def _unpack(blob):
+        values = array('Q')
+        values.frombytes(blob)
+        sigs = {}
+        for i, (field, _, _) in enumerate(BANDING):
+            sig = list(values[i * NUM_PERM:(i + 1) * NUM_PERM])
+            sigs[field] = sig if any(sig) else None
+        return sigs
+
+    # ── updates ─────────────────────────────────
+
+    def upsert(self, listings):
+        """Add or replace listings (keyed by '_id'); returns how many were written."""
+        rows = []
+        for listing in listings:
+            listing_id = str(listing.get('_id') or '')
+            if listing_id:
+                sigs = self.signatures(listing)
+                rows.append((listing_id, listing, sigs))
+        with self.lock:
+            self._delete([listing_id for listing_id, _, _ in rows])
+            for listing_id, listing, sigs in rows:
+                self.conn.execute('INSERT INTO listings VALUES (?, ?, ?)',
+                                  (listing_id, json.dumps(listing, ensure_ascii=False), self._pack(sigs)))
+                self.conn.executemany('INSERT OR IGNORE INTO buckets VALUES (?, ?)',
+                                      [(key, listing_id) for key in self.bucket_keys(sigs)])
+                self._insert_derived(listing_id, listing)
+            self.conn.commit()
+        return len(rows)
+
+    def remove(self, listing_ids):
+        """Drop listings from the index; returns how many existed."""
+        with self.lock:
+            removed = self._delete([str(i) for i in listing_ids])
+            self.conn.commit()
+        return removed
+
+    def _delete(self, listing_ids):
+        removed = 0
+        for listing_id in listing_ids:
+            row = self.conn.execute('SELECT signatures, record FROM listings WHERE id = ?', (listing_id,)).fetchone()
+            if row is None:
+                continue
+            keys = self.bucket_keys(self._unpack(row[0]))
+            self.conn.executemany('DELETE FROM buckets WHERE bucket = ? AND id = ?',
+                                  [(key, listing_id) for key in keys])
+            fp = simhash.from_hex(json.loads(row[1]).get('descriptionSimhash'))
+            if fp is not None:
+                self.conn.executemany('DELETE FROM simhash WHERE tbl = ? AND value = ? AND id = ?',
+                                      [(tbl, value, listing_id) for tbl, value in simhash.table_keys(fp)])
+            self.conn.execute('DELETE FROM listings WHERE id = ?', (listing_id,))
+            self.conn.execute('DELETE FROM blocks WHERE id = ?', (listing_id,))
+            removed += 1
+        return removed
+
+    # ── lookups ─────────────────────────────────
+
+    def candidate_ids(self, listing):
+        """Ids sharing at least one title or description bucket with the listing."""
+        keys = self.bucket_keys(self.signatures(listing))
+        if not keys:
+            return set()
+        placeholders = ','.join('?' * len(keys))
+        with self.lock:
+            rows = self.conn.execute(
+                f'SELECT DISTINCT id FROM buckets WHERE bucket IN ({placeholders})', keys).fetchall()
+        exclude = str(listing.get('_id') or '')
+        return {row[0] for row in rows if row[0] != exclude}
+
+    def block_candidate_ids(self, listing):
+        """
+        Ids whose block reaches the duplicate cut-off against the listing on
+        attributes alone. Such pairs share town and type, town and beds/baths,
+        or type, beds/baths and a nearly identical price.
+        """
+        key = block_key(listing)
+        town, kind = key.town or None, key.type or None
+        beds = key.beds if is_positive(key.beds) else None
+        low, high = (key.band - 1, key.band + 1) if key.band is not None else (None, None)
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT id, town, type, beds, baths, band FROM blocks'
+                ' WHERE (town = ? AND type = ?)'
+                ' OR (town = ? AND beds = ? AND baths = ?)'
+                ' OR (type = ? AND beds = ? AND baths = ? AND band BETWEEN ? AND ?)',
+                (town, kind, town, beds, key.baths, kind, beds, key.baths, low, high)).fetchall()
+        exclude = str(listing.get('_id') or '')
+        return {row[0] for row in rows
+                if row[0] != exclude and can_reach_threshold(key, BlockKey(*row[1:]), with_text=False)}
+
+    def simhash_candidate_ids(self, listing, max_distance=simhash.MAX_DISTANCE):
+        """Ids whose description fingerprint is within max_distance bits of the listing's."""
+        fp = simhash.from_hex(listing.get('descriptionSimhash'))
+        if fp is None:
+            return set()
+        found = set()
+        with self.lock:
+            for tbl, value in simhash.table_keys(fp):
+                found.update(
+                    listing_id for listing_id, other in self.conn.execute(
+                        'SELECT id, fingerprint FROM simhash WHERE tbl = ? AND value = ?', (tbl, value))
+                    if simhash.hamming(fp, other & 0xFFFFFFFFFFFFFFFF) <= max_distance)
+        found.discard(str(listing.get('_id') or ''))
+        return found
+
+    def records(self, listing_ids):
+        """Stored records for the given ids."""
+        listing_ids = list(listing_ids)
+        records = []
+        with self.lock:
+            for i in range(0, len(listing_ids), _MAX_PARAMS):
+                chunk = listing_ids[i:i + _MAX_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                records.extend(
+                    json.loads(row[0]) for row in self.conn.execute(
+                        f'SELECT record FROM listings WHERE id IN ({placeholders})', chunk))
+        return records
+
+    def candidates(self, listing):
+        """Stored records of every LSH, SimHash or block candidate for the listing."""
+        return self.records(self.candidate_ids(listing) | self.simhash_candidate_ids(listing)
+                            | self.block_candidate_ids(listing))
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM listings').fetchone()[0]
+
+    def stats(self):
+        with self.lock:
+            listings = self.conn.execute('SELECT COUNT(*) FROM listings').fetchone()[0]
+            buckets = self.conn.execute('SELECT COUNT(*) FROM buckets').fetchone()[0]
+        return {'listings': listings, 'bucketEntries': buckets, 'path': self.path}
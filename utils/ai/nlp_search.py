@@ -9,18 +9,31 @@ from typing import Dict, Any, List, Optional, Union
 # sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
 # sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-# Load towns from JSON config with fallback
-try:
-    towns_path = os.path.join(os.path.dirname(__file__), 'towns.json')
-    if os.path.exists(towns_path):
-        with open(towns_path, 'r', encoding='utf-8') as f:
-            SL_TOWNS = json.load(f)
-    else:
-        # Minimal fallback list
-        SL_TOWNS = ["colombo", "kandy", "galle", "negombo", "matara", "kurunegala"]
-except Exception:
-    # Fallback if file read fails
-    SL_TOWNS = ["colombo", "kandy", "galle", "negombo"]
+FALLBACK_TOWNS = ["colombo", "kandy", "galle", "negombo", "matara", "kurunegala"]
+_towns = None
+
+def load_towns() -> List[str]:
+    """Load towns from JSON config on first use, with fallback."""
+    global _towns
+    if _towns is None:
+        try:
+            towns_path = os.path.join(os.path.dirname(__file__), 'towns.json')
+            if os.path.exists(towns_path):
+                with open(towns_path, 'r', encoding='utf-8') as f:
+                    _towns = json.load(f)
+            else:
+                # Minimal fallback list
+                _towns = FALLBACK_TOWNS
+        except Exception:
+            # Fallback if file read fails
+            _towns = ["colombo", "kandy", "galle", "negombo"]
+    return _towns
+
+def __getattr__(name):
+    # SL_TOWNS is still importable, but only read from disk when asked for
+    if name == 'SL_TOWNS':
+        return load_towns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 PROPERTY_TYPES: Dict[str, str] = {
     "house": "House",
@@ -150,7 +163,7 @@ def parse_nlp_query(query: str) -> Dict[str, Any]:
     q_clean = re.sub(r'\s+', ' ', q_clean).strip()
 
     # Ensure towns are strings (handle potential bad data)
-    safe_towns = [str(t) for t in SL_TOWNS if isinstance(t, str)]
+    safe_towns = [str(t) for t in load_towns() if isinstance(t, str)]
     sorted_towns = sorted(safe_towns, key=len, reverse=True)
     
     found_town = None
@@ -172,21 +185,5 @@ def parse_nlp_query(query: str) -> Dict[str, Any]:
     }
 
 if __name__ == '__main__':
-    # Set up UTF-8 encoding for stdin and stdout
-    sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-    try:
-        input_data = sys.stdin.read().strip()
-        if not input_data:
-             # Allow running without input for testing/import
-             sys.exit(0)
-             
-        data = json.loads(input_data)
-        query_input = data.get('query', '')
-        result_output = parse_nlp_query(query_input)
-        print(json.dumps(result_output))
-    except json.JSONDecodeError:
-        print(json.dumps({"error": "Invalid JSON input", "confidence": "0"}))
-    except Exception as e:
-        print(json.dumps({"error": str(e), "confidence": "0"}))
+    from dispatcher import run_cli
+    run_cli('parse_nlp_query', sys.modules[__name__])
@@ -143,17 +143,5 @@ def analyze_performance(listing, peer_stats):
 
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-
-        data = json.loads(input_data)
-        listing = data.get('listing', {})
-        peer_stats = data.get('peerStats', {})
-
-        result = analyze_performance(listing, peer_stats)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("analyze_performance", sys.modules[__name__])
@@ -48,14 +48,5 @@ def suggest_price(data):
     }
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-            
-        data = json.loads(input_data)
-        result = suggest_price(data)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("suggest_price", sys.modules[__name__])
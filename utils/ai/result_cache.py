@@ -0,0 +1,210 @@
+"""
+Result Cache — Content-addressed cache for deterministic AI functions.
+
+Results are keyed by a SHA-256 of (function name, normalized payload, code
+version), where the code version is a hash of the module source and any data
+files it reads. Editing a script therefore invalidates its entries on its own.
+
+Two tiers:
+  - an in-memory LRU (per process) with TTL and entry-count eviction
+  - an optional on-disk SQLite table shared by every process on the machine,
+    with TTL and row-count eviction
+
+Configuration (environment):
+    AI_CACHE=off              disable caching entirely
+    AI_CACHE_SIZE=2048        in-memory entries
+    AI_CACHE_TTL=3600         seconds an entry stays valid
+    AI_CACHE_DB=/tmp/ai.db    enable the SQLite tier at this path
+    AI_CACHE_DB_MAX_ROWS=100000
+"""
+import json
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+def canonical_json(value):
+    """Stable JSON text for hashing: sorted keys, no insignificant whitespace."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+_version_cache = {}
+_version_lock = threading.Lock()
+
+def code_version(paths):
+    """Hash of the given source/data files; missing files hash as empty."""
+    key = tuple(paths)
+    with _version_lock:
+        if key not in _version_cache:
+            digest = hashlib.sha256()
+            for path in paths:
+                digest.update(path.encode('utf-8'))
+                try:
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+                except OSError:
+                    pass
+            _version_cache[key] = digest.hexdigest()[:16]
+        return _version_cache[key]
+
+def make_key(name, payload, version):
+    text = canonical_json({'fn': name, 'payload': payload, 'version': version})
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# ──────────────────────────────────────────────
+#   TIERS
+# ──────────────────────────────────────────────
+
+class MemoryTier:
+    """Thread-safe LRU of key -> (expires_at, json_text)."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key, now):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= now:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return item[1]
+
+    def put(self, key, text, expires_at):
+        with self.lock:
+            self.entries[key] = (expires_at, text)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class SqliteTier:
+    """On-disk tier; one connection per thread, rows trimmed oldest-first."""
+
+    def __init__(self, path, max_rows=100000):
+        self.path = path
+        self.max_rows = max_rows
+        self.local = threading.local()
+        self.writes = 0
+        self.evictions = 0
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._conn().execute('CREATE INDEX IF NOT EXISTS results_created ON results (created_at)')
+        self._conn().commit()
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            import sqlite3  # only processes with AI_CACHE_DB set pay for this import
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self.local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        row = self._conn().execute(
+            'SELECT value, expires_at FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return None, None
+        return row[0], row[1]
+
+    def put(self, key, text, expires_at, now):
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', (key, text, expires_at, now))
+        self.writes += 1
+        # Trim periodically rather than on every write
+        if self.writes % 100 == 0:
+            conn.execute('DELETE FROM results WHERE expires_at <= ?', (now,))
+            excess = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_rows
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM results WHERE key IN '
+                    '(SELECT key FROM results ORDER BY created_at LIMIT ?)', (excess,))
+                self.evictions += excess
+        conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute('DELETE FROM results')
+        conn.commit()
+
+# ──────────────────────────────────────────────
+#   CACHE
+# ──────────────────────────────────────────────
+
+class ResultCache:
+    """Two-tier result cache with hit/miss counters."""
+
+    def __init__(self, max_entries=2048, ttl=3600, db_path=None, db_max_rows=100000):
+        self.ttl = ttl
+        self.memory = MemoryTier(max_entries)
+        self.disk = SqliteTier(db_path, db_max_rows) if db_path else None
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'memoryHits': 0, 'diskHits': 0, 'misses': 0, 'stores': 0}
+
+    def _count(self, *names):
+        with self.lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def get(self, key):
+        """Cached result for key, or None on a miss."""
+        now = time.time()
+        text = self.memory.get(key, now)
+        if text is not None:
+            self._count('hits', 'memoryHits')
+            return json.loads(text)
+        if self.disk is not None:
+            text, expires_at = self.disk.get(key, now)
+            if text is not None:
+                self.memory.put(key, text, expires_at)
+                self._count('hits', 'diskHits')
+                return json.loads(text)
+        self._count('misses')
+        return None
+
+    def put(self, key, result):
+        now = time.time()
+        text = json.dumps(result, ensure_ascii=False)
+        self.memory.put(key, text, now + self.ttl)
+        if self.disk is not None:
+            self.disk.put(key, text, now + self.ttl, now)
+        self._count('stores')
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = counters['hits'] + counters['misses']
+        counters['hitRatio'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+        counters['memoryEntries'] = len(self.memory.entries)
+        counters['evictions'] = self.memory.evictions + (self.disk.evictions if self.disk else 0)
+        counters['diskEnabled'] = self.disk is not None
+        return counters
+
+def from_env():
+    """Build the process-wide cache from AI_CACHE_* variables (None when disabled)."""
+    if os.environ.get('AI_CACHE', '').lower() == 'off':
+        return None
+    return ResultCache(
+        max_entries=int(os.environ.get('AI_CACHE_SIZE', 2048)),
+        ttl=float(os.environ.get('AI_CACHE_TTL', 3600)),
+        db_path=os.environ.get('AI_CACHE_DB') or None,
+        db_max_rows=int(os.environ.get('AI_CACHE_DB_MAX_ROWS', 100000)),
+    )
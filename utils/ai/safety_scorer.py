@@ -143,13 +143,5 @@ def calculate_safety_score(town: str, review_data: Dict[str, Any]) -> Dict[str,
     }
 
 if __name__ == '__main__':
-    try:
-        input_data = json.loads(sys.stdin.read())
-        town_input = input_data.get('town', '')
-        review_data_input = input_data.get('reviewData', {})
-        result_output = calculate_safety_score(town_input, review_data_input)
-        print(json.dumps(result_output))
-    except json.JSONDecodeError:
-        print(json.dumps({"error": "Invalid JSON input", "trustScore": 0}))
-    except Exception as e:
-        print(json.dumps({"error": str(e), "trustScore": 0}))
+    from dispatcher import run_cli
+    run_cli('calculate_safety_score', sys.modules[__name__])
@@ -7,31 +7,22 @@ Output (stdout JSON): {
 }
 """
 import sys
+import os
 import json
 import re
 
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import text_scanner
+
 # ──────────────────────────────────────────────
 #   PII PATTERNS
 # ──────────────────────────────────────────────
 
-PATTERNS = {
-    'phone_number': [
-        re.compile(r'(?:\+94|0)\s*\d[\d\s\-]{7,12}'),
-        re.compile(r'\b\d{3}[\s\-]\d{7}\b'),
-        re.compile(r'\b0\d{9}\b'),
-    ],
-    'email': [
-        re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
-    ],
-    'whatsapp': [
-        re.compile(r'(?:whatsapp|viber|imo|telegram)\s*[:\-]?\s*(?:\+94|0)?\s*\d[\d\s\-]{7,12}', re.I),
-        re.compile(r'(?:call|contact|sms|text)\s*(?:me\s*)?[:\-]?\s*(?:\+94|0)\s*\d[\d\s\-]{7,12}', re.I),
-    ],
-    'nic_number': [
-        re.compile(r'\b\d{9}[VXvx]\b'),
-        re.compile(r'\b\d{12}\b'),
-    ],
-}
+# Shared with the scrapers; defined in text_scanner.py
+PATTERNS = text_scanner.PII_PATTERNS
 
 # Scam indicator patterns
 SCAM_PATTERNS = {
@@ -54,31 +45,24 @@ SCAM_PATTERNS = {
     ],
 }
 
+text_scanner.register('scam', [
+    (flag_type, pattern) for flag_type, patterns in SCAM_PATTERNS.items() for pattern in patterns])
+
 def detect_all_pii(text):
     """Detect all types of PII in text."""
-    detected = []
-    for pii_type, patterns in PATTERNS.items():
-        for pattern in patterns:
-            if pattern.search(text):
-                detected.append(pii_type)
-                break
-    return detected
+    return text_scanner.scan(text).names('pii')
 
 def detect_scam_flags(text, price=0, avg_price=0):
     """Detect scam indicators in text and pricing."""
     flags = []
 
-    # Text-based scam patterns
-    for flag_type, patterns in SCAM_PATTERNS.items():
-        for pattern in patterns:
-            match = pattern.search(text)
-            if match:
-                flags.append({
-                    'type': flag_type,
-                    'matched': match.group(),
-                    'severity': 'HIGH' if flag_type in ['payment_fraud', 'overseas_scam'] else 'MEDIUM',
-                })
-                break
+    # Text-based scam patterns (first matching pattern of each type)
+    for flag_type, hit in text_scanner.scan(text).first('scam').items():
+        flags.append({
+            'type': flag_type,
+            'matched': hit.text,
+            'severity': 'HIGH' if flag_type in ['payment_fraud', 'overseas_scam'] else 'MEDIUM',
+        })
 
     # Price-based flags
     if price > 0 and avg_price > 0:
@@ -150,17 +134,5 @@ def analyze_listings(data):
     return {'results': results}
 
 if __name__ == '__main__':
-    try:
-        input_data = sys.stdin.read().strip()
-        if not input_data:
-            print(json.dumps({"error": "No input provided"}))
-            sys.exit(1)
-        data = json.loads(input_data)
-        result = analyze_listings(data)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-    except json.JSONDecodeError as e:
-        print(json.dumps({"error": f"Invalid JSON: {str(e)}"}))
-        sys.exit(1)
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+    from dispatcher import run_cli
+    run_cli('analyze_listings', sys.modules[__name__])
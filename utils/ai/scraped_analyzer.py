@@ -19,9 +19,16 @@ Output (stdout JSON): {
 }
 """
 import sys
+import os
 import json
 import re
 
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import text_scanner
+
 # ──────────────────────────────────────────────
 #   PRICE ANALYSIS
 # ──────────────────────────────────────────────
@@ -119,6 +126,9 @@ SCAM_KEYWORDS = [
     'overseas', 'abroad', 'can\'t show', 'sight unseen',
 ]
 
+# Plain substrings, matched case-insensitively
+text_scanner.register('scam_keyword', [(kw, re.escape(kw)) for kw in SCAM_KEYWORDS], re.IGNORECASE)
+
 def calculate_scam_risk(listing, local_stats):
     """Score scam risk 0-100. Higher = more suspicious."""
     risk = 0
@@ -147,13 +157,11 @@ def calculate_scam_risk(listing, local_stats):
         risk += 10
         reasons.append('Very short description')
 
-    # Scam keywords in text
-    combined = f"{listing.get('title', '')} {desc}".lower()
-    for keyword in SCAM_KEYWORDS:
-        if keyword in combined:
-            risk += 10
-            reasons.append(f'Suspicious keyword: "{keyword}"')
-            break  # Only count once
+    # Scam keywords in text (only count once)
+    keywords = text_scanner.scan(f"{listing.get('title', '')} {desc}").names('scam_keyword')
+    if keywords:
+        risk += 10
+        reasons.append(f'Suspicious keyword: "{keywords[0]}"')
 
     # PII in listing (already processed by scraper)
     if listing.get('piiDetected'):
@@ -259,33 +267,28 @@ def generate_comparison(listing, local_stats):
 #   TAG GENERATION
 # ──────────────────────────────────────────────
 
+TAG_KEYWORDS = {
+    'Furnished': ['furnished', 'fully furnished'],
+    'Near School': ['school', 'near school'],
+    'Near Hospital': ['hospital', 'medical'],
+    'Near Beach': ['beach', 'sea view', 'ocean'],
+    'Near Transport': ['bus', 'train', 'transport'],
+    'Garden': ['garden', 'backyard'],
+    'Parking': ['parking', 'garage', 'car park'],
+    'AC': ['a/c', 'air condition', 'ac '],
+    'WiFi': ['wifi', 'internet'],
+    'Pet Friendly': ['pet', 'pets allowed'],
+    'New Build': ['new build', 'brand new', 'newly built'],
+    'Good Deal': [],  # Set by price analysis
+}
+
+text_scanner.register('listing_tag', [
+    (tag, re.escape(kw)) for tag, keywords in TAG_KEYWORDS.items() for kw in keywords], re.IGNORECASE)
+
 def generate_tags(listing):
     """Auto-generate tags from listing data."""
-    tags = []
-    title = listing.get('title', '').lower()
-    desc = listing.get('description', '').lower()
-    combined = f"{title} {desc}"
-
-    tag_keywords = {
-        'Furnished': ['furnished', 'fully furnished'],
-        'Near School': ['school', 'near school'],
-        'Near Hospital': ['hospital', 'medical'],
-        'Near Beach': ['beach', 'sea view', 'ocean'],
-        'Near Transport': ['bus', 'train', 'transport'],
-        'Garden': ['garden', 'backyard'],
-        'Parking': ['parking', 'garage', 'car park'],
-        'AC': ['a/c', 'air condition', 'ac '],
-        'WiFi': ['wifi', 'internet'],
-        'Pet Friendly': ['pet', 'pets allowed'],
-        'New Build': ['new build', 'brand new', 'newly built'],
-        'Good Deal': [],  # Set by price analysis
-    }
-
-    for tag, keywords in tag_keywords.items():
-        for kw in keywords:
-            if kw in combined:
-                tags.append(tag)
-                break
+    combined = f"{listing.get('title', '')} {listing.get('description', '')}"
+    tags = text_scanner.scan(combined).names('listing_tag')
 
     # Price-based tags
     price = listing.get('price', 0)
@@ -331,17 +334,5 @@ def analyze_listing(data):
     }
 
 if __name__ == '__main__':
-    try:
-        input_data = sys.stdin.read().strip()
-        if not input_data:
-            print(json.dumps({"error": "No input provided"}))
-            sys.exit(1)
-        data = json.loads(input_data)
-        result = analyze_listing(data)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-    except json.JSONDecodeError as e:
-        print(json.dumps({"error": f"Invalid JSON: {str(e)}"}))
-        sys.exit(1)
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+    from dispatcher import run_cli
+    run_cli('analyze_listing', sys.modules[__name__])
@@ -155,20 +155,5 @@ def analyze_reviews(reviews):
 
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-
-        data = json.loads(input_data)
-
-        # Support both single review and batch
-        if 'reviews' in data:
-            result = analyze_reviews(data['reviews'])
-        else:
-            result = analyze_sentiment(data.get('text', ''))
-
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("analyze_reviews", sys.modules[__name__])
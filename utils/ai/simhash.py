@@ -0,0 +1,89 @@
+"""
+SimHash — 64-bit description fingerprints compared by Hamming distance.
+
+A fingerprint is the sign of the weighted sum of every feature's 64-bit hash
+(features: normalized words, weighted by count). Contact details are redacted
+and bare numbers dropped first, so a repost with another phone number or a
+new price gets the same fingerprint, and one that rewords a little ends up a
+few bits away. A near-duplicate check is then one XOR and a popcount instead
+of a Jaccard over word sets.
+
+Fingerprints travel with listings as 16-char hex strings ('descriptionSimhash';
+JSON numbers lose precision past 2^53). For lookups the 64 bits are cut into
+MAX_DISTANCE + 1 blocks: two fingerprints within MAX_DISTANCE bits agree on
+at least one whole block, so each block value is an exact-match table key.
+
+    fp = fingerprint("Spacious annex, call 0771234567")
+    hamming(fp, fingerprint("Spacious annex, call 077 987 6543"))   -> 0
+    to_hex(fp)       -> 'e35e551e8ceb3972'
+    table_keys(fp)   -> [(0, 14706), (1, 36075), (2, 21790), (3, 58206)]
+"""
+import os
+import sys
+import re
+import hashlib
+import functools
+from collections import Counter
+
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+from text_scanner import redact_pii
+
+BITS = 64
+# Descriptions at most this many bits apart are near-identical
+MAX_DISTANCE = 3
+TABLES = MAX_DISTANCE + 1
+_BLOCK_BITS = [BITS // TABLES + (1 if t < BITS % TABLES else 0) for t in range(TABLES)]
+_BLOCK_SHIFTS = [sum(_BLOCK_BITS[:t]) for t in range(TABLES)]
+# Features whose bit vectors are kept per process
+FEATURE_CACHE_SIZE = 65536
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+def features(text):
+    """Normalized words of the redacted text, without bare numbers, with counts."""
+    words = _PUNCTUATION.sub('', redact_pii(text or '').lower()).split()
+    return Counter(word for word in words if not word.isdigit())
+
+@functools.lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _feature_vector(feature):
+    """+1/-1 per bit of the feature's hash."""
+    h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+    return tuple(1 if h >> bit & 1 else -1 for bit in range(BITS))
+
+def fingerprint(text):
+    """64-bit SimHash of a description, or None when it has no words."""
+    counts = features(text)
+    if not counts:
+        return None
+    vectors = []
+    for feature, count in counts.items():
+        vectors.extend([_feature_vector(feature)] * count)
+    totals = map(sum, zip(*vectors))
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+def to_hex(fp):
+    return '' if fp is None else f'{fp:016x}'
+
+def from_hex(value):
+    """Fingerprint from its hex form; None when missing or malformed."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return int(value, 16) & ((1 << BITS) - 1)
+    except ValueError:
+        return None
+
+def fingerprint_hex(text):
+    """The 'descriptionSimhash' stored with a listing ('' for an empty description)."""
+    return to_hex(fingerprint(text))
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')  # int.bit_count() needs Python 3.10
+
+def table_keys(fp):
+    """(table, block value) lookup keys; near fingerprints share at least one."""
+    return [(t, fp >> shift & ((1 << bits) - 1))
+            for t, (shift, bits) in enumerate(zip(_BLOCK_SHIFTS, _BLOCK_BITS))]
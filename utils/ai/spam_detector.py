@@ -1,8 +1,15 @@
 import sys
+import os
 import json
 import re
 from typing import Dict, Any, List, Tuple
 
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+import text_scanner
+
 # Red flags / spam indicators
 SPAM_PATTERNS: List[Tuple[str, str, str]] = [
     # Suspicious pricing
@@ -37,6 +44,9 @@ SPAM_PATTERNS: List[Tuple[str, str, str]] = [
     (r'(?:\d{10,}.*){3,}', 'phone_spam', 'Multiple phone numbers in description'),
 ]
 
+text_scanner.register('spam', [
+    (flag_type, pattern, message) for pattern, flag_type, message in SPAM_PATTERNS], re.IGNORECASE)
+
 QUALITY_CHECKS = {
     'title_too_short': lambda d: len(d.get('title', '')) < 10,
     'desc_too_short': lambda d: len(d.get('description', '')) < 20,
@@ -59,17 +69,17 @@ def detect_spam(listing_data: Dict[str, Any]) -> Dict[str, Any]:
     combined_text = f"{title} {description}"
 
     # Pattern matching on combined text
-    for pattern, flag_type, message in SPAM_PATTERNS:
-        if re.search(pattern, combined_text, re.IGNORECASE):
-            severity = 'critical' if flag_type in ('payment_scam', 'inappropriate') else 'warning'
-            deduction = 25 if severity == 'critical' else 10
-            score -= deduction
-            flags.append({
-                'type': flag_type,
-                'severity': severity,
-                'message': message,
-                'deduction': deduction
-            })
+    for rule, _ in text_scanner.scan(combined_text).matches('spam'):
+        flag_type, message = rule.name, rule.meta
+        severity = 'critical' if flag_type in ('payment_scam', 'inappropriate') else 'warning'
+        deduction = 25 if severity == 'critical' else 10
+        score -= deduction
+        flags.append({
+            'type': flag_type,
+            'severity': severity,
+            'message': message,
+            'deduction': deduction
+        })
 
     # Quality checks
     if QUALITY_CHECKS['title_too_short'](listing_data):
@@ -150,11 +160,5 @@ def detect_spam(listing_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 if __name__ == '__main__':
-    try:
-        input_data = json.loads(sys.stdin.read())
-        result = detect_spam(input_data)
-        print(json.dumps(result))
-    except json.JSONDecodeError:
-        print(json.dumps({"trustScore": 0, "verdict": "error", "error": "Invalid JSON"}))
-    except Exception as e:
-        print(json.dumps({"trustScore": 0, "verdict": "error", "error": str(e)}))
+    from dispatcher import run_cli
+    run_cli('detect_spam', sys.modules[__name__])
@@ -0,0 +1,273 @@
+"""
+Text Scanner — One scan per listing text for every detector's rule set.
+
+scam_detector, spam_detector, scraped_analyzer, auto_tagger and the scrapers
+all look for patterns in the same "title description" text. Each of them
+registers its rules here under a group name, and scan(text) evaluates every
+registered rule in one go, returning the first hit (with its span) of each
+rule that matched. Results for recent texts are kept, so when several
+detectors look at the same listing in one process the text is scanned once.
+
+Each rule's possible literal prefixes are derived from its regex. The text
+is lowercased once, and a rule is only run (from its earliest candidate
+position) when one of its prefixes occurs in the text; most rules never
+touch the regex engine for a given listing.
+
+    text_scanner.register('spam', [(flag_type, pattern, message), ...], re.IGNORECASE)
+    result = text_scanner.scan(f"{title} {description}")
+    result.names('pii')          -> ['phone_number', 'email']
+    result.matches('spam')       -> [(rule, hit), ...] in rule order
+    text_scanner.redact_pii(text)
+"""
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# First hit of one rule in the scanned text
+Hit = namedtuple('Hit', ['name', 'start', 'end', 'text'])
+
+# Literal prefixes longer than this add nothing to the filter
+MAX_PREFIX_LEN = 8
+# Give up on a prefix set that grows past this many alternatives
+MAX_PREFIXES = 32
+# Scan results kept per process, keyed by text
+RECENT_SIZE = 256
+
+# Characters whose case folding under re.IGNORECASE is not captured by
+# str.lower() position-for-position; texts containing them skip the filter
+_UNSAFE_FOLDS = frozenset('\u0130\u0131\u017f\u212a')
+
+# ──────────────────────────────────────────────
+#   PII RULES (shared by scam_detector and the scrapers)
+# ──────────────────────────────────────────────
+
+PII_PATTERNS = {
+    'phone_number': [
+        re.compile(r'(?:\+94|0)\s*\d[\d\s\-]{7,12}'),
+        re.compile(r'\b\d{3}[\s\-]\d{7}\b'),
+        re.compile(r'\b0\d{9}\b'),
+    ],
+    'email': [
+        re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
+    ],
+    'whatsapp': [
+        re.compile(r'(?:whatsapp|viber|imo|telegram)\s*[:\-]?\s*(?:\+94|0)?\s*\d[\d\s\-]{7,12}', re.I),
+        re.compile(r'(?:call|contact|sms|text)\s*(?:me\s*)?[:\-]?\s*(?:\+94|0)\s*\d[\d\s\-]{7,12}', re.I),
+    ],
+    'nic_number': [
+        re.compile(r'\b\d{9}[VXvx]\b'),
+        re.compile(r'\b\d{12}\b'),
+    ],
+}
+
+# ──────────────────────────────────────────────
+#   RULES
+# ──────────────────────────────────────────────
+
+class Rule:
+    """One pattern of a rule group; meta carries whatever the consumer needs."""
+
+    def __init__(self, group, name, regex, meta=None):
+        self.group = group
+        self.name = name
+        self.regex = regex
+        self.meta = meta
+        self._prefixes = False  # not analysed yet
+
+    @property
+    def prefixes(self):
+        """Lowercase strings every match starts with, or None when unconstrained."""
+        if self._prefixes is False:
+            try:
+                self._prefixes = literal_prefixes(self.regex.pattern, self.regex.flags)
+            except Exception:
+                self._prefixes = None
+        return self._prefixes
+
+def _op_name(op):
+    return getattr(op, 'name', str(op))
+
+def _charset(items):
+    """Characters matched by an IN set, or None when too many / not enumerable."""
+    chars = set()
+    for op, av in items:
+        name = _op_name(op)
+        if name == 'LITERAL':
+            chars.add(chr(av))
+        elif name == 'RANGE' and av[1] - av[0] < MAX_PREFIXES:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:
+            return None
+    return chars
+
+def _sequence_prefixes(items):
+    """
+    (prefixes, complete) for a parsed sequence. complete means the strings are
+    exactly the sequence's possible matches, so whatever follows may be
+    appended to them; otherwise they are prefixes and the walk stops there.
+    """
+    current = {''}
+    for op, av in items:
+        name = _op_name(op)
+        if name in ('AT', 'ASSERT', 'ASSERT_NOT'):
+            continue  # zero-width
+        if name == 'LITERAL':
+            part, complete = {chr(av)}, True
+        elif name == 'IN':
+            part, complete = _charset(av), True
+        elif name == 'BRANCH':
+            part, complete = set(), True
+            for alternative in av[1]:
+                sub, sub_complete = _sequence_prefixes(alternative)
+                if sub is None:
+                    part = None
+                    break
+                part |= sub
+                complete = complete and sub_complete
+        elif name == 'SUBPATTERN':
+            part, complete = _sequence_prefixes(av[-1])
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT') and av[0] >= 1:
+            part, complete = _sequence_prefixes(av[2])
+            complete = complete and av[0] == av[1] == 1
+        else:
+            part = None
+
+        if not part or len(current) * len(part) > MAX_PREFIXES:
+            return current, False
+        current = {(prefix + p)[:MAX_PREFIX_LEN] for prefix in current for p in part}
+        if not complete or min(len(p) for p in current) >= MAX_PREFIX_LEN:
+            return current, False
+    return current, True
+
+def literal_prefixes(pattern, flags=0):
+    """Set of lowercase literal prefixes for a regex, or None if it can start anywhere."""
+    prefixes, _ = _sequence_prefixes(sre_parse.parse(pattern, flags))
+    if not prefixes or '' in prefixes:
+        return None
+    return {p.lower() for p in prefixes}
+
+# ──────────────────────────────────────────────
+#   REGISTRY
+# ──────────────────────────────────────────────
+
+GROUPS = OrderedDict()
+_lock = threading.Lock()
+_recent = OrderedDict()
+
+def register(group, rules, flags=0):
+    """
+    Register (or replace) a rule group.
+    rules: iterable of (name, pattern) or (name, pattern, meta); patterns may be
+    strings (compiled with flags) or already-compiled regexes.
+    """
+    compiled = []
+    for rule in rules:
+        name, pattern = rule[0], rule[1]
+        meta = rule[2] if len(rule) > 2 else None
+        regex = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+        compiled.append(Rule(group, name, regex, meta))
+    with _lock:
+        GROUPS[group] = compiled
+        _recent.clear()
+    return compiled
+
+register('pii', [(name, p) for name, patterns in PII_PATTERNS.items() for p in patterns])
+
+# ──────────────────────────────────────────────
+#   SCANNING
+# ──────────────────────────────────────────────
+
+class ScanResult:
+    """First hit of every rule that matched one text."""
+
+    def __init__(self, text, groups, hits):
+        self.text = text
+        self.groups = groups
+        self.hits = hits  # Rule -> Hit
+
+    def matches(self, group):
+        """(rule, hit) for each rule of the group that matched, in rule order."""
+        return [(rule, self.hits[rule]) for rule in self.groups.get(group, ()) if rule in self.hits]
+
+    def names(self, group):
+        """Distinct names of the group's rules that matched, in rule order."""
+        return list(self.first(group))
+
+    def first(self, group):
+        """{name: hit of the first matching rule with that name}, in rule order."""
+        found = {}
+        for rule, hit in self.matches(group):
+            found.setdefault(rule.name, hit)
+        return found
+
+    def spans(self):
+        """Every hit as (start, end, group, name), by position."""
+        return sorted((hit.start, hit.end, rule.group, rule.name) for rule, hit in self.hits.items())
+
+def _scan(text, groups):
+    lowered = text.lower()
+    filtered = len(lowered) == len(text) and not _UNSAFE_FOLDS.intersection(text)
+    positions = {}
+    hits = {}
+    for rules in groups.values():
+        for rule in rules:
+            start = 0
+            prefixes = rule.prefixes if filtered else None
+            if prefixes is not None:
+                found = []
+                for prefix in prefixes:
+                    pos = positions.get(prefix)
+                    if pos is None:
+                        pos = positions[prefix] = lowered.find(prefix)
+                    if pos >= 0:
+                        found.append(pos)
+                if not found:
+                    continue
+                start = min(found)
+            match = rule.regex.search(text, start)
+            if match:
+                hits[rule] = Hit(rule.name, match.start(), match.end(), match.group())
+    return ScanResult(text, groups, hits)
+
+def scan(text):
+    """Scan text with every registered group; repeated texts reuse the result."""
+    text = text or ''
+    with _lock:
+        result = _recent.get(text)
+        if result is not None:
+            _recent.move_to_end(text)
+            return result
+        groups = dict(GROUPS)
+    result = _scan(text, groups)
+    with _lock:
+        if groups == GROUPS:
+            _recent[text] = result
+            while len(_recent) > RECENT_SIZE:
+                _recent.popitem(last=False)
+    return result
+
+# ──────────────────────────────────────────────
+#   PII HELPERS
+# ──────────────────────────────────────────────
+
+_redact_regex = None
+
+def detect_pii(text):
+    """PII types found in text, in PII_PATTERNS order."""
+    return scan(text).names('pii')
+
+def redact_pii(text, replacement='[REDACTED]'):
+    """Replace every PII match with one pass of a combined alternation."""
+    global _redact_regex
+    if not text or not scan(text).matches('pii'):
+        return text
+    if _redact_regex is None:
+        _redact_regex = re.compile('|'.join(
+            f'(?{"i" if p.flags & re.I else ""}:{p.pattern})'
+            for patterns in PII_PATTERNS.values() for p in patterns))
+    return _redact_regex.sub(replacement, text)
@@ -127,14 +127,5 @@ def generate_title(data):
 
 
 if __name__ == "__main__":
-    try:
-        input_data = sys.stdin.read()
-        if not input_data:
-            print(json.dumps({"error": "No input"}))
-            sys.exit(1)
-
-        data = json.loads(input_data)
-        result = generate_title(data)
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+    from dispatcher import run_cli
+    run_cli("generate_title", sys.modules[__name__])
@@ -0,0 +1,353 @@
+"""
+Card Extractor — One listing-card extraction engine driven by per-site specs.
+
+A spec (site_specs.py) names the CSS selectors for a site's cards and for
+each field inside a card; the engine compiles them once into lxml XPath
+expressions and runs them over the raw lxml tree of a results page. What
+used to be repeated in every scraper — price parsing, district lookup,
+beds/baths/size patterns, listing type, PII detection and redaction, the
+description SimHash — happens here, once.
+
+    extractor = extractor_for('ikman')
+    listings = extractor.parse(html, page, stats, errors)
+
+The same specs also run on BeautifulSoup (extractor_for(slug, 'bs4'), or
+"parser": "bs4" in a scraper config), which is what the scrapers used before
+and what lxml falls back to when it is not installed. soupsieve evaluates
+every selector in Python, so it is several times slower per page; run
+`python tests/test_card_extractor.py --bench` to compare the two on the
+saved pages under tests/fixtures/pages/.
+
+Selectors support the subset the sites need: tag, *, .class, #id, [attr],
+[attr=v], [attr*=v], [attr^=v], groups joined by commas, and descendant
+combinators. Anything else raises ValueError when the spec is compiled.
+"""
+import re
+import functools
+
+from scraper_deps import MISSING_DEPS, detect_pii, strip_pii, fingerprint_hex
+from site_specs import SPECS, DISTRICT_PROVINCE_MAP, BEDS, BATHS, SIZE
+
+_COMPOUND = re.compile(r'([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|\[[^\]]+\])*)$')
+_PART = re.compile(r'[.#][\w-]+|\[[^\]]+\]')
+_ATTRIBUTE = re.compile(r'\[\s*([\w-]+)\s*(?:([*^]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]+)))?\s*\]$')
+# Facts tables put the label first ("Bedrooms: 3", "Land size 10 perches")
+_LABELLED = {
+    'beds': r'bed(?:room)?s?\s*:?\s*(\d+)',
+    'baths': r'bath(?:room)?s?\s*:?\s*(\d+)',
+    'size': r'(?:floor area|house size|size|area)\s*:?\s*(\d+)',
+}
+_THOUSANDS = re.compile(r'(?<=\d),(?=\d{3}\b)')
+_FURNISHED = re.compile(r'\b(semi[\s-]*furnished|unfurnished|furnished)\b', re.I)
+# Strings BeautifulSoup's get_text() leaves out
+_TEXT = 'descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+
+def _literal(value):
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return 'concat(' + ', \'"\', '.join(f'"{piece}"' for piece in value.split('"')) + ')'
+
+def _predicate(part):
+    if part[0] == '.':
+        return f'contains(concat(" ", normalize-space(@class), " "), {_literal(" " + part[1:] + " ")})'
+    if part[0] == '#':
+        return f'@id = {_literal(part[1:])}'
+    match = _ATTRIBUTE.match(part)
+    if not match:
+        raise ValueError(f'Unsupported attribute selector: {part}')
+    name, operator = match.group(1), match.group(2)
+    if not operator:
+        return f'@{name}'
+    value = _literal(next(g for g in match.groups()[2:] if g is not None))
+    return {
+        '=': f'@{name} = {value}',
+        '*=': f'contains(@{name}, {value})',
+        '^=': f'starts-with(@{name}, {value})',
+    }[operator]
+
+def css_to_xpath(selector):
+    """XPath (relative to a context element, descendants only) for a CSS selector group."""
+    paths = []
+    for group in selector.split(','):
+        steps = group.split()
+        if not steps:
+            raise ValueError(f'Empty selector in: {selector!r}')
+        path = []
+        for step in steps:
+            match = _COMPOUND.match(step)
+            if not match or step in ('>', '+', '~'):
+                raise ValueError(f'Unsupported selector: {group.strip()!r}')
+            tag = match.group(1) or '*'
+            predicates = ''.join(f'[{_predicate(part)}]' for part in _PART.findall(match.group(2)))
+            path.append(f'descendant::{tag}{predicates}')
+        paths.append('/'.join(path))
+    return ' | '.join(paths)
+
+def parse_price(text):
+    """Parse a price string like 'Rs 45,000' to an integer."""
+    if not text:
+        return 0
+    try:
+        return int(re.sub(r'[^\d]', '', text))
+    except ValueError:
+        return 0
+
+def guess_district(text, districts=DISTRICT_PROVINCE_MAP):
+    """(District, province) of the first district named in text."""
+    lowered = text.lower()
+    for district, province in districts.items():
+        if district in lowered:
+            return district.title(), province
+    return '', ''
+
+class CardExtractor:
+    """A site spec compiled against lxml; subclasses swap the tree backend."""
+
+    backend = 'lxml'
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.source = spec['slug']
+        self.patterns = {name: re.compile(pattern, re.I) if pattern else None
+                         for name, pattern in spec['patterns'].items()}
+        # A listing's own page states what its card may leave out, size included
+        defaults = {'beds': BEDS, 'baths': BATHS, 'size': SIZE}
+        self.detail_patterns = {
+            name: [self.patterns.get(name) or re.compile(default, re.I), re.compile(_LABELLED[name], re.I)]
+            for name, default in defaults.items()}
+        self.compile(spec)
+
+    def compile(self, spec):
+        from lxml import etree
+        # Plain etree elements: lxml.html's HtmlElement class lookup costs per node
+        self.parser = etree.HTMLParser()
+        self.etree = etree
+        self.cards = [etree.XPath(css_to_xpath(css)) for css in spec['cards']]
+        self.fields = {name: etree.XPath(f'({css_to_xpath(css)})[1]')
+                       for name, css in spec['fields'].items()}
+        self.text = etree.XPath(_TEXT)
+        detail = spec.get('detail', {})
+        self.details = {name: etree.XPath(f'({css_to_xpath(css)})[1]')
+                        for name, css in detail.items() if name != 'images'}
+        self.gallery = etree.XPath(css_to_xpath(detail['images'])) if 'images' in detail else None
+
+    def document(self, page_html):
+        """The page's root element; None when there is nothing to parse (e.g. only a comment)."""
+        try:
+            return self.etree.fromstring(page_html, self.parser)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return self.etree.fromstring(page_html.encode('utf-8'), self.parser)
+
+    def select_cards(self, root):
+        if root is None:
+            return []
+        for select in self.cards:
+            cards = select(root)
+            if cards:
+                return cards
+        return []
+
+    def first(self, card, field):
+        found = self.fields[field](card)
+        return found[0] if found else None
+
+    def text_of(self, element, sep=''):
+        if element is None:
+            return ''
+        return sep.join(t for t in (s.strip() for s in self.text(element)) if t)
+
+    def detail_first(self, root, field):
+        select = self.details.get(field)
+        found = select(root) if select is not None else []
+        return found[0] if found else None
+
+    def detail_images(self, root):
+        return self.gallery(root) if self.gallery is not None else []
+
+    def is_link(self, element):
+        return element.tag == 'a'
+
+    def number(self, field, text):
+        pattern = self.patterns.get(field)
+        match = pattern.search(text) if pattern else None
+        return int(match.group(1)) if match else 0
+
+    def listing_type(self, title):
+        lowered = title.lower()
+        for keywords, label in self.spec['types']:
+            if any(keyword in lowered for keyword in keywords):
+                return label
+        return 'Unknown'
+
+    def href(self, card, title_el):
+        spec = self.spec
+        if spec['link'] == 'title':
+            link_el = title_el
+        elif spec['link'] == 'card-or-link' and self.is_link(card):
+            link_el = card
+        else:
+            link_el = self.first(card, 'link')
+        href = (link_el.get('href') or '') if link_el is not None else ''
+        if href and not href.startswith('http'):
+            href = spec['baseUrl'] + href
+        return href
+
+    def source_id(self, href):
+        if not href:
+            return ''
+        segment = href.split('/')[-1]
+        cut = self.spec.get('idCut')
+        return segment.split(cut)[0] if cut else segment
+
+    def card(self, card):
+        """The listing of one card, or None when it has no title."""
+        title_el = self.first(card, 'title')
+        title = self.text_of(title_el)
+        if not title:
+            return None
+        href = self.href(card, title_el)
+        price = parse_price(self.text_of(self.first(card, 'price')))
+        raw_loc = self.text_of(self.first(card, 'location'))
+        town = raw_loc.split(',')[0].strip() if raw_loc else ''
+        district, province = guess_district(raw_loc)
+        desc = self.text_of(self.first(card, 'description'))
+
+        img_el = self.first(card, 'image')
+        img = (img_el.get('src') or '') if img_el is not None else ''
+        images = [img] if img and 'placeholder' not in img.lower() else []
+
+        full_text = f"{title} {desc}"
+        pii = detect_pii(full_text)
+        clean_desc = strip_pii(desc)
+        return {
+            'title': strip_pii(title), 'description': clean_desc,
+            'descriptionSimhash': fingerprint_hex(clean_desc),
+            'price': price,
+            'location': {'town': town, 'district': district, 'province': province, 'rawAddress': raw_loc},
+            'beds': self.number('beds', full_text),
+            'baths': self.number('baths', full_text),
+            'size': self.number('size', full_text),
+            'type': self.listing_type(title), 'furnished': 'Unknown', 'images': images,
+            'sourceUrl': href, 'sourceId': self.source_id(href),
+            'piiDetected': len(pii) > 0, 'piiDetails': pii,
+        }
+
+    def detail(self, page_html):
+        """
+        What a listing's own page adds: {description, piiDetails, images, beds,
+        baths, size, furnished}, the description already PII-redacted.
+        """
+        root = self.document(page_html) if page_html.strip() else None
+        if root is None:
+            return {}
+        desc = self.text_of(self.detail_first(root, 'description'), ' ')
+        facts = self.text_of(self.detail_first(root, 'attributes'), ' ')
+        images = []
+        for img in self.detail_images(root):
+            src = img.get('src') or ''
+            if src and 'placeholder' not in src.lower() and src not in images:
+                images.append(src)
+        clean_desc = strip_pii(desc)
+        # The facts block first, and never digits out of a phone number
+        texts = [_THOUSANDS.sub('', facts), _THOUSANDS.sub('', clean_desc)]
+        numbers = {}
+        for field, (suffixed, labelled) in self.detail_patterns.items():
+            matches = (pattern.search(text) for text in texts for pattern in (labelled, suffixed))
+            match = next(filter(None, matches), None)
+            numbers[field] = int(match.group(1)) if match else 0
+        furnished = _FURNISHED.search(f"{facts} {clean_desc}")
+        label = furnished.group(1).lower().replace(' ', '-') if furnished else ''
+        return dict(numbers, **{
+            'description': clean_desc,
+            'piiDetails': detect_pii(desc),
+            'images': images,
+            'furnished': {'unfurnished': 'Unfurnished', 'furnished': 'Furnished'}.get(
+                label, 'Semi-Furnished' if label.startswith('semi') else 'Unknown'),
+        })
+
+    def parse(self, page_html, page, stats, errors):
+        """Listings on one results page; failed cards are recorded in errors."""
+        if not page_html.strip():
+            return []
+        page_listings = []
+        for card in self.select_cards(self.document(page_html)):
+            try:
+                listing = self.card(card)
+            except Exception as e:
+                errors.append({'page': page, 'message': str(e), 'source': self.source})
+                stats['errors'] += 1
+                continue
+            if listing is not None:
+                page_listings.append(listing)
+                stats['totalFound'] += 1
+        return page_listings
+
+class SoupCardExtractor(CardExtractor):
+    """The same spec run through BeautifulSoup and soupsieve; slower, but pure Python
+    when lxml is missing and forgiving of any markup."""
+
+    backend = 'bs4'
+
+    def compile(self, spec):
+        try:
+            from bs4 import BeautifulSoup
+            import soupsieve
+        except ImportError as e:
+            raise ImportError(MISSING_DEPS) from e
+        try:
+            import lxml  # noqa: F401
+            self.builder = 'lxml'
+        except ImportError:
+            self.builder = 'html.parser'
+        self.BeautifulSoup = BeautifulSoup
+        self.cards = [soupsieve.compile(css) for css in spec['cards']]
+        self.fields = {name: soupsieve.compile(css) for name, css in spec['fields'].items()}
+        detail = spec.get('detail', {})
+        self.details = {name: soupsieve.compile(css) for name, css in detail.items() if name != 'images'}
+        self.gallery = soupsieve.compile(detail['images']) if 'images' in detail else None
+
+    def document(self, page_html):
+        return self.BeautifulSoup(page_html, self.builder)
+
+    def select_cards(self, root):
+        for select in self.cards:
+            cards = select.select(root)
+            if cards:
+                return cards
+        return []
+
+    def first(self, card, field):
+        return self.fields[field].select_one(card)
+
+    def text_of(self, element, sep=''):
+        return element.get_text(sep, strip=True) if element is not None else ''
+
+    def detail_first(self, root, field):
+        select = self.details.get(field)
+        return select.select_one(root) if select is not None else None
+
+    def detail_images(self, root):
+        return self.gallery.select(root) if self.gallery is not None else []
+
+    def is_link(self, element):
+        return element.name == 'a'
+
+PARSERS = {'lxml': CardExtractor, 'bs4': SoupCardExtractor}
+
+@functools.lru_cache(maxsize=None)
+def extractor_for(slug, parser='lxml'):
+    """The compiled extractor of a site, built once per process per parser.
+
+    parser "lxml" falls back to "bs4" when lxml is not installed."""
+    if parser not in PARSERS:
+        raise ValueError(f'Unknown parser: {parser} (choose from {", ".join(PARSERS)})')
+    spec = dict(SPECS[slug], slug=slug)
+    if parser == 'lxml':
+        try:
+            return CardExtractor(spec)
+        except ImportError:
+            parser = 'bs4'
+    return PARSERS[parser](spec)
@@ -0,0 +1,125 @@
+"""
+HTTP Cache — On-disk conditional-request cache for scraper page fetches.
+
+Every results page that came back with an ETag or Last-Modified is stored,
+per source under $SCRAPER_STATE_DIR/http-cache/, together with its body and
+the listings parsed from it. The next fetch of that URL sends
+If-None-Match / If-Modified-Since; on a 304 the client fills the response in
+from the cache and the scraper reuses the stored listings instead of parsing
+the page again.
+
+    cache = HttpCache('ikman', config)
+    response = client.get(url, headers=HEADERS, metrics=metrics, cache=cache)
+    page_listings = cache.parsed(url, response)
+    if page_listings is None:
+        page_listings = extractor_for('ikman').parse(response.text, ...)
+        cache.store(url, response, page_listings)
+    stats['cache'] = cache.summary()
+    -> {"lookups": 3, "hits": 2, "hitRatio": 0.667, "bytesSaved": 412330}
+
+Set "httpCache": false in the scraper config to fetch unconditionally.
+"""
+import os
+import json
+import hashlib
+import threading
+
+from scrape_state import state_dir, write_atomic
+
+CACHE_VERSION = 1
+
+class HttpCache:
+    """Validators, bodies and parsed listings of one source's pages."""
+
+    def __init__(self, slug, config):
+        self.enabled = config.get('httpCache', True)
+        self.directory = os.path.join(state_dir(config), 'http-cache', slug)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, url):
+        try:
+            with open(self.path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != CACHE_VERSION or entry.get('url') != url:
+            return None
+        return entry
+
+    def request_headers(self, url, headers):
+        """headers plus the validators of the cached copy of url, if any."""
+        if not self.enabled:
+            return headers
+        entry = self.load(url)
+        with self.lock:
+            self.lookups += 1
+            self.entries[url] = entry
+        if entry is None:
+            return headers
+        headers = dict(headers or {})
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'):
+            headers['If-Modified-Since'] = entry['lastModified']
+        return headers
+
+    def resolve(self, url, response):
+        """Turn a 304 for url into the cached page; response.from_cache says which."""
+        entry = self.entries.get(url)
+        response.from_cache = response.status_code == 304 and entry is not None
+        if not response.from_cache:
+            return response
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += entry['bytes']
+        return response
+
+    def parsed(self, url, response):
+        """The listings stored for an unchanged page, else None (parse it)."""
+        if not getattr(response, 'from_cache', False):
+            return None
+        return self.entries[url].get('listings')
+
+    def store(self, url, response, listings):
+        """Keep the page and its listings when the server gave validators."""
+        if not self.enabled:
+            return
+        if getattr(response, 'from_cache', False):
+            entry = self.entries[url]
+            if entry.get('listings') is not None:
+                return
+            entry['listings'] = listings
+        else:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if not (etag or last_modified) or 'no-store' in response.headers.get('Cache-Control', ''):
+                return
+            body = response.text
+            entry = {
+                'version': CACHE_VERSION,
+                'url': url,
+                'etag': etag,
+                'lastModified': last_modified,
+                'bytes': len(response.content),
+                'body': body,
+                'listings': listings,
+            }
+        write_atomic(self.path(url), entry)
+
+    def summary(self):
+        with self.lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hitRatio': round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                'bytesSaved': self.bytes_saved,
+            }
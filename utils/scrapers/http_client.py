@@ -0,0 +1,248 @@
+"""
+HTTP Client — One pooled, retrying HTTP client shared by every scraper.
+
+Each host gets its own requests.Session with a keep-alive connection pool, so
+consecutive page fetches reuse the TCP/TLS connection. Responses are
+negotiated with gzip/deflate (plus brotli when the brotli package is
+installed). Connection errors, timeouts, 429 and 5xx responses are retried
+with exponential backoff and full jitter, honouring Retry-After.
+
+Every fetch is timed into a RequestMetrics passed by the caller, which each
+scraper reports as stats['http']. Passing an HttpCache (http_cache.py) makes
+the fetch conditional on the cached copy's ETag / Last-Modified.
+
+Requests to a host configured with throttle() take a token from that host's
+bucket in rate_limiter.py first, and get_pages() fetches the next page(s) in
+the background while the caller parses the current one:
+
+    client.throttle(SEARCH_URL, config.get('rateLimit', 2000), burst=1)
+    for url, response, error in client.get_pages(urls, ahead=1, headers=HEADERS):
+        ...
+
+    client = get_client()
+    metrics = RequestMetrics()
+    response = client.get(url, headers=HEADERS, timeout=15, metrics=metrics)
+    metrics.summary()   -> {"requests": 3, "retries": 0, "avgMs": 412.5, ...}
+
+get() raises requests exceptions (HTTPError for a final 4xx/5xx) like a bare
+requests.get() + raise_for_status() would.
+"""
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from scraper_deps import MISSING_DEPS
+from rate_limiter import get_limiter
+
+# Retries after the first attempt
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Idle keep-alive connections kept per host
+POOL_SIZE = 8
+
+def accept_encoding():
+    """Encodings this interpreter can decode, best first."""
+    encodings = ['gzip', 'deflate']
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encodings.insert(0, 'br')
+        break
+    return ', '.join(encodings)
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+class RequestMetrics:
+    """Timings and counters for the requests of one scrape."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = []
+        self.retries = 0
+        self.failures = 0
+        self.bytes = 0
+        self.compressed = 0
+        self.statuses = {}
+        self.throttled = 0.0
+
+    def record(self, elapsed, response=None, retried=False, failed=False):
+        with self.lock:
+            if retried:
+                self.retries += 1
+            if failed:
+                self.failures += 1
+            if response is not None:
+                self.timings.append(elapsed)
+                self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+                self.bytes += len(response.content)
+                if response.headers.get('Content-Encoding'):
+                    self.compressed += 1
+
+    def waited(self, seconds):
+        with self.lock:
+            self.throttled += seconds
+
+    def summary(self):
+        with self.lock:
+            timings = sorted(self.timings)
+            count = len(timings)
+            return {
+                'requests': count,
+                'retries': self.retries,
+                'failures': self.failures,
+                'bytes': self.bytes,
+                'compressedResponses': self.compressed,
+                'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+                'avgMs': round(sum(timings) / count * 1000, 1) if count else 0.0,
+                'p95Ms': round(timings[min(count - 1, int(count * 0.95))] * 1000, 1) if count else 0.0,
+                'maxMs': round(timings[-1] * 1000, 1) if count else 0.0,
+                'throttledMs': round(self.throttled * 1000, 1),
+            }
+
+class HttpClient:
+    """Per-host pooled sessions with retries; safe to share between threads."""
+
+    def __init__(self, max_retries=MAX_RETRIES, pool_size=POOL_SIZE, sleep=time.sleep, transport=None):
+        try:
+            import requests
+        except ImportError as e:
+            raise ImportError(MISSING_DEPS) from e
+        self.requests = requests
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.sleep = sleep
+        self.encoding = accept_encoding()
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.limiter = get_limiter()
+        # transport(host) -> requests adapter to mount instead of the pooled HTTPAdapter
+        self.transport = transport
+
+    def session(self, url):
+        """The keep-alive session for the url's host."""
+        host = host_of(url)
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self.requests.Session()
+                adapter = self.transport(host) if self.transport else self.requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(host + '/', adapter)
+                session.headers['Accept-Encoding'] = self.encoding
+                self.sessions[host] = session
+        return session
+
+    def throttle(self, url, interval_ms, burst=1):
+        """At most one request per interval_ms to url's host (burst saved up)."""
+        self.limiter.configure(url, interval_ms, burst)
+
+    def backoff(self, attempt, response=None):
+        """Seconds to wait before retry number attempt (1-based)."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def get(self, url, metrics=None, cache=None, limiter=None, **kwargs):
+        """
+        GET with retries; raises like requests.get() + raise_for_status().
+        limiter (anything with acquire(url)) paces the request instead of the
+        shared per-host limiter.
+        """
+        limiter = limiter or self.limiter
+        session = self.session(url)
+        kwargs.setdefault('timeout', 15)
+        if cache is not None:
+            kwargs['headers'] = cache.request_headers(url, kwargs.get('headers'))
+        attempt = 0
+        while True:
+            waited = limiter.acquire(url)
+            if metrics and waited:
+                metrics.waited(waited)
+            started = time.perf_counter()
+            try:
+                response = session.get(url, **kwargs)
+            except (self.requests.ConnectionError, self.requests.Timeout):
+                if attempt >= self.max_retries:
+                    if metrics:
+                        metrics.record(time.perf_counter() - started, failed=True)
+                    raise
+                attempt += 1
+                if metrics:
+                    metrics.record(time.perf_counter() - started, retried=True)
+                self.sleep(self.backoff(attempt))
+                continue
+
+            elapsed = time.perf_counter() - started
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                attempt += 1
+                if metrics:
+                    metrics.record(elapsed, retried=True)
+                response.close()
+                self.sleep(self.backoff(attempt, response))
+                continue
+            if metrics:
+                metrics.record(elapsed, response, failed=response.status_code >= 400)
+            response.raise_for_status()
+            return cache.resolve(url, response) if cache is not None else response
+
+    def get_pages(self, urls, ahead=1, **kwargs):
+        """
+        Yield (url, response, error) for urls in order, keeping up to `ahead`
+        further fetches in flight while the caller works on the current one.
+        Stop iterating early and the in-flight fetches are simply dropped.
+        """
+        if ahead < 1:
+            for url in urls:
+                try:
+                    yield url, self.get(url, **kwargs), None
+                except Exception as e:
+                    yield url, None, e
+            return
+
+        pool = ThreadPoolExecutor(max_workers=ahead)
+        pending = deque()
+        try:
+            for url in urls:
+                pending.append((url, pool.submit(self.get, url, **kwargs)))
+                if len(pending) > ahead:
+                    yield self._result(*pending.popleft())
+            while pending:
+                yield self._result(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    @staticmethod
+    def _result(url, future):
+        try:
+            return url, future.result(), None
+        except Exception as e:
+            return url, None, e
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The process-wide client; sessions outlive a single scrape."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
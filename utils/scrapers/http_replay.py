@@ -0,0 +1,129 @@
+"""
+HTTP Replay — Record scraper traffic to disk and serve it back offline.
+
+A corpus keeps one JSON file per URL under <replayDir>/<slug>/, holding the
+decoded response (status, headers, body). Scrapers choose it through their
+config:
+
+    "replay": "record"   fetch from the live site as usual and save every response,
+                         unconditionally (page-cache validators are not sent)
+    "replay": "replay"   never touch the network; serve the saved responses, and
+                         fail a URL that was not recorded like a refused connection
+    "replayDir"          corpus root (default $SCRAPER_STATE_DIR/replay)
+
+Both work by mounting a requests transport adapter on a scrape-local
+HttpClient, so everything above the socket — retries, rate limiting, the
+page cache, the pipeline stages — runs exactly as it does live. That makes
+a recorded corpus usable both for parser regression tests and for
+benchmarking whole scrapes (python tests/test_http_replay.py --bench).
+
+    corpus = Corpus(replay_dir(config), 'ikman')
+    corpus.save(url, 200, {'Content-Type': 'text/html'}, html)
+    client = client_for('ikman', {'replay': 'replay'})
+"""
+import os
+import json
+import hashlib
+
+from scrape_state import state_dir, write_atomic
+from http_client import HttpClient, get_client
+
+CORPUS_VERSION = 1
+MODES = ('record', 'replay')
+# The stored body is already decoded, so these no longer describe it
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+# Dropped from recorded requests: a 304 would leave the page out of the corpus
+_VALIDATORS = ('If-None-Match', 'If-Modified-Since')
+
+def replay_dir(config):
+    return config.get('replayDir') or os.path.join(state_dir(config), 'replay')
+
+class Corpus:
+    """Recorded responses of one source."""
+
+    def __init__(self, directory, slug):
+        self.directory = os.path.join(directory, slug)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, url):
+        try:
+            with open(self.path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != CORPUS_VERSION or entry.get('url') != url:
+            return None
+        return entry
+
+    def save(self, url, status, headers, body):
+        write_atomic(self.path(url), {
+            'version': CORPUS_VERSION,
+            'url': url,
+            'status': status,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            'body': body,
+        })
+
+def _adapters(requests):
+    """(RecordingAdapter, ReplayAdapter) classes; built on first use so requests loads lazily."""
+    from requests.adapters import BaseAdapter, HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    class RecordingAdapter(HTTPAdapter):
+        def __init__(self, corpus, **kwargs):
+            super().__init__(**kwargs)
+            self.corpus = corpus
+
+        def send(self, request, **kwargs):
+            if request.method == 'GET':
+                for name in _VALIDATORS:
+                    request.headers.pop(name, None)
+            response = super().send(request, **kwargs)
+            if request.method == 'GET':
+                self.corpus.save(request.url, response.status_code, dict(response.headers), response.text)
+            return response
+
+    class ReplayAdapter(BaseAdapter):
+        def __init__(self, corpus):
+            super().__init__()
+            self.corpus = corpus
+
+        def send(self, request, **kwargs):
+            entry = self.corpus.load(request.url)
+            if entry is None:
+                raise requests.ConnectionError(f'Not in the replay corpus: {request.url}', request=request)
+            response = requests.Response()
+            response.status_code = entry['status']
+            response.headers = CaseInsensitiveDict(entry['headers'])
+            response._content = entry['body'].encode('utf-8')
+            response.encoding = 'utf-8'
+            response.url = request.url
+            response.request = request
+            response.reason = 'Replayed'
+            return response
+
+        def close(self):
+            pass
+
+    return RecordingAdapter, ReplayAdapter
+
+def client_for(slug, config):
+    """The HTTP client a scrape of slug should use: the shared one, or a recording/replaying one."""
+    mode = config.get('replay')
+    if not mode:
+        return get_client()
+    if mode not in MODES:
+        raise ValueError(f'Unknown replay mode: {mode} (choose from {", ".join(MODES)})')
+    corpus = Corpus(replay_dir(config), slug)
+    if mode == 'replay':
+        client = HttpClient(max_retries=0)
+        _, ReplayAdapter = _adapters(client.requests)
+        client.transport = lambda host: ReplayAdapter(corpus)
+    else:
+        client = HttpClient()
+        RecordingAdapter, _ = _adapters(client.requests)
+        client.transport = lambda host: RecordingAdapter(
+            corpus, pool_connections=1, pool_maxsize=client.pool_size, max_retries=0)
+    return client
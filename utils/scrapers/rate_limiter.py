@@ -0,0 +1,95 @@
+"""
+Rate Limiter — Per-host token buckets shared by every scraper thread and task.
+
+A bucket refills one token every `interval` seconds (the scraper's
+"rateLimit" in ms) up to `burst` tokens. Taking a token reserves the next
+free slot under a lock and then waits outside it, so any number of threads
+(acquire) or asyncio tasks (acquire_async) hitting one host stay within the
+rate between them, and the first request of a run goes out immediately
+instead of after a fixed sleep.
+
+    limiter = get_limiter()
+    limiter.configure('https://ikman.lk/en/ads', 2000, burst=2)
+    limiter.acquire(url)            # threads
+    await limiter.acquire_async(url)  # asyncio
+"""
+import time
+import threading
+from urllib.parse import urlsplit
+
+class TokenBucket:
+    """interval seconds per token, at most burst tokens saved up."""
+
+    def __init__(self, interval, burst=1, clock=time.monotonic):
+        self.interval = interval
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.tokens = float(self.burst)
+        self.updated = clock()
+
+    def reserve(self):
+        """Take a token, possibly on credit; seconds to wait before using it."""
+        with self.lock:
+            now = self.clock()
+            if self.interval <= 0:
+                return 0.0
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens * self.interval
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        import asyncio  # ~20ms to import; only async callers pay it
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """One TokenBucket per host; hosts never configured are not limited."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        return urlsplit(url).netloc.lower()
+
+    def configure(self, url, interval_ms, burst=1):
+        """Limit url's host to one request per interval_ms, bursting up to burst."""
+        host = self.host(url)
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                self.buckets[host] = TokenBucket(interval_ms / 1000.0, burst)
+            else:
+                with bucket.lock:
+                    bucket.interval = interval_ms / 1000.0
+                    bucket.burst = max(1, burst)
+                    bucket.tokens = min(bucket.tokens, bucket.burst)
+
+    def bucket(self, url):
+        return self.buckets.get(self.host(url))
+
+    def acquire(self, url):
+        """Block until a request to url's host is allowed; returns seconds waited."""
+        bucket = self.bucket(url)
+        return bucket.acquire() if bucket else 0.0
+
+    async def acquire_async(self, url):
+        bucket = self.bucket(url)
+        return await bucket.acquire_async() if bucket else 0.0
+
+_limiter = RateLimiter()
+
+def get_limiter():
+    """The process-wide limiter, so concurrent scrapes of one host share it."""
+    return _limiter
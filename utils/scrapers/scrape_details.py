@@ -0,0 +1,157 @@
+"""
+Scrape Details — Optional stage that fetches each new listing's own page.
+
+Results cards carry a line of description, one thumbnail and rarely the
+size or furnishing, so scraped_analyzer scores them as incomplete. With
+"details": true the pipeline hands every page's new listings to a
+DetailFetcher before the AI analyses run: it fetches their sourceUrl pages
+concurrently — at most "detailConcurrency" at a time per host, through the
+same client and retries as the results pages — parses them with the source's
+spec (card_extractor.detail) and merges in what the card lacked: the longer
+description, every gallery image, beds/baths/size and furnished.
+
+Detail requests are paced by their own per-host bucket, one request per
+"detailRateLimit" ms (default 250) with a burst of detailConcurrency, not by
+the results pages' "rateLimit": that bucket lets one request through per
+interval, which would serialize the fetches and add rateLimit to the crawl
+for every new listing.
+
+What a detail page added is kept per source under details/ in the state dir,
+keyed by the listing's key and the content hash of its card. A listing whose
+card has not changed since gets the stored fields back without a request; a
+changed card (new price, edited text) is fetched again.
+
+    fetcher = DetailFetcher('ikman', config, client, HEADERS, metrics)
+    fetcher.enrich(listings)    # in place
+    fetcher.close()
+    fetcher.summary()  -> {"fetched": 18, "reused": 40, "failed": 1, "maxInFlight": 2}
+"""
+import threading
+
+from rate_limiter import TokenBucket
+from card_extractor import extractor_for
+from scraper_deps import fingerprint_hex
+from scrape_state import ResultStore, listing_key, content_hash
+from http_client import host_of
+
+DETAIL_CONCURRENCY = 2
+DETAIL_WORKERS = 8
+DETAIL_RATE_LIMIT = 250
+
+def merge_details(listing, fields):
+    """Fill listing in from its detail page without overwriting what the card knew."""
+    if len(fields.get('description', '')) > len(listing.get('description', '')):
+        listing['description'] = fields['description']
+        listing['descriptionSimhash'] = fingerprint_hex(fields['description'])
+    images = list(listing.get('images', []))
+    images.extend(src for src in fields.get('images', []) if src not in images)
+    listing['images'] = images
+    for field in ('beds', 'baths', 'size'):
+        if not listing.get(field) and fields.get(field):
+            listing[field] = fields[field]
+    if listing.get('furnished', 'Unknown') == 'Unknown' and fields.get('furnished', 'Unknown') != 'Unknown':
+        listing['furnished'] = fields['furnished']
+    pii = list(listing.get('piiDetails', []))
+    pii.extend(kind for kind in fields.get('piiDetails', []) if kind not in pii)
+    listing['piiDetails'] = pii
+    listing['piiDetected'] = len(pii) > 0
+
+class DetailFetcher:
+    """Detail pages of one scrape, fetched on a shared pool with a per-host cap."""
+
+    def __init__(self, slug, config, client, headers, metrics=None):
+        self.slug = slug
+        self.client = client
+        self.headers = headers
+        self.metrics = metrics
+        self.extractor = extractor_for(slug, config.get('parser', 'lxml'))
+        self.store = ResultStore('details', slug, config)
+        self.concurrency = max(1, config.get('detailConcurrency', DETAIL_CONCURRENCY))
+        self.workers = max(1, config.get('detailWorkers', DETAIL_WORKERS))
+        self.interval = config.get('detailRateLimit', DETAIL_RATE_LIMIT) / 1000.0
+        self.pool = None
+        self.slots = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.fetched = self.reused = self.failed = 0
+        self.in_flight = self.max_in_flight = 0
+
+    def slot(self, url):
+        """The semaphore capping concurrent detail fetches to url's host."""
+        host = host_of(url)
+        with self.lock:
+            if host not in self.slots:
+                self.slots[host] = threading.BoundedSemaphore(self.concurrency)
+            return self.slots[host]
+
+    def acquire(self, url):
+        """
+        Limiter hook for HttpClient.get: wait for a token of the host's detail
+        bucket. From here until get() returns the request counts as in flight.
+        """
+        host = host_of(url)
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.interval, burst=self.concurrency)
+            bucket = self.buckets[host]
+        waited = bucket.acquire()
+        if not getattr(self.local, 'sending', False):
+            self.local.sending = True
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return waited
+
+    def fetch(self, url):
+        with self.slot(url):
+            try:
+                response = self.client.get(url, headers=self.headers, timeout=15,
+                                           metrics=self.metrics, limiter=self)
+            finally:
+                if getattr(self.local, 'sending', False):
+                    self.local.sending = False
+                    with self.lock:
+                        self.in_flight -= 1
+            return self.extractor.detail(response.text)
+
+    def enrich(self, listings):
+        """Merge detail fields into listings in place; returns once all are done."""
+        pending = []
+        for listing in listings:
+            url = listing.get('sourceUrl')
+            if not url:
+                continue
+            key, digest = listing_key(listing), content_hash(listing)
+            fields = self.store.get(key, digest)
+            if fields is not None:
+                merge_details(listing, fields)
+                self.reused += 1
+                continue
+            if self.pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix=f'{self.slug}-details')
+            pending.append((listing, key, digest, self.pool.submit(self.fetch, url)))
+
+        for listing, key, digest, future in pending:
+            try:
+                fields = future.result()
+            except Exception:
+                self.failed += 1
+                continue
+            self.fetched += 1
+            self.store.put(key, digest, fields)
+            merge_details(listing, fields)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.store.save()
+
+    def summary(self):
+        return {
+            'fetched': self.fetched,
+            'reused': self.reused,
+            'failed': self.failed,
+            'maxInFlight': self.max_in_flight,
+        }
@@ -0,0 +1,373 @@
+"""
+Scrape Pipeline — Staged fetch → parse → enrich for a scraper's results pages.
+
+    fetch   thread; rate-limited, conditional (http_cache) page downloads
+    parse   process pool running the source's card_extractor over the HTML
+            (lxml parsing is CPU-bound), results kept in page order
+    enrich  the calling thread: seen-ID tracking (scrape_state), optionally
+            the new listings' detail pages (scrape_details), then
+            scraped_analyzer, scam_detector and auto_tagger on every new listing
+            whose content changed since it was last analysed
+
+Stages hand pages over through bounded queues and at most `pipelineDepth`
+pages are in flight at once, so a fast fetcher waits for a slow parser
+instead of piling pages up in memory. Incremental runs allow one page in
+flight, so stopping at the first all-known page costs no extra request.
+
+    result = scrape_source('house', config)     # URLs and headers from site_specs
+    result['stats']['pipeline']
+    -> {"fetch": {"pages": 3, "seconds": 1.2, "perSecond": 2.5}, "parse": {...},
+        "enrich": {"listings": 60, ...}, "parseWorkers": 2, "depth": 4, "parser": "lxml"}
+
+Config: "parseWorkers" (0 parses in a thread instead of a pool), "parseTimeout"
+(seconds per page, default 60), "pipelineDepth",
+"parser" ("lxml", the default, or "bs4"; see card_extractor), "replay"
+("record" or "replay" with "replayDir"; see http_replay),
+"details" (true fetches and merges each new listing's own page, see
+scrape_details; "detailConcurrency" per host, paced by "detailRateLimit"
+rather than "rateLimit"), "enrich" (false skips the
+AI stage), "analysisCache" (false re-analyses listings that are unchanged
+since their stored analysis), "localStats" ({town: {avgPrice, ...}} used by
+the enrich stage, keyed by lowercased town). A callable "emit"
+(page, listings) is handed each page's new listings as soon as they are
+enriched, instead of collecting them into the result (scraper_runner's
+NDJSON mode).
+
+Progress is checkpointed after every page (scrape_state.Checkpoint;
+"checkpoint": false turns it off). With "resume": true a run of the same
+crawl skips the pages an interrupted run already finished and returns their
+listings too — except with "emit", which streamed them the first time.
+"""
+import os
+import json
+import time
+import hashlib
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from card_extractor import extractor_for
+from site_specs import SPECS, page_url
+from http_client import get_client, RequestMetrics
+from http_replay import client_for
+from http_cache import HttpCache
+from scrape_state import Tracker, Checkpoint, ResultStore, listing_key, content_hash
+from scrape_details import DetailFetcher
+
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+PIPELINE_DEPTH = 4
+# Seconds one page may take to parse before it counts as a page error
+PARSE_TIMEOUT = 60
+
+_DONE = object()
+
+def parse_page(slug, html, page, parser='lxml'):
+    """Parse-stage task: the source's card extractor over one page's HTML."""
+    started = time.perf_counter()
+    stats, errors = {'totalFound': 0, 'errors': 0}, []
+    listings = extractor_for(slug, parser).parse(html, page, stats, errors)
+    return listings, stats, errors, time.perf_counter() - started
+
+def _init_parse_worker(specs):
+    """Parse workers start from a fresh interpreter; hand them the parent's specs."""
+    SPECS.clear()
+    SPECS.update(specs)
+    extractor_for.cache_clear()
+
+def parse_pool(workers):
+    """
+    A process pool for the parse stage. Workers come from a forkserver (or
+    spawn), never a fork of this process: the runner scrapes sources on
+    concurrent threads, and a fork taken while one of them holds a module
+    lock (text_scanner's, say) would deadlock the child on it.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        context.set_forkserver_preload(['scrape_pipeline'])
+    return ProcessPoolExecutor(workers, mp_context=context,
+                               initializer=_init_parse_worker, initargs=(dict(SPECS),))
+
+def _kill_pool(pool):
+    """Stop a pool whose worker may be stuck; shutdown() alone would wait on it forever."""
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+class StageTimer:
+    """Items handled and busy seconds of one stage."""
+
+    def __init__(self, unit):
+        self.unit = unit
+        self.items = 0
+        self.seconds = 0.0
+
+    def add(self, items, seconds):
+        self.items += items
+        self.seconds += seconds
+
+    def summary(self):
+        return {
+            self.unit: self.items,
+            'seconds': round(self.seconds, 3),
+            'perSecond': round(self.items / self.seconds, 1) if self.seconds else 0.0,
+        }
+
+class Enricher:
+    """
+    The per-listing AI analyses Node used to spawn one process per listing for.
+
+    With a ResultStore, a listing whose content hash — and the facts and town
+    stats the analysers also read — match the last run gets its stored
+    analysis back instead of being analysed again.
+    """
+
+    # Read by the analysers besides what content_hash covers
+    CONTEXT_FIELDS = ('beds', 'baths', 'size', 'type', 'furnished', 'piiDetected')
+
+    def __init__(self, local_stats, store=None):
+        import scraped_analyzer, scam_detector, auto_tagger
+        self.scraped_analyzer = scraped_analyzer
+        self.scam_detector = scam_detector
+        self.auto_tagger = auto_tagger
+        self.local_stats = local_stats or {}
+        self.store = store
+        self.analysed = self.reused = 0
+        self.seconds = 0.0
+
+    def digest(self, listing, local):
+        context = json.dumps([[listing.get(field) for field in self.CONTEXT_FIELDS], local], sort_keys=True)
+        return f"{content_hash(listing)}:{hashlib.sha1(context.encode('utf-8')).hexdigest()[:16]}"
+
+    def enrich(self, listing):
+        town = (listing.get('location') or {}).get('town', '').lower()
+        local = self.local_stats.get(town, {})
+        if self.store is not None:
+            key, digest = listing_key(listing), self.digest(listing, local)
+            analysis = self.store.get(key, digest)
+            if analysis is not None:
+                listing['aiAnalysis'] = analysis
+                self.reused += 1
+                return
+        started = time.perf_counter()
+        analysis = self.scraped_analyzer.analyze_listing({'listing': listing, 'localStats': local})
+        scam = self.scam_detector.analyze_listings(
+            {'listings': [listing], 'avgPrice': local.get('avgPrice', 0)})['results'][0]
+        tags = self.auto_tagger.extract_tags(listing)
+        analysis.update({
+            'riskLevel': scam['riskLevel'],
+            'scamFlags': scam['flags'],
+            'autoTags': tags['tags'],
+            'nearbyPlaces': tags['nearbyPlaces'],
+            'localStatsUsed': bool(local),
+        })
+        listing['aiAnalysis'] = analysis
+        self.seconds += time.perf_counter() - started
+        self.analysed += 1
+        if self.store is not None:
+            self.store.put(key, digest, analysis)
+
+    def summary(self):
+        """Analyses run and skipped, and what the skipped ones would have cost at this run's pace."""
+        per_listing = self.seconds / self.analysed if self.analysed else 0.0
+        return {
+            'analysed': self.analysed,
+            'reused': self.reused,
+            'seconds': round(self.seconds, 3),
+            'estimatedSecondsSaved': round(self.reused * per_listing, 3),
+        }
+
+class PagePipeline:
+    """One scrape of one source's results pages."""
+
+    def __init__(self, slug, config, headers=None):
+        self.slug = slug
+        self.headers = SPECS[slug]['headers'] if headers is None else headers
+        self.config = config
+        self.parser = config.get('parser', 'lxml')
+        self.backend = extractor_for(slug, self.parser).backend
+        self.client = client_for(slug, config)
+        self.metrics = RequestMetrics()
+        self.tracker = Tracker(slug, config)
+        self.cache = HttpCache(slug, config)
+        self.workers = config.get('parseWorkers', PARSE_WORKERS)
+        self.depth = max(1, config.get('pipelineDepth', PIPELINE_DEPTH))
+        self.parse_timeout = config.get('parseTimeout', PARSE_TIMEOUT)
+        self.parse_stuck = False
+        self.enricher = None
+        if config.get('enrich', True):
+            store = ResultStore('analyses', slug, config) if config.get('analysisCache', True) else None
+            self.enricher = Enricher(config.get('localStats'), store)
+        self.details = (DetailFetcher(slug, config, self.client, self.headers, self.metrics)
+                        if config.get('details') else None)
+        self.timers = {'fetch': StageTimer('pages'), 'parse': StageTimer('pages'),
+                       'details': StageTimer('listings'), 'enrich': StageTimer('listings')}
+        self.emit = config.get('emit')
+        self.stop = threading.Event()
+
+    def fetch_stage(self, urls, out, credits, first_page=1):
+        """Download pages in order; 304s with stored listings skip the parse stage."""
+        for page, url in enumerate(urls, first_page):
+            credits.acquire()
+            if self.stop.is_set():
+                break
+            started = time.perf_counter()
+            try:
+                response = self.client.get(url, headers=self.headers, timeout=15,
+                                           metrics=self.metrics, cache=self.cache)
+                cached = self.cache.parsed(url, response)
+                item = cached if cached is not None else response.text
+            except Exception as e:
+                out.put((page, url, None, e))
+                continue
+            self.timers['fetch'].add(1, time.perf_counter() - started)
+            out.put((page, url, response, item))
+        out.put(_DONE)
+
+    def parse_stage(self, source, out, pool):
+        """Hand HTML to the pool; forward futures in page order."""
+        while (entry := source.get()) is not _DONE:
+            page, url, response, item = entry
+            if isinstance(item, str):
+                if pool is None:
+                    future = Future()
+                    try:
+                        future.set_result(parse_page(self.slug, item, page, self.parser))
+                    except Exception as e:
+                        future.set_exception(e)
+                else:
+                    future = pool.submit(parse_page, self.slug, item, page, self.parser)
+                item = future
+            out.put((page, url, response, item))
+        out.put(_DONE)
+
+    def consume(self, entry, listings, errors, stats):
+        """Enrich stage for one page: collect parse results, track, analyse; returns its new listings."""
+        page, url, response, item = entry
+        if isinstance(item, Exception):
+            errors.append({'page': page, 'message': str(item), 'source': self.slug})
+            stats['errors'] += 1
+            return []
+
+        stats['pagesScraped'] += 1
+        if isinstance(item, Future):
+            try:
+                page_listings, page_stats, page_errors, seconds = item.result(timeout=self.parse_timeout)
+            except FutureTimeout:
+                self.parse_stuck = True
+                errors.append({'page': page, 'message': f'Parse timed out after {self.parse_timeout}s',
+                               'source': self.slug})
+                stats['errors'] += 1
+                return []
+            except Exception as e:
+                errors.append({'page': page, 'message': f'Parse failed: {e}', 'source': self.slug})
+                stats['errors'] += 1
+                return []
+            self.timers['parse'].add(1, seconds)
+            stats['totalFound'] += page_stats['totalFound']
+            stats['errors'] += page_stats['errors']
+            errors.extend(page_errors)
+            self.cache.store(url, response, page_listings)
+        else:
+            page_listings = item
+            stats['totalFound'] += len(page_listings)
+
+        fresh, more = self.tracker.page_done(page_listings)
+        if self.details:
+            started = time.perf_counter()
+            self.details.enrich(fresh)
+            self.timers['details'].add(len(fresh), time.perf_counter() - started)
+        if self.enricher:
+            started = time.perf_counter()
+            for listing in fresh:
+                self.enricher.enrich(listing)
+            self.timers['enrich'].add(len(fresh), time.perf_counter() - started)
+        if self.emit:
+            self.emit(page, fresh)
+        else:
+            listings.extend(fresh)
+        if not more:
+            self.stop.set()
+        return fresh
+
+    def run(self, urls):
+        """Scrape urls (results pages, in order); returns {listings, stats, errors}."""
+        stats = {'pagesScraped': 0, 'totalFound': 0, 'errors': 0}
+        listings, errors = [], []
+        checkpoint = Checkpoint(self.slug, self.config, urls)
+        restored = checkpoint.restore()
+        done = restored_count = 0
+        if restored is None:
+            checkpoint.start()
+        else:
+            done, restored_listings, restored_stats, errors = restored
+            stats.update(restored_stats)
+            restored_count = len(restored_listings)
+            self.tracker.resume(done, restored_listings)
+            # Streamed listings already went out with the run that scraped them
+            if not self.emit:
+                listings.extend(restored_listings)
+        for url in urls:
+            self.client.throttle(url, self.config.get('rateLimit', 2000), self.config.get('rateBurst', 1))
+
+        depth = self.depth if self.tracker.lookahead() else 1
+        credits = threading.Semaphore(depth)
+        fetched, parsed = queue.Queue(maxsize=depth), queue.Queue(maxsize=depth)
+        pool = None
+        if self.workers > 0:
+            pool = parse_pool(self.workers)
+        stages = [
+            threading.Thread(target=self.fetch_stage, args=(urls[done:], fetched, credits, done + 1), daemon=True),
+            threading.Thread(target=self.parse_stage, args=(fetched, parsed, pool), daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+
+        drained = False
+        try:
+            while (entry := parsed.get()) is not _DONE:
+                if not self.stop.is_set():
+                    fresh = self.consume(entry, listings, errors, stats)
+                    checkpoint.page_done(entry[0], fresh, stats, errors)
+                # Only now may the fetcher start another page
+                credits.release()
+            drained = True
+        finally:
+            self.stop.set()
+            while not drained:
+                credits.release()
+                drained = parsed.get() is _DONE
+            for stage in stages:
+                stage.join()
+            if pool is not None:
+                if self.parse_stuck:
+                    _kill_pool(pool)
+                else:
+                    pool.shutdown()
+            if self.details:
+                self.details.close()
+            if self.enricher and self.enricher.store is not None:
+                self.enricher.store.save()
+            if self.client is not get_client():
+                self.client.close()
+
+        self.tracker.finish(stats)
+        checkpoint.clear()
+        stats['checkpoint'] = {'resumedAfterPage': done, 'restoredListings': restored_count}
+        stats['cache'] = self.cache.summary()
+        stats['http'] = self.metrics.summary()
+        if self.details:
+            stats['details'] = self.details.summary()
+        if self.enricher:
+            stats['analysis'] = self.enricher.summary()
+        stats['pipeline'] = dict({name: timer.summary() for name, timer in self.timers.items()},
+                                 parseWorkers=self.workers, depth=depth, parser=self.backend)
+        return {'listings': listings, 'stats': stats, 'errors': errors}
+
+def scrape_source(slug, config):
+    """Scrape maxPages results pages of a site_specs source."""
+    urls = [page_url(slug, page, config) for page in range(1, config.get('maxPages', 3) + 1)]
+    result = PagePipeline(slug, config).run(urls)
+    return dict(result, source=SPECS[slug]['source'])
@@ -0,0 +1,352 @@
+"""
+Scrape State — Persisted per-source memory of the listings already seen.
+
+One JSON file per source under $SCRAPER_STATE_DIR (config "stateDir"
+overrides it) records every listing key (sourceId, else sourceUrl) with
+when it was first and last seen, plus when the newest one first appeared.
+Files are replaced atomically, so a crash never leaves half a state behind.
+
+How a scrape uses it depends on the runner's "type":
+  full         crawl every page, refresh lastSeen
+  incremental  emit only unseen listings and stop paginating at the first
+               page made entirely of known listings
+  recheck      no crawl: refetch only listings not seen for
+               recheckAfterHours, reporting which are still live
+
+    tracker = Tracker('ikman', config)
+    for page ...:
+        fresh, more = tracker.page_done(page_listings)
+        listings.extend(fresh)
+        if not more: break
+    tracker.finish(stats)
+
+ResultStore keeps per-listing results (detail pages, AI analyses) next to
+the content_hash of the listing they were computed for, so an unchanged
+listing is not fetched or analysed twice.
+
+Checkpoint (below) saves a crawl's progress page by page under
+checkpoints/, so "resume": true continues an interrupted crawl instead of
+starting over; see scrape_pipeline.py.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), 'houserentlk-scrapers')
+STATE_VERSION = 1
+RECHECK_AFTER_HOURS = 24
+RECHECK_LIMIT = 200
+CHECKPOINT_MAX_AGE_HOURS = 24
+
+def state_dir(config=None):
+    return (config or {}).get('stateDir') or os.environ.get('SCRAPER_STATE_DIR') or DEFAULT_STATE_DIR
+
+def write_atomic(path, data):
+    """Write JSON next to path, then rename over it."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def listing_key(listing):
+    return listing.get('sourceId') or listing.get('sourceUrl') or ''
+
+def _normalized(text):
+    return ' '.join(str(text or '').lower().split())
+
+def content_hash(listing):
+    """
+    Hash of what a listing says — title, description, price, location and
+    images, case and whitespace folded — so a re-scraped ad that has not
+    changed hashes the same.
+    """
+    location = listing.get('location') or {}
+    parts = [
+        _normalized(listing.get('title')),
+        _normalized(listing.get('description')),
+        str(int(listing.get('price') or 0)),
+        _normalized(location.get('town')),
+        _normalized(location.get('district')),
+        _normalized(location.get('rawAddress')),
+    ] + sorted(listing.get('images') or [])
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class ResultStore:
+    """
+    Work already done per listing, under <kind>/<slug>.json: listing key ->
+    {hash, value, savedAt}. A value is only handed back while the hash it
+    was saved with still matches, i.e. while the listing is unchanged.
+    """
+
+    def __init__(self, kind, slug, config):
+        self.path = os.path.join(state_dir(config), kind, f'{slug}.json')
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key, digest):
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry['value'] if entry and entry['hash'] == digest else None
+
+    def put(self, key, digest, value):
+        with self.lock:
+            self.entries[key] = {'hash': digest, 'value': value, 'savedAt': time.time()}
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'version': STATE_VERSION, 'entries': self.entries}
+            self.dirty = False
+        write_atomic(self.path, data)
+
+class SourceState:
+    """Seen listings of one source: key -> [firstSeen, lastSeen, sourceUrl]."""
+
+    def __init__(self, slug, directory):
+        self.slug = slug
+        self.path = os.path.join(directory, f'{slug}.json')
+        self.ids = {}
+        self.newest_seen_at = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                self.ids = data.get('ids', {})
+                self.newest_seen_at = data.get('newestSeenAt', 0)
+        except (OSError, ValueError):
+            pass
+
+    def is_known(self, key):
+        return bool(key) and key in self.ids
+
+    def mark_seen(self, listings, now=None):
+        now = now or time.time()
+        for listing in listings:
+            key = listing_key(listing)
+            if not key:
+                continue
+            entry = self.ids.get(key)
+            if entry is None:
+                self.ids[key] = [now, now, listing.get('sourceUrl', '')]
+                self.newest_seen_at = now
+            else:
+                entry[1] = now
+
+    def forget(self, key):
+        self.ids.pop(key, None)
+
+    def stale(self, max_age_seconds, limit, now=None):
+        """(key, sourceUrl) of listings not seen for max_age_seconds, oldest first."""
+        cutoff = (now or time.time()) - max_age_seconds
+        entries = sorted((entry[1], key, entry[2]) for key, entry in self.ids.items()
+                         if entry[1] < cutoff and entry[2])
+        return [(key, url) for _, key, url in entries[:limit]]
+
+    def save(self):
+        write_atomic(self.path, {
+            'version': STATE_VERSION,
+            'slug': self.slug,
+            'newestSeenAt': self.newest_seen_at,
+            'ids': self.ids,
+        })
+
+class Tracker:
+    """One scrape's view of its source state, for the configured mode."""
+
+    def __init__(self, slug, config):
+        self.mode = config.get('mode', 'full')
+        self.state = SourceState(slug, state_dir(config))
+        self.skipped = 0
+        self.stopped_at = None
+        self.pages = 0
+
+    def lookahead(self):
+        """Pages to fetch ahead of parsing; none when any page may end the crawl."""
+        return 0 if self.mode == 'incremental' else 1
+
+    def page_done(self, page_listings):
+        """Record one results page; returns (listings to emit, keep paginating)."""
+        self.pages += 1
+        fresh = [l for l in page_listings if not self.state.is_known(listing_key(l))]
+        self.state.mark_seen(page_listings)
+        if self.mode != 'incremental':
+            return page_listings, True
+        self.skipped += len(page_listings) - len(fresh)
+        if page_listings and not fresh:
+            self.stopped_at = self.pages
+            return [], False
+        return fresh, True
+
+    def resume(self, pages, listings):
+        """Carry on after pages an interrupted run already handled."""
+        self.pages = pages
+        self.state.mark_seen(listings)
+
+    def finish(self, stats):
+        stats['incremental'] = {
+            'mode': self.mode,
+            'knownSkipped': self.skipped,
+            'stoppedAtPage': self.stopped_at,
+            'knownListings': len(self.state.ids),
+            'newestSeenAt': self.state.newest_seen_at,
+        }
+        self.state.save()
+
+class Checkpoint:
+    """
+    Progress of one source's crawl, saved after every results page so a crawl
+    that dies halfway (or is killed by its caller's timeout) can pick up where
+    it stopped. Listings are appended to checkpoints/<slug>.ndjson as pages
+    finish; checkpoints/<slug>.json is then replaced atomically with the page
+    reached, how many of those lines count, the stats and the errors, so a
+    torn final line is simply ignored. A crawl that completes removes both.
+
+    A checkpoint only resumes the same crawl (same results URLs, same mode),
+    and only for checkpointMaxAgeHours: past that the first pages have moved
+    on and the crawl starts over.
+    """
+
+    def __init__(self, slug, config, urls):
+        self.enabled = config.get('checkpoint', True)
+        self.resume = config.get('resume', False)
+        self.max_age = config.get('checkpointMaxAgeHours', CHECKPOINT_MAX_AGE_HOURS) * 3600
+        directory = os.path.join(state_dir(config), 'checkpoints')
+        self.path = os.path.join(directory, f'{slug}.json')
+        self.listings_path = os.path.join(directory, f'{slug}.ndjson')
+        self.slug = slug
+        self.crawl = hashlib.sha1('\n'.join([config.get('mode', 'full')] + list(urls)).encode('utf-8')).hexdigest()
+        self.page = 0
+        self.count = 0
+
+    def restore(self):
+        """(page, listings, stats, errors) saved by an unfinished run of this crawl, or None."""
+        if not (self.enabled and self.resume):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != STATE_VERSION or data.get('crawl') != self.crawl:
+            return None
+        if time.time() - data.get('updatedAt', 0) > self.max_age:
+            return None
+        listings = []
+        try:
+            with open(self.listings_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if len(listings) == data['listings']:
+                        break
+                    listings.append(json.loads(line))
+        except (OSError, ValueError):
+            return None
+        if len(listings) != data['listings']:
+            return None
+        self.page, self.count = data['page'], data['listings']
+        # Lines past the count belong to a page whose checkpoint never landed
+        with open(self.listings_path, 'rb+') as f:
+            for _ in range(self.count):
+                f.readline()
+            f.truncate(f.tell())
+        return self.page, listings, data['stats'], data['errors']
+
+    def start(self):
+        """Begin a crawl from scratch (nothing restored)."""
+        if not self.enabled:
+            return
+        self.clear()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def page_done(self, page, listings, stats, errors):
+        """Append page's listings, then move the checkpoint past page."""
+        if not self.enabled:
+            return
+        if listings:
+            with open(self.listings_path, 'a', encoding='utf-8') as f:
+                for listing in listings:
+                    f.write(json.dumps(listing, ensure_ascii=False, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        self.page, self.count = page, self.count + len(listings)
+        write_atomic(self.path, {
+            'version': STATE_VERSION,
+            'slug': self.slug,
+            'crawl': self.crawl,
+            'page': page,
+            'listings': self.count,
+            'stats': {key: stats[key] for key in ('pagesScraped', 'totalFound', 'errors')},
+            'errors': errors,
+            'updatedAt': time.time(),
+        })
+
+    def clear(self):
+        for path in (self.path, self.listings_path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+def recheck_source(slug, config, headers, source_name=''):
+    """
+    Refetch the source's stale listings only. Live ones come back as
+    {'sourceUrl', 'sourceId', 'isActive': True, 'recheck': True}; 404/410 ones
+    with isActive False and are forgotten.
+    """
+    from http_client import get_client, RequestMetrics
+
+    state = SourceState(slug, state_dir(config))
+    max_age = config.get('recheckAfterHours', RECHECK_AFTER_HOURS) * 3600
+    client = get_client()
+    metrics = RequestMetrics()
+    listings, errors = [], []
+    stats = {'pagesScraped': 0, 'totalFound': 0, 'errors': 0, 'rechecked': 0, 'gone': 0}
+
+    stale = state.stale(max_age, config.get('recheckLimit', RECHECK_LIMIT))
+    for url in {url for _, url in stale}:
+        client.throttle(url, config.get('rateLimit', 2000), config.get('rateBurst', 1))
+    pages = client.get_pages([url for _, url in stale], headers=headers, timeout=15, metrics=metrics)
+
+    for (key, _), (url, response, error) in zip(stale, pages):
+        active = error is None
+        if error is not None:
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+            if status not in (404, 410):
+                errors.append({'page': 0, 'message': f'{url}: {error}', 'source': slug})
+                stats['errors'] += 1
+                continue
+        stats['rechecked'] += 1
+        listings.append({'sourceUrl': url, 'sourceId': key, 'isActive': active, 'recheck': True})
+        if active:
+            state.mark_seen([{'sourceId': key, 'sourceUrl': url}])
+        else:
+            stats['gone'] += 1
+            state.forget(key)
+
+    state.save()
+    stats['totalFound'] = len(listings)
+    stats['http'] = metrics.summary()
+    return {'listings': listings, 'stats': stats, 'errors': errors, 'source': source_name or slug}
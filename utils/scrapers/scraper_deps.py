@@ -0,0 +1,23 @@
+"""
+Scraper Dependencies — shared helpers every scraper imports.
+
+PII detection and redaction come from utils/ai/text_scanner.py, so scraped
+listings are flagged with the same rules the AI scam detector uses, and
+descriptions are fingerprinted with utils/ai/simhash.py at ingest. The HTTP
+and parsing stacks are imported on first use by http_client.py and
+card_extractor.py, which raise MISSING_DEPS when they are not installed.
+
+    detect_pii(f"{title} {desc}"), strip_pii(title)
+    fingerprint_hex(desc)   -> 'descriptionSimhash'
+"""
+import os
+import sys
+
+AI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ai')
+if AI_DIR not in sys.path:
+    sys.path.insert(0, AI_DIR)
+
+from text_scanner import detect_pii, redact_pii as strip_pii
+from simhash import fingerprint_hex
+
+MISSING_DEPS = "Missing dependencies. Run: pip install requests beautifulsoup4 lxml"
@@ -2,21 +2,52 @@
 Scraper Runner — Orchestrator that runs selected scrapers and deduplicates results.
 Input (stdin JSON): {
     "sources": [{"slug": "ikman", "script": "ikman_scraper.py", "config": {...}}, ...],
-    "type": "full|incremental|recheck"
+    "type": "full|incremental|recheck",   (see scrape_state.py)
+    "maxWorkers": N,           (optional, default: one thread per source)
+    "localStats": {town: {...}} (optional, for the enrich stage; see scrape_pipeline.py)
+    "resume": true             (optional, continue interrupted crawls from their checkpoints)
+    "replay": "record|replay"  (optional, with "replayDir"; see http_replay.py)
+    "output": "json|ndjson"    (optional, default json; also --ndjson)
 }
 Output (stdout JSON): {
-    "results": { "ikman": {...}, "lpw": {...} },
-    "combined": { "listings": [...], "totalScraped": N },
+    "results": { "ikman": {..., "seconds": S}, "lpw": {...} },
+    "combined": { "listings": [...], "totalScraped": N, "wallSeconds": S,
+                  "analysis": {"analysed": N, "reused": N, "estimatedSecondsSaved": S} },
     "errors": [...]
 }
+Output (stdout NDJSON), one compact record per line as the crawl goes, deduplicated
+across sources the same way, with the stats record last:
+    {"type": "listing", "source": "ikman", "listing": {...}}
+    {"type": "page", "source": "ikman", "page": 2, "listings": 17}
+    {"type": "source", "source": "ikman", "summary": {..., "seconds": S}}
+    {"type": "error", "error": {"source": "lpw", "message": "..."}}
+    {"type": "stats", "results": {...}, "totalScraped": N, "duplicatesRemoved": N, "wallSeconds": S,
+     "analysis": {...}}
+
+"analysis" reports how many listings the enrich stages analysed and how many
+kept their stored analysis because their content hash was unchanged.
+
+--serve keeps one process for many jobs: each stdin line is a job config as
+above, answered by its JSON result on one line (or its NDJSON records, stats
+last). Scraper modules, compiled selectors and HTTP sessions stay loaded
+between jobs (ScraperRegistry).
 """
 import sys
 import json
-import importlib.util
+import time
+import importlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 SCRAPERS_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Scrapers import shared helpers (scraper_deps) from this directory
+if SCRAPERS_DIR not in sys.path:
+    sys.path.insert(0, SCRAPERS_DIR)
+
+from scrape_state import recheck_source
+
 # Map slug to scraper module and function
 SCRAPER_MAP = {
     'ikman': ('ikman_scraper', 'scrape_ikman'),
@@ -27,14 +58,78 @@ SCRAPER_MAP = {
 }
 
 def load_scraper(module_name):
-    """Dynamically load a scraper module."""
+    """Import a scraper module from this directory; None when there is no such file."""
     module_path = os.path.join(SCRAPERS_DIR, f"{module_name}.py")
     if not os.path.exists(module_path):
         return None
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    return importlib.import_module(module_name)
+
+class ScraperRegistry:
+    """
+    Scraper entry points, each module loaded and checked once per process.
+    A slug that failed to load keeps its error instead of being retried.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.problems = {}
+        self.lock = threading.Lock()
+
+    def get(self, slug):
+        """(module, scrape function) of slug; raises LookupError saying what is missing."""
+        with self.lock:
+            if slug in self.entries:
+                return self.entries[slug]
+            if slug not in self.problems:
+                self.problems[slug] = self._load(slug)
+            if slug in self.entries:
+                return self.entries[slug]
+            raise LookupError(self.problems[slug])
+
+    def _load(self, slug):
+        if slug not in SCRAPER_MAP:
+            return f'Unknown scraper slug: {slug}'
+        module_name, func_name = SCRAPER_MAP[slug]
+        try:
+            module = load_scraper(module_name)
+        except Exception as e:
+            return f'Scraper module failed to load: {module_name}.py: {e}'
+        if not module:
+            return f'Scraper module not found: {module_name}.py'
+        scrape_func = getattr(module, func_name, None)
+        if not callable(scrape_func):
+            return f'Scraper function not found: {func_name}'
+        self.entries[slug] = (module, scrape_func)
+        return None
+
+    def validate(self, slugs):
+        """{slug: error message} for every slug that cannot be run."""
+        problems = {}
+        for slug in slugs:
+            try:
+                self.get(slug)
+            except LookupError as e:
+                problems[slug] = str(e)
+        return problems
+
+    def warm(self, slugs=None):
+        """
+        Load every scraper up front, compile its card selectors and open its
+        host's HTTP session, so the first job pays no more than later ones.
+        Returns validate()'s problems.
+        """
+        from site_specs import SPECS
+        from card_extractor import extractor_for
+        from http_client import get_client
+        slugs = list(SCRAPER_MAP) if slugs is None else slugs
+        problems = self.validate(slugs)
+        for slug in slugs:
+            if slug in SPECS and slug not in problems:
+                extractor_for(slug)
+                get_client().session(SPECS[slug]['searchUrl'])
+        return problems
+
+REGISTRY = ScraperRegistry()
 
 def deduplicate_listings(listings):
     """Remove duplicate listings by sourceUrl."""
@@ -49,84 +144,202 @@ def deduplicate_listings(listings):
             unique.append(listing)
     return unique, len(listings) - len(unique)
 
-def run_scrapers(config):
+class NdjsonWriter:
+    """Writes runner records as JSON lines, dropping listings already written."""
+
+    def __init__(self, out):
+        self.out = out
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.written = 0
+        self.duplicates = 0
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            self.out.write(line + '\n')
+            self.out.flush()
+
+    def listings(self, slug, listings):
+        for listing in listings:
+            listing['_sourceSlug'] = slug
+            url = listing.get('sourceUrl', '')
+            with self.lock:
+                if url and url in self.seen:
+                    self.duplicates += 1
+                    continue
+                self.seen.add(url)
+                self.written += 1
+            self.write({'type': 'listing', 'source': slug, 'listing': listing})
+
+def analysis_report(results):
+    """Enrich-stage work across sources: analyses run vs reused from unchanged listings."""
+    report = {'analysed': 0, 'reused': 0, 'estimatedSecondsSaved': 0.0}
+    for summary in results.values():
+        analysis = summary.get('stats', {}).get('analysis', {})
+        for key in report:
+            report[key] += analysis.get(key, 0)
+    report['estimatedSecondsSaved'] = round(report['estimatedSecondsSaved'], 2)
+    return report
+
+def run_source(slug, scraper_config, scrape_type='full', writer=None):
+    """
+    Run one scraper (or recheck its stale listings); returns (summary,
+    listings, errors). With a writer, listings are streamed to it as each
+    page is done and the returned list is empty.
+    """
+    scraper_config = dict(scraper_config, mode=scrape_type)
+    streamed = [0]
+    if writer is not None:
+        def emit(page, listings):
+            streamed[0] += len(listings)
+            writer.listings(slug, listings)
+            writer.write({'type': 'page', 'source': slug, 'page': page, 'listings': len(listings)})
+        scraper_config['emit'] = emit
+    started = time.time()
+    try:
+        try:
+            module, scrape_func = REGISTRY.get(slug)
+        except LookupError as e:
+            return None, [], [{'source': slug, 'message': str(e)}]
+
+        if scrape_type == 'recheck':
+            result = recheck_source(slug, scraper_config, getattr(module, 'HEADERS', {}))
+        else:
+            result = scrape_func(scraper_config)
+        listings = result.get('listings', [])
+
+        # Tag each listing with its source slug
+        for listing in listings:
+            listing['_sourceSlug'] = slug
+        if writer is not None:
+            # Scrapers without page streaming (and rechecks) hand them over at the end
+            writer.listings(slug, listings)
+            streamed[0] += len(listings)
+            listings = []
+
+        summary = {
+            'stats': result.get('stats', {}),
+            'listingCount': streamed[0] if writer is not None else len(listings),
+            'source': result.get('source', slug),
+            'seconds': round(time.time() - started, 2),
+        }
+        return summary, listings, result.get('errors', [])
+
+    except Exception as e:
+        return {'stats': {}, 'listingCount': 0, 'error': str(e)}, [], [{
+            'source': slug,
+            'message': f'Scraper execution failed: {str(e)}'
+        }]
+
+def run_scrapers(config, writer=None):
+    """
+    Run every requested source concurrently, one thread per source (each
+    scraper keeps its own per-host rate limit), merging listings as each
+    source finishes. Wall time is roughly that of the slowest source.
+
+    With an NdjsonWriter everything is streamed instead, and the trailing
+    stats record is returned.
+    """
     sources = config.get('sources', [])
     scrape_type = config.get('type', 'full')
-    
+    started = time.time()
+
     results = {}
     all_listings = []
     all_errors = []
-    
+
+    problems = REGISTRY.validate({source.get('slug', '') for source in sources})
+    runnable = []
     for source in sources:
         slug = source.get('slug', '')
-        scraper_config = source.get('config', {})
-        
-        if slug not in SCRAPER_MAP:
-            all_errors.append({
-                'source': slug,
-                'message': f'Unknown scraper slug: {slug}'
-            })
+        if slug in problems:
+            error = {'source': slug, 'message': problems[slug]}
+            all_errors.append(error)
+            if writer is not None:
+                writer.write({'type': 'error', 'error': error})
             continue
-        
-        module_name, func_name = SCRAPER_MAP[slug]
-        
-        try:
-            module = load_scraper(module_name)
-            if not module:
-                all_errors.append({
-                    'source': slug,
-                    'message': f'Scraper module not found: {module_name}.py'
-                })
-                continue
-            
-            scrape_func = getattr(module, func_name, None)
-            if not scrape_func:
-                all_errors.append({
-                    'source': slug,
-                    'message': f'Scraper function not found: {func_name}'
-                })
-                continue
-            
-            result = scrape_func(scraper_config)
-            results[slug] = {
-                'stats': result.get('stats', {}),
-                'listingCount': len(result.get('listings', [])),
-                'source': result.get('source', slug),
-            }
-            
-            # Tag each listing with its source slug
-            for listing in result.get('listings', []):
-                listing['_sourceSlug'] = slug
-            
-            all_listings.extend(result.get('listings', []))
-            all_errors.extend(result.get('errors', []))
-            
-        except Exception as e:
-            all_errors.append({
-                'source': slug,
-                'message': f'Scraper execution failed: {str(e)}'
-            })
-            results[slug] = {'stats': {}, 'listingCount': 0, 'error': str(e)}
-    
+        scraper_config = source.get('config', {})
+        shared = {key: config[key] for key in ('localStats', 'resume', 'replay', 'replayDir') if key in config}
+        if shared:
+            scraper_config = dict(scraper_config, **shared)
+        runnable.append((slug, scraper_config))
+
+    if runnable:
+        max_workers = config.get('maxWorkers') or len(runnable)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scraper') as pool:
+            futures = {pool.submit(run_source, slug, scraper_config, scrape_type, writer): slug
+                       for slug, scraper_config in runnable}
+            for future in as_completed(futures):
+                slug = futures[future]
+                summary, listings, errors = future.result()
+                if summary is not None:
+                    results[slug] = summary
+                all_listings.extend(listings)
+                all_errors.extend(errors)
+                if writer is not None:
+                    for error in errors:
+                        writer.write({'type': 'error', 'error': error})
+                    if summary is not None:
+                        writer.write({'type': 'source', 'source': slug, 'summary': summary})
+
+    if writer is not None:
+        stats = {
+            'type': 'stats',
+            'results': results,
+            'totalScraped': writer.written,
+            'duplicatesRemoved': writer.duplicates,
+            'wallSeconds': round(time.time() - started, 2),
+            'errors': len(all_errors),
+            'analysis': analysis_report(results),
+        }
+        writer.write(stats)
+        return stats
+
     # Deduplicate across all sources
     unique_listings, dupes_removed = deduplicate_listings(all_listings)
-    
+
     return {
         'results': results,
         'combined': {
             'listings': unique_listings,
             'totalScraped': len(unique_listings),
             'duplicatesRemoved': dupes_removed,
+            'wallSeconds': round(time.time() - started, 2),
+            'analysis': analysis_report(results),
         },
         'errors': all_errors,
     }
 
+def serve(lines, out, ndjson=False):
+    """Run one job per input line until EOF, answering each on out."""
+    REGISTRY.warm()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            config = json.loads(line)
+            if config.get('output') == 'ndjson' or ndjson:
+                run_scrapers(config, NdjsonWriter(out))
+                continue
+            result = run_scrapers(config)
+        except Exception as e:
+            result = {"error": str(e)}
+        out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+        out.flush()
+
 if __name__ == '__main__':
+    if '--serve' in sys.argv:
+        serve(sys.stdin, sys.stdout, '--ndjson' in sys.argv)
+        sys.exit(0)
     try:
         input_data = sys.stdin.read().strip()
         config = json.loads(input_data) if input_data else {}
-        result = run_scrapers(config)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        if config.get('output') == 'ndjson' or '--ndjson' in sys.argv:
+            run_scrapers(config, NdjsonWriter(sys.stdout))
+        else:
+            result = run_scrapers(config)
+            print(json.dumps(result, ensure_ascii=False, indent=2))
     except json.JSONDecodeError as e:
         print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
         sys.exit(1)
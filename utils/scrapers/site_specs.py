@@ -0,0 +1,206 @@
+"""
+Site Specs — What differs between the rental sites, as data.
+
+Each spec is everything card_extractor and scrape_pipeline need to scrape
+one source: where its results pages live, which CSS selects its listing
+cards (tried in order until one matches) and each field inside a card, and
+the regexes and keywords that read beds/baths/size and the listing type out
+of the card text. Adding a source means adding a spec here and a thin
+<slug>_scraper.py entry point (see scraper_runner.SCRAPER_MAP).
+
+    "link": "card-or-link"  the card itself when it is an <a>, else fields.link
+            "title"         the title element's href (the title is a link)
+            "link"          fields.link
+    "idCut": sourceId is the URL's last path segment, cut at this character
+    "patterns": a group-1 integer regex per field; None leaves the field 0
+    "detail": selectors for a listing's own page (scrape_details.py): the full
+              description, every gallery image, and the facts block whose text
+              is read for beds/baths/size/furnished
+"""
+
+BROWSER_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Sri Lanka location mapping, checked in order against a card's location text
+DISTRICT_PROVINCE_MAP = {
+    'colombo': 'Western', 'gampaha': 'Western', 'kalutara': 'Western',
+    'kandy': 'Central', 'matale': 'Central', 'nuwara eliya': 'Central',
+    'galle': 'Southern', 'matara': 'Southern', 'hambantota': 'Southern',
+    'jaffna': 'Northern', 'kilinochchi': 'Northern', 'mannar': 'Northern',
+    'mullaitivu': 'Northern', 'vavuniya': 'Northern',
+    'batticaloa': 'Eastern', 'ampara': 'Eastern', 'trincomalee': 'Eastern',
+    'kurunegala': 'North Western', 'puttalam': 'North Western',
+    'anuradhapura': 'North Central', 'polonnaruwa': 'North Central',
+    'badulla': 'Uva', 'monaragala': 'Uva',
+    'ratnapura': 'Sabaragamuwa', 'kegalle': 'Sabaragamuwa',
+}
+
+BEDS = r'(\d+)\s*(?:bed|br)'
+BATHS = r'(\d+)\s*bath'
+SIZE = r'(\d+)\s*(?:sq|perch)'
+
+DETAIL = {
+    'description': '#description, .description, [class*="description"], [itemprop="description"]',
+    'images': '[class*="gallery"] img[src], [class*="slide"] img[src], [class*="carousel"] img[src]',
+    'attributes': '.property-details, .details, [class*="features"], [class*="specification"], table, dl',
+}
+
+TYPES = [
+    (('house',), 'House'),
+    (('apartment',), 'Apartment'),
+    (('annex',), 'Annex'),
+    (('room',), 'Boarding Room'),
+]
+
+SPECS = {
+    'ikman': {
+        'source': 'ikman.lk',
+        'headers': {
+            'User-Agent': BROWSER_UA,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+        },
+        'baseUrl': 'https://ikman.lk',
+        'searchUrl': 'https://ikman.lk/en/ads/sri-lanka/properties?type=rent',
+        'locationUrl': 'https://ikman.lk/en/ads/{location}/properties?type=rent',
+        'priceParams': {'priceMin': 'price_min', 'priceMax': 'price_max'},
+        'cards': [
+            'li[class*="ad-card"], div[class*="ad-card"], a[class*="card"]',
+            '[data-testid="ad-card"], .list--item, .ad-item',
+            'ul li a[href*="/ad/"]',
+        ],
+        'fields': {
+            'title': 'h2, h3, [class*="title"], [data-testid="title"]',
+            'link': 'a[href]',
+            'price': '[class*="price"], [data-testid="price"]',
+            'location': '[class*="location"], [data-testid="location"], [class*="subtitle"]',
+            'description': '[class*="description"], p',
+            'image': 'img[src]',
+        },
+        'link': 'card-or-link',
+        'idCut': '?',
+        'detail': {
+            'description': '[class*="description-section"], [class*="description"]',
+            'images': '[class*="gallery"] img[src], [class*="thumbnail"] img[src]',
+            'attributes': '[class*="ad-meta"], [class*="details"], dl',
+        },
+        'patterns': {'beds': BEDS, 'baths': BATHS, 'size': r'(\d+)\s*(?:sq\.?\s*ft|sqft|perch)'},
+        'types': [
+            (('house',), 'House'),
+            (('apartment', 'flat'), 'Apartment'),
+            (('annex',), 'Annex'),
+            (('room', 'boarding'), 'Boarding Room'),
+        ],
+    },
+    'lpw': {
+        'source': 'lankapropertyweb.com',
+        'headers': {
+            'User-Agent': BROWSER_UA,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        },
+        'baseUrl': 'https://www.lankapropertyweb.com',
+        'searchUrl': 'https://www.lankapropertyweb.com/rent/houses-for-rent.php',
+        'locationUrl': 'https://www.lankapropertyweb.com/rent/{location}.php',
+        'cards': [
+            '.property-item, .listing-item, .property-card, .result-item, li.property',
+            '[class*="property"], [class*="listing"]',
+        ],
+        'fields': {
+            'title': 'h2 a, h3 a, .title a, a.property-title',
+            'price': '.price, [class*="price"]',
+            'location': '.location, [class*="location"], .address',
+            'description': '.description, p, .details',
+            'image': 'img[src]',
+        },
+        'link': 'title',
+        'idCut': '.',
+        'detail': DETAIL,
+        'patterns': {'beds': BEDS, 'baths': BATHS, 'size': SIZE},
+        'types': [
+            (('house',), 'House'),
+            (('apartment', 'flat'), 'Apartment'),
+            (('annex',), 'Annex'),
+            (('room',), 'Boarding Room'),
+        ],
+    },
+    'hitad': {
+        'source': 'hitad.lk',
+        'headers': {'User-Agent': BROWSER_UA},
+        'baseUrl': 'https://www.hitad.lk',
+        'searchUrl': 'https://www.hitad.lk/en/ads/sri-lanka/houses-for-rent',
+        'cards': [
+            '.ad-item, .listing-card, .classified-item, [class*="ad-card"]',
+            'div[class*="item"], li[class*="item"]',
+        ],
+        'fields': {
+            'title': 'h2, h3, .title, a.title',
+            'link': 'a[href]',
+            'price': '.price, [class*="price"]',
+            'location': '.location, [class*="location"]',
+            'description': '.description, p',
+            'image': 'img[src]',
+        },
+        'link': 'link',
+        'detail': DETAIL,
+        'patterns': {'beds': BEDS, 'baths': BATHS, 'size': None},
+        'types': TYPES,
+    },
+    'house': {
+        'source': 'house.lk',
+        'headers': {'User-Agent': BROWSER_UA},
+        'baseUrl': 'https://www.house.lk',
+        'searchUrl': 'https://www.house.lk/rent',
+        'cards': [
+            '.property-item, .listing-item, .property-card, [class*="property-list"]',
+            'div[class*="listing"], div[class*="property"]',
+        ],
+        'fields': {
+            'title': 'h2, h3, .title, a[class*="title"]',
+            'link': 'a[href]',
+            'price': '.price, [class*="price"]',
+            'location': '.location, [class*="location"], .address',
+            'description': '.description, p',
+            'image': 'img[src]',
+        },
+        'link': 'link',
+        'detail': DETAIL,
+        'patterns': {'beds': BEDS, 'baths': BATHS, 'size': SIZE},
+        'types': TYPES,
+    },
+    'ceylon': {
+        'source': 'ceylonproperty.lk',
+        'headers': {'User-Agent': BROWSER_UA},
+        'baseUrl': 'https://www.ceylonproperty.lk',
+        'searchUrl': 'https://www.ceylonproperty.lk/rent',
+        'cards': [
+            '.property-item, .listing-card, .property-card, [class*="property"]',
+            'div[class*="listing"], div[class*="item"]',
+        ],
+        'fields': {
+            'title': 'h2, h3, .title, a[class*="title"]',
+            'link': 'a[href]',
+            'price': '.price, [class*="price"]',
+            'location': '.location, [class*="location"], .address',
+            'description': '.description, p',
+            'image': 'img[src]',
+        },
+        'link': 'link',
+        'detail': DETAIL,
+        'patterns': {'beds': BEDS, 'baths': BATHS, 'size': SIZE},
+        'types': TYPES,
+    },
+}
+
+def page_url(slug, page, config):
+    """Results URL for one page of a source, honouring location/price filters it supports."""
+    spec = SPECS[slug]
+    url = spec['searchUrl']
+    location = config.get('location', '')
+    if location and spec.get('locationUrl'):
+        url = spec['locationUrl'].format(location=location.lower().replace(' ', '-'))
+    params = [f"page={page}"] if page > 1 else []
+    for key, param in spec.get('priceParams', {}).items():
+        if config.get(key):
+            params.append(f"{param}={config[key]}")
+    if params:
+        url += ('&' if '?' in url else '?') + '&'.join(params)
+    return url